@@ -1,19 +1,39 @@
 """
 FastAPI 路由定义
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session
 from typing import List, Optional
+from pydantic import TypeAdapter
 from app.database import get_session
-from app.models import Feed, FeedCreate, FeedResponse, ArticleResponse
+from app.models import (
+    Feed,
+    Article,
+    FeedCreate,
+    FeedResponse,
+    ArticleResponse,
+    ArticleCountResponse,
+    ArticleDetailResponse,
+    ArticleSearchResult,
+)
 from app.crud import (
     create_feed,
     get_all_feeds,
+    get_feed_by_id,
     get_feed_by_url,
     get_articles,
+    count_articles,
+    encode_article_cursor,
+    decode_article_cursor,
 )
 from app.security.auth import verify_api_token
 from app.security.validators import FeedCreateValidated
+from app.services.summary_queue import record_article_views, unsummarized_ids
+from app.services.content_store import load_content
+from app.services.search import SearchUnavailableError, search_articles
+from app.services.cache_invalidation import mark_feeds_changed
+from app.services.response_cache import article_scopes, cached_response, conditional_response
+from app.services.rss_snapshots import rss_snapshots, SNAPSHOT_LIMIT, RSS_MEDIA_TYPE
 from app.config import settings
 from datetime import datetime, timedelta, UTC
 import logging
@@ -22,6 +42,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 文章列表响应由缓存层直接输出 JSON 字节
+_article_list_adapter = TypeAdapter(List[ArticleResponse])
+
 
 @router.post("/feeds", response_model=FeedResponse, status_code=201)
 def add_feed(
@@ -56,6 +79,7 @@ def add_feed(
 
     try:
         created_feed = create_feed(session, feed)
+        mark_feeds_changed()
         logger.info(f"成功添加 RSS 源: {created_feed.name}")
         return created_feed
     except Exception as e:
@@ -86,14 +110,61 @@ def list_feeds(
         raise HTTPException(status_code=500, detail=f"获取列表失败: {str(e)}")
 
 
+def _article_fields(article: Article) -> dict:
+    """文章响应的公共字段（含来源名称、分类与 RSS URL）"""
+    return {
+        "id": article.id,
+        "title": article.title,
+        "link": article.link,
+        "summary": article.summary,
+        "summary_en": article.summary_en,  # 英文摘要
+        "qr_code_url": article.qr_code_url,  # 二维码URL
+        "published_at": article.published_at,
+        "feed_id": article.feed_id,
+        "feed_name": article.feed.name if article.feed else None,
+        "feed_category": article.feed.category if article.feed else None,
+        "feed_url": article.feed.url if article.feed else None,
+        "created_at": article.created_at,
+    }
+
+
+def _next_page_headers(request: Request, articles: List[Article], limit: int) -> dict:
+    """满页时给出下一页游标（响应体仍是文章列表，兼容现有客户端）"""
+    if len(articles) < limit:
+        return {}
+    next_cursor = encode_article_cursor(articles[-1])
+    return {
+        "X-Next-Cursor": next_cursor,
+        "Link": f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"',
+    }
+
+
+def _check_date_params(*values: Optional[str]) -> None:
+    """
+    校验 date / start_date / end_date 参数（文章列表与计数共用）
+
+    在读取缓存与渲染之前校验，两个接口对格式错误的日期都返回 400，而不是在渲染时变成 500
+    """
+    for value in values:
+        if not value:
+            continue
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"日期格式错误，应为 YYYY-MM-DD 格式: {value}")
+
+
 @router.get("/articles", response_model=List[ArticleResponse])
 def list_articles(
+    request: Request,
     limit: int = Query(50, ge=1, le=200, description="返回数量限制"),
     category: Optional[str] = Query(None, description="按分类筛选"),
     days: Optional[int] = Query(None, ge=1, le=365, description="获取最近几天的文章"),
     date: Optional[str] = Query(None, description="指定具体日期 (YYYY-MM-DD 格式，如 2026-01-05)"),
     start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD 格式)"),
     end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD 格式)"),
+    cursor: Optional[str] = Query(None, description="翻页游标（取自上一页响应头 X-Next-Cursor）"),
+    feed_id: Optional[List[int]] = Query(None, max_length=50, description="按订阅源筛选（可重复传入多个）"),
     session: Session = Depends(get_session),
 ):
     """
@@ -106,10 +177,13 @@ def list_articles(
         date: 指定具体日期，格式 YYYY-MM-DD（可选，优先级最高）
         start_date: 开始日期，格式 YYYY-MM-DD（可选）
         end_date: 结束日期，格式 YYYY-MM-DD（可选）
+        cursor: 翻页游标（可选）
+        feed_id: 订阅源 ID，可重复传入多个（可选）
         session: 数据库会话
 
     Returns:
-        Article 对象列表（包含 Feed 名称和英文摘要）
+        Article 对象列表（包含 Feed 名称和英文摘要）；
+        满页时响应头 X-Next-Cursor 给出下一页游标，Link 给出下一页地址（rel="next"）
 
     日期过滤说明:
         1. 使用 date 参数查询特定日期的文章:
@@ -133,8 +207,21 @@ def list_articles(
     组合使用:
         可以与 category 和 limit 组合使用:
         GET /api/articles?date=2026-01-05&category=tech&limit=20
+
+    按订阅源筛选:
+        GET /api/articles?feed_id=3&feed_id=7&days=7
+
+    翻页说明:
+        按 (发布时间, id) 键集翻页，深页与首页代价相同；翻页时其他筛选参数保持不变:
+        GET /api/articles?category=tech&limit=200&cursor=<上一页的 X-Next-Cursor>
     """
+    _check_date_params(date, start_date, end_date)
     try:
+        after = decode_article_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def render():
         articles = get_articles(
             session,
             limit=limit,
@@ -143,34 +230,206 @@ def list_articles(
             date=date,
             start_date=start_date,
             end_date=end_date,
+            after=after,
+            feed_ids=feed_id,
         )
 
         # 转换为响应模型，并添加 feed_name、summary_en、feed_category、feed_url、qr_code_url
-        response_articles = []
-        for article in articles:
-            article_dict = {
-                "id": article.id,
-                "title": article.title,
-                "link": article.link,
-                "summary": article.summary,
-                "summary_en": article.summary_en,  # 英文摘要
-                "qr_code_url": article.qr_code_url,  # 二维码URL
-                "published_at": article.published_at,
-                "feed_id": article.feed_id,
-                "feed_name": article.feed.name if article.feed else None,
-                "feed_category": article.feed.category if article.feed else None,
-                "feed_url": article.feed.url if article.feed else None,
-                "created_at": article.created_at,
-            }
-            response_articles.append(ArticleResponse(**article_dict))
+        response_articles = [ArticleResponse(**_article_fields(article)) for article in articles]
+
+        return (
+            _article_list_adapter.dump_json(response_articles),
+            "application/json",
+            _next_page_headers(request, articles, limit),
+            unsummarized_ids(articles),
+        )
 
-        return response_articles
+    # Link 头包含请求地址，缓存键带上 base_url
+    cache_key = (
+        "articles", str(request.base_url), limit, category, days, date, start_date, end_date, cursor,
+        tuple(sorted(set(feed_id))) if feed_id else None,
+    )
+    try:
+        # 被返回但还没有摘要的文章提升摘要优先级（命中缓存时同样记录）
+        return cached_response(
+            request, cache_key, render,
+            scopes=article_scopes(category, feed_id),
+            on_served=record_article_views,
+        )
 
     except Exception as e:
         logger.error(f"获取文章列表失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取文章失败: {str(e)}")
 
 
+@router.get("/articles/count", response_model=ArticleCountResponse)
+def count_articles_endpoint(
+    request: Request,
+    category: Optional[str] = Query(None, description="按分类筛选"),
+    days: Optional[int] = Query(None, ge=1, le=365, description="获取最近几天的文章"),
+    date: Optional[str] = Query(None, description="指定具体日期 (YYYY-MM-DD 格式)"),
+    start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD 格式)"),
+    end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD 格式)"),
+    feed_id: Optional[List[int]] = Query(None, max_length=50, description="按订阅源筛选（可重复传入多个）"),
+    session: Session = Depends(get_session),
+):
+    """
+    统计文章数
+
+    筛选参数与文章列表相同，一次请求得到总数，不必逐页遍历。
+
+    示例:
+        GET /api/articles/count?category=ai&days=30
+    """
+    _check_date_params(date, start_date, end_date)
+
+    def render():
+        total = count_articles(
+            session,
+            category=category,
+            days=days,
+            date=date,
+            start_date=start_date,
+            end_date=end_date,
+            feed_ids=feed_id,
+        )
+        return ArticleCountResponse(total=total).model_dump_json().encode(), "application/json", {}, ()
+
+    cache_key = (
+        "articles_count", category, days, date, start_date, end_date,
+        tuple(sorted(set(feed_id))) if feed_id else None,
+    )
+    try:
+        return cached_response(request, cache_key, render, scopes=article_scopes(category, feed_id))
+    except Exception as e:
+        logger.error(f"统计文章数失败: {e}")
+        raise HTTPException(status_code=500, detail=f"统计文章数失败: {str(e)}")
+
+
+@router.get("/articles/search", response_model=List[ArticleSearchResult])
+def search_articles_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="搜索词（空白分隔的多个词需同时命中）"),
+    limit: int = Query(20, ge=1, le=100, description="返回数量限制"),
+    offset: int = Query(0, ge=0, le=1000, description="跳过的结果数"),
+    category: Optional[str] = Query(None, description="按分类筛选"),
+    days: Optional[int] = Query(None, ge=1, le=365, description="获取最近几天的文章"),
+    date: Optional[str] = Query(None, description="指定具体日期 (YYYY-MM-DD 格式)"),
+    start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD 格式)"),
+    end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD 格式)"),
+    session: Session = Depends(get_session),
+):
+    """
+    全文搜索文章
+
+    在标题、中英文摘要与正文中搜索（FTS5 trigram 分词，中英文均可），按 BM25 相关度排序，
+    每条结果附带命中片段。日期与分类过滤与文章列表相同。
+
+    示例:
+        GET /api/articles/search?q=大模型推理&category=ai&days=30
+    """
+    try:
+        results = search_articles(
+            session,
+            q,
+            limit=limit,
+            offset=offset,
+            category=category,
+            days=days,
+            date=date,
+            start_date=start_date,
+            end_date=end_date,
+        )
+    except SearchUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"搜索文章失败: {e}")
+        raise HTTPException(status_code=500, detail=f"搜索失败: {str(e)}")
+
+    return [
+        ArticleSearchResult(**_article_fields(article), snippet=snippet, score=score)
+        for article, snippet, score in results
+    ]
+
+
+@router.get("/articles/{article_id:int}", response_model=ArticleDetailResponse)
+def get_article_detail(article_id: int, session: Session = Depends(get_session)):
+    """
+    获取单篇文章详情（含正文）
+
+    正文压缩存放在 article_content 表，只在这里按需解压，列表接口不读取。
+
+    Args:
+        article_id: 文章 ID
+        session: 数据库会话
+
+    Returns:
+        文章详情（content 为清洗后的纯文本正文）
+    """
+    article = session.get(Article, article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail="文章不存在")
+
+    _, content = load_content(session, article_id)
+    return ArticleDetailResponse(**_article_fields(article), content=content)
+
+
+@router.get("/feeds/{feed_id:int}/articles", response_model=List[ArticleResponse])
+def list_feed_articles(
+    feed_id: int,
+    request: Request,
+    limit: int = Query(20, ge=1, le=200, description="返回数量限制"),
+    cursor: Optional[str] = Query(None, description="翻页游标（取自上一页响应头 X-Next-Cursor）"),
+    session: Session = Depends(get_session),
+):
+    """
+    获取单个订阅源的最新文章
+
+    按 ix_article_feed_published 索引直接取该源最新的 limit 篇，不受其他源文章数量影响；
+    翻页方式与 /api/articles 相同。
+
+    Args:
+        feed_id: 订阅源 ID
+        limit: 返回数量限制（1-200）
+        cursor: 翻页游标（可选）
+        session: 数据库会话
+
+    Returns:
+        Article 对象列表，按发布时间倒序
+    """
+    try:
+        after = decode_article_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def render():
+        if get_feed_by_id(session, feed_id) is None:
+            raise HTTPException(status_code=404, detail="RSS 源不存在")
+
+        articles = get_articles(session, limit=limit, after=after, feed_ids=[feed_id])
+        response_articles = [ArticleResponse(**_article_fields(article)) for article in articles]
+        return (
+            _article_list_adapter.dump_json(response_articles),
+            "application/json",
+            _next_page_headers(request, articles, limit),
+            unsummarized_ids(articles),
+        )
+
+    try:
+        return cached_response(
+            request, ("feed_articles", str(request.base_url), feed_id, limit, cursor), render,
+            scopes=article_scopes(feed_ids=[feed_id]),
+            on_served=record_article_views,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取 RSS 源文章失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取文章失败: {str(e)}")
+
+
 @router.post("/feeds/fetch")
 def trigger_fetch(
     session: Session = Depends(get_session),
@@ -187,6 +446,7 @@ def trigger_fetch(
 
         logger.info("手动触发 RSS 抓取")
         stats = fetch_all_feeds(session)
+        rss_snapshots.rebuild(session)
 
         return {
             "status": "success",
@@ -221,6 +481,9 @@ def detailed_health_check(session: Session = Depends(get_session)):
     - 最近抓取统计
     """
     from app.services.summarizer import test_llm_connection
+    from app.services.llm_limiter import get_llm_limiter_stats
+    from app.services.llm_rate_limiter import get_llm_rate_limiter
+    from app.services.llm_providers import get_provider_pool, llm_configured
     from app.scheduler import get_scheduler_status
     from app.crud import get_all_feeds, get_articles
     from datetime import datetime, timedelta
@@ -239,8 +502,11 @@ def detailed_health_check(session: Session = Depends(get_session)):
     health_status["components"]["llm"] = {
         "status": "ok" if llm_ok else "error",
         "response_time_ms": round(llm_duration * 1000, 2),
-        "configured": bool(settings.openai_api_key),
-        "model": settings.openai_model,
+        "configured": llm_configured(),
+        "model": get_provider_pool().default.model,
+        "concurrency": get_llm_limiter_stats(),
+        "rate_limit": get_llm_rate_limiter().stats(),
+        "providers": get_provider_pool().stats(),
     }
 
     # 2. 数据库检查
@@ -277,7 +543,15 @@ def detailed_health_check(session: Session = Depends(get_session)):
         "fetch_interval_hours": settings.fetch_interval_hours,
     }
 
-    # 4. 配置信息
+    # 4. 摘要队列检查
+    from app.services.summary_worker import get_summary_worker_status
+    health_status["components"]["summary_worker"] = get_summary_worker_status()
+
+    # 5. 摘要缓存命中情况
+    from app.services.summary_cache import get_cache_stats
+    health_status["components"]["summary_cache"] = get_cache_stats()
+
+    # 6. 配置信息
     health_status["config"] = {
         "max_concurrent_summaries": settings.max_concurrent_summaries,
         "summary_max_length": settings.summary_max_length,
@@ -472,17 +746,39 @@ def get_api_stats(
 # RSS 输出端点
 # ============================================================================
 
-from fastapi import Response
 from app.services.rss_generator import generate_rss_response, generate_category_rss
 
 
+def _xml_bytes(rss_xml) -> bytes:
+    """feedgen 的 rss_str 返回 bytes，统一成缓存所需的字节串"""
+    return rss_xml if isinstance(rss_xml, bytes) else rss_xml.encode("utf-8")
+
+
+def _snapshot_response(
+    request: Request,
+    category: Optional[str],
+    summary_type: str,
+    days: Optional[int],
+    limit: int,
+) -> Optional[Response]:
+    """默认参数（不限天数、默认数量）的请求直接返回预渲染的快照；没有有效快照时返回 None"""
+    if days is not None or limit != SNAPSHOT_LIMIT:
+        return None
+    snapshot = rss_snapshots.get(category, summary_type)
+    if snapshot is None:
+        return None
+    record_article_views(snapshot.article_ids)
+    return conditional_response(request, snapshot.body, RSS_MEDIA_TYPE, snapshot.etag, snapshot.built_at)
+
+
 @router.get("/rss", response_class=Response)
 @router.get("/rss/{summary_type}", response_class=Response)
 def rss_feed(
+    request: Request,
     summary_type: str = "zh",
     category: Optional[str] = Query(None, description="按分类筛选"),
     days: Optional[int] = Query(None, ge=1, le=30, description="获取最近几天的文章"),
-    limit: int = Query(50, ge=1, le=200, description="返回数量限制"),
+    limit: int = Query(SNAPSHOT_LIMIT, ge=1, le=200, description="返回数量限制"),
     session: Session = Depends(get_session),
 ):
     """
@@ -529,45 +825,53 @@ def rss_feed(
         if summary_type not in ["zh", "en", "bilingual"]:
             summary_type = "zh"
 
-        # 获取文章
-        logger.info(f"RSS 请求: type={summary_type}, category={category}, days={days}, limit={limit}")
-        articles = get_articles(
-            session,
-            limit=limit,
-            category=category,
-            days=days,
-            date=None,
-            start_date=None,
-            end_date=None
-        )
-        logger.info(f"RSS: 从数据库获取了 {len(articles)} 篇文章")
-
-        # 生成 RSS
-        base_url = "http://localhost:8000"  # TODO: 从配置读取
-
-        # 根据是否有分类自定义标题
-        title = None
-        description = None
-        if category:
-            title = f"AI-RSS-Hub - {category}"
-            description = f"AI 智能聚合的 {category} 资讯"
-
-        rss_xml = generate_rss_response(
-            articles=articles,
-            summary_type=summary_type,
-            base_url=base_url,
-            title=title,
-            description=description
-        )
-
-        logger.info(
-            f"生成 RSS: {len(articles)} 篇文章, "
-            f"类型={summary_type}, 分类={category or '全部'}"
-        )
-
-        return Response(
-            content=rss_xml,
-            media_type="application/rss+xml; charset=utf-8"
+        snapshot = _snapshot_response(request, category, summary_type, days, limit)
+        if snapshot is not None:
+            return snapshot
+
+        def render():
+            # 获取文章
+            logger.info(f"RSS 请求: type={summary_type}, category={category}, days={days}, limit={limit}")
+            articles = get_articles(
+                session,
+                limit=limit,
+                category=category,
+                days=days,
+                date=None,
+                start_date=None,
+                end_date=None
+            )
+            logger.info(f"RSS: 从数据库获取了 {len(articles)} 篇文章")
+
+            # 生成 RSS
+            base_url = "http://localhost:8000"  # TODO: 从配置读取
+
+            # 根据是否有分类自定义标题
+            title = None
+            description = None
+            if category:
+                title = f"AI-RSS-Hub - {category}"
+                description = f"AI 智能聚合的 {category} 资讯"
+
+            rss_xml = generate_rss_response(
+                articles=articles,
+                summary_type=summary_type,
+                base_url=base_url,
+                title=title,
+                description=description
+            )
+
+            logger.info(
+                f"生成 RSS: {len(articles)} 篇文章, "
+                f"类型={summary_type}, 分类={category or '全部'}"
+            )
+            return _xml_bytes(rss_xml), RSS_MEDIA_TYPE, {}, unsummarized_ids(articles)
+
+        # 阅读器轮询时数据多半没变：直接返回缓存的 XML，或带校验值时返回 304
+        return cached_response(
+            request, ("rss", summary_type, category, days, limit), render,
+            scopes=article_scopes(category),
+            on_served=record_article_views,
         )
 
     except Exception as e:
@@ -577,10 +881,11 @@ def rss_feed(
 
 @router.get("/rss/category/{category}", response_class=Response)
 def rss_category_feed(
+    request: Request,
     category: str,
     summary_type: str = Query("zh", description="摘要类型 (zh/en/bilingual)"),
     days: Optional[int] = Query(None, ge=1, le=30, description="获取最近几天的文章"),
-    limit: int = Query(50, ge=1, le=200, description="返回数量限制"),
+    limit: int = Query(SNAPSHOT_LIMIT, ge=1, le=200, description="返回数量限制"),
     session: Session = Depends(get_session),
 ):
     """
@@ -608,34 +913,41 @@ def rss_category_feed(
         if summary_type not in ["zh", "en", "bilingual"]:
             summary_type = "zh"
 
-        # 获取文章
-        articles = get_articles(
-            session,
-            limit=limit,
-            category=category,
-            days=days,
-            date=None,
-            start_date=None,
-            end_date=None
-        )
-
-        # 生成 RSS
-        base_url = "http://localhost:8000"
-        rss_xml = generate_category_rss(
-            articles=articles,
-            category=category,
-            summary_type=summary_type,
-            base_url=base_url
-        )
-
-        logger.info(f"生成分类 RSS [{category}]: {len(articles)} 篇文章, 类型={summary_type}")
-
-        return Response(
-            content=rss_xml,
-            media_type="application/rss+xml; charset=utf-8"
+        # 与 /rss?category= 输出相同，共用同一份快照
+        snapshot = _snapshot_response(request, category, summary_type, days, limit)
+        if snapshot is not None:
+            return snapshot
+
+        def render():
+            # 获取文章
+            articles = get_articles(
+                session,
+                limit=limit,
+                category=category,
+                days=days,
+                date=None,
+                start_date=None,
+                end_date=None
+            )
+
+            # 生成 RSS
+            base_url = "http://localhost:8000"
+            rss_xml = generate_category_rss(
+                articles=articles,
+                category=category,
+                summary_type=summary_type,
+                base_url=base_url
+            )
+
+            logger.info(f"生成分类 RSS [{category}]: {len(articles)} 篇文章, 类型={summary_type}")
+            return _xml_bytes(rss_xml), RSS_MEDIA_TYPE, {}, unsummarized_ids(articles)
+
+        return cached_response(
+            request, ("rss_category", category, summary_type, days, limit), render,
+            scopes=article_scopes(category),
+            on_served=record_article_views,
         )
 
     except Exception as e:
         logger.error(f"生成分类 RSS 失败: {e}")
         raise HTTPException(status_code=500, detail=f"生成分类 RSS 失败: {str(e)}")
-
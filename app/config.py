@@ -17,18 +17,67 @@ class Settings(BaseSettings):
     openai_api_key: Optional[str] = None
     openai_api_base: str = "https://api.openai.com/v1"  # 可替换为 DeepSeek 或其他兼容接口
     openai_model: str = "gpt-3.5-turbo"
+    # 多服务商池（JSON 数组，每项含 name/api_base/api_key/model，可选 weight/max_concurrency/rpm_limit/tpm_limit/timeout）
+    # 为空时只使用上面的单个服务商
+    llm_providers: str = ""
 
     # RSS 抓取配置
     fetch_interval_hours: int = 1  # 抓取间隔（小时）
     request_timeout: int = 30  # HTTP 请求超时时间（秒）
+    fetch_max_concurrency: int = 16  # 并发下载 RSS 源的全局上限
+    fetch_per_host_concurrency: int = 2  # 同一主机的并发下载上限（避免对单站点瞬时打满连接）
+    store_raw_content: bool = True  # 是否保留原始 HTML（article_content.raw）；关闭后只保存清洗后的纯文本，节省存储
+    content_compression: str = "zlib"  # 正文压缩算法：zlib（标准库）/ zstd（需 pip install zstandard）/ none
+    article_insert_scope: str = "feed"  # 新文章批量写入粒度：feed（每源一条 INSERT）/ cycle（每轮一条）
 
     # AI 总结配置
     summary_max_length: int = 150  # 总结最大长度（增加以获取更详细摘要）
+    summary_input_token_budget: int = 1200  # 提示词中正文的 Token 预算（超出时按段落信息量挑选，长上下文模型可调大）
+    llm_tokenizer: str = "approx"  # Token 计数方式：approx（近似估算，零依赖）/ tiktoken（精确计数，需 pip install tiktoken）
     llm_timeout: int = 45  # LLM API 超时时间（秒，增加以避免超时）
-    max_concurrent_summaries: int = 3  # 并发生成摘要的最大数量（优化后提高吞吐量）
+    max_concurrent_summaries: int = 3  # LLM 并发窗口初始值（运行中按 AIMD 自适应调整）
+    llm_concurrency_min: int = 1  # LLM 并发窗口下限（限流/超时时乘性收缩到此为止）
+    llm_concurrency_max: int = 16  # LLM 并发窗口上限（成功时加性增长到此为止）
+    llm_rpm_limit: int = 0  # 每分钟请求数配额（0 表示不限制）
+    llm_tpm_limit: int = 0  # 每分钟 Token 配额（按提示词估算 + max_tokens 预扣，响应后按实际用量结算；0 表示不限制）
+    llm_rate_burst_seconds: float = 5.0  # 令牌桶容量折合的秒数：越小越平滑，越大越允许短时突发
     summary_batch_size: int = 10  # 摘要分批大小（每批篇数）：限制单批同时驻留的原文/响应，压低内存峰值
     summary_retry_attempts: int = 5  # API 调用失败时的重试次数（429 需跨 RPM 分钟窗口，配合 min=10s 退避）
     summary_retry_delay: int = 2  # 重试延迟（秒）
+    summary_pack_enabled: bool = True  # 短文章打包成一次请求批量生成摘要，节省 RPM 与重复的提示词开销
+    summary_pack_max_items: int = 8  # 单次打包请求最多包含的文章数
+    summary_pack_item_max_chars: int = 600  # 纯文本长度不超过该值的文章才参与打包
+    summary_pack_token_budget: int = 2000  # 单次打包请求中文章部分的输入 Token 预算（估算）
+
+    # LLM 客户端连接池配置（进程内共享一个长连接客户端）
+    llm_max_connections: int = 20  # 连接池最大连接数
+    llm_max_keepalive_connections: int = 10  # 保持的空闲长连接数
+    llm_keepalive_expiry: float = 120.0  # 空闲长连接保活时间（秒）
+    llm_http2: bool = True  # 服务商支持时启用 HTTP/2（需安装 h2）
+
+    # 摘要队列配置（抓取只入队，由常驻 worker 消费）
+    summary_worker_enabled: bool = True  # 是否随应用启动摘要 worker
+    summary_worker_poll_interval: float = 5.0  # 队列为空时的轮询间隔（秒）
+    summary_lease_seconds: int = 900  # 任务租约时长（秒），超时未完成视为 worker 崩溃，任务重新入队
+    summary_max_attempts: int = 5  # 单篇最大尝试次数，超过后标记为 failed
+    summary_retry_backoff_seconds: int = 60  # 失败重试的基础退避（秒，按尝试次数指数增长）
+    summary_priority_weight_hours: float = 12.0  # 订阅源摘要权重每翻一倍，相当于文章新了多少小时
+    summary_priority_view_hours: float = 1.0  # 未摘要文章每被 /api/articles、/rss 返回一次，优先级提升的小时数
+    summary_cache_enabled: bool = True  # 按内容哈希缓存摘要，同文转载/重复生成时不再调用 LLM
+    summary_cache_keep_days: int = 90  # 摘要缓存保留天数
+    near_dup_enabled: bool = True  # 摘要前按 SimHash 查找近似重复文章，复用其摘要
+    near_dup_window_days: int = 7  # 近似重复的查找窗口（天）
+
+    # 接口响应缓存（/api/rss、/api/articles 渲染结果按查询参数缓存在进程内，抓取/摘要写入后失效）
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 256  # 最多缓存的响应数（LRU）
+    response_cache_ttl: int = 600  # 缓存有效期（秒）；兜底其他进程（如摘要重建脚本）直接写库的情况
+
+    # 预渲染 RSS 快照（全部/各分类 × zh/en/bilingual，默认数量），抓取结束与定时刷新时重建有变化的分类
+    rss_snapshot_enabled: bool = True
+    rss_snapshot_dir: str = "./rss_snapshots"  # 快照落盘目录，重启后直接加载；为空时只保存在内存
+    rss_snapshot_refresh_seconds: int = 60  # 定时重建被作废快照（摘要陆续写入）的间隔（秒）
+    rss_snapshot_max_age: int = 600  # 快照最长使用时间（秒），到期后由定时任务核对数据水位；兜底其他进程直接写库的情况
 
     # ========== 安全配置 ==========
     # API Token - 用于管理操作认证
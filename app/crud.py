@@ -1,17 +1,62 @@
 """
 数据库 CRUD 操作
 """
+import base64
+import json
 from datetime import datetime, timedelta, UTC
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
 from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
-from sqlalchemy import text
+from sqlalchemy.orm import contains_eager, load_only
+from sqlalchemy import Boolean, func, text, tuple_, union_all
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from app.models import Feed, Article
+from app.services.content_store import store_contents
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# 列表接口与 RSS 输出用到的列（正文在 article_content 表，simhash 等内部列不随列表读出）
+ARTICLE_LIST_COLUMNS = (
+    Article.id,
+    Article.title,
+    Article.link,
+    Article.summary,
+    Article.summary_en,
+    Article.qr_code_url,
+    Article.published_at,
+    Article.feed_id,
+    Article.created_at,
+)
+FEED_LIST_COLUMNS = (Feed.id, Feed.name, Feed.category, Feed.url)
+# 文章列表的翻页游标：上一页最后一篇文章的 (published_at, id)
+ArticleCursor = Tuple[Optional[datetime], Optional[int]]
+
+
+class likely(FunctionElement):
+    """
+    提示 SQLite 查询规划器该条件大概率成立（SQLite 的 likely()，其他数据库原样输出条件）
+
+    分类过滤加上该提示后，规划器按 ix_article_published_id 倒序扫描、逐行核对分类，读满 LIMIT 即停；
+    否则它会先按分类取出所有订阅源，再经 ix_article_feed_published 取出全部文章用临时 B 树排序。
+    """
+
+    type = Boolean()
+    name = "likely"
+    inherit_cache = True
+
+
+@compiles(likely)
+def _compile_likely(element, compiler, **kw):
+    return f"({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(likely, "sqlite")
+def _compile_likely_sqlite(element, compiler, **kw):
+    return f"likely({compiler.process(element.clauses, **kw)})"
+
+
 # Feed 相关操作
 def create_feed(session: Session, feed: Feed) -> Feed:
     """创建新的 RSS 源"""
@@ -46,6 +91,11 @@ def update_feed(session: Session, feed_id: int, **kwargs) -> Optional[Feed]:
     """更新 RSS 源"""
     feed = session.get(Feed, feed_id)
     if feed:
+        # URL 变更后旧的条件请求校验值不再适用
+        if "url" in kwargs and kwargs["url"] != feed.url:
+            feed.etag = None
+            feed.last_modified = None
+            feed.content_hash = None
         for key, value in kwargs.items():
             setattr(feed, key, value)
         feed.updated_at = datetime.now()
@@ -71,41 +121,21 @@ def get_article_by_link(session: Session, link: str) -> Optional[Article]:
     return session.exec(statement).first()
 
 
-def get_articles(
-    session: Session,
-    limit: int = 50,
-    category: Optional[str] = None,
+def article_date_conditions(
     days: Optional[int] = None,
     date: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-) -> List[Article]:
+) -> list:
     """
-    获取文章列表
-
-    Args:
-        session: 数据库会话
-        limit: 返回数量限制
-        category: 按分类筛选
-        days: 获取最近几天的文章
-        date: 指定具体日期（YYYY-MM-DD 格式）
-        start_date: 开始日期（YYYY-MM-DD 格式）
-        end_date: 结束日期（YYYY-MM-DD 格式）
+    文章发布时间的过滤条件（文章列表与全文搜索共用）
 
-    Returns:
-        Article 对象列表
+    优先级: date > (start_date + end_date) > days
 
-    日期过滤优先级:
-        1. date - 如果指定，只返回该日期的文章
-        2. start_date 和 end_date - 如果指定，返回该范围内的文章
-        3. days - 返回最近 N 天的文章
-        4. 无过滤 - 返回所有文章（受 limit 限制）
+    Raises:
+        ValueError: 日期格式错误
     """
-    statement = select(Article).join(Feed).options(selectinload(Article.feed))
-
-    # 按分类筛选
-    if category:
-        statement = statement.where(Feed.category == category)
+    conditions = []
 
     # 按日期筛选（优先级 1: 指定具体日期）
     if date:
@@ -114,10 +144,7 @@ def get_articles(
             # 查询该日期的文章（从当天 00:00:00 到 23:59:59）
             start_datetime = datetime.combine(target_date, datetime.min.time())
             end_datetime = datetime.combine(target_date, datetime.max.time())
-            statement = statement.where(
-                Article.published_at >= start_datetime,
-                Article.published_at <= end_datetime
-            )
+            conditions += [Article.published_at >= start_datetime, Article.published_at <= end_datetime]
             logger.info(f"按日期筛选: {date}")
         except ValueError as e:
             logger.error(f"日期格式错误: {date}, {e}")
@@ -130,13 +157,13 @@ def get_articles(
                 start_datetime = datetime.strptime(start_date, "%Y-%m-%d")
                 # 设置为当天 00:00:00
                 start_datetime = start_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
-                statement = statement.where(Article.published_at >= start_datetime)
+                conditions.append(Article.published_at >= start_datetime)
 
             if end_date:
                 end_datetime = datetime.strptime(end_date, "%Y-%m-%d")
                 # 设置为当天 23:59:59
                 end_datetime = end_datetime.replace(hour=23, minute=59, second=59, microsecond=999999)
-                statement = statement.where(Article.published_at <= end_datetime)
+                conditions.append(Article.published_at <= end_datetime)
 
             logger.info(f"按日期范围筛选: {start_date or '开始'} 至 {end_date or '结束'}")
         except ValueError as e:
@@ -146,24 +173,301 @@ def get_articles(
     # 按天数筛选（优先级 3: 最近 N 天）
     elif days and days > 0:
         cutoff_date = datetime.now() - timedelta(days=days)
-        statement = statement.where(Article.published_at >= cutoff_date)
+        conditions.append(Article.published_at >= cutoff_date)
         logger.info(f"按最近 {days} 天筛选")
 
-    # 按发布时间降序排序
-    statement = statement.order_by(Article.published_at.desc())
+    return conditions
 
-    # 限制数量
-    statement = statement.limit(limit)
 
-    results = session.exec(statement).all()
+def build_articles_query(
+    limit: int = 50,
+    category: Optional[str] = None,
+    days: Optional[int] = None,
+    date: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    after: Optional[ArticleCursor] = None,
+    feed_ids: Optional[Sequence[int]] = None,
+):
+    """
+    构造文章列表查询（参数与 get_articles 相同）
+
+    单独拆出便于对各筛选组合做 EXPLAIN QUERY PLAN 回归测试：
+    都应走 ix_article_published_id / ix_article_feed_published 索引，不出现全表扫描加临时 B 树排序。
+
+    Raises:
+        ValueError: 日期格式错误
+    """
+    conditions = []
+
+    # 按分类筛选（likely 让规划器保持按时间顺序扫描，见 likely 的说明）
+    if category:
+        conditions.append(likely(Feed.category == category))
+
+    conditions.extend(article_date_conditions(days=days, date=date, start_date=start_date, end_date=end_date))
+
+    # 键集翻页：从上一页最后一行之后继续，按索引直接定位，深页与首页代价相同
+    if after:
+        after_published_at, after_id = after
+        if after_published_at is None:
+            # 发布时间为空的文章排在最后（after_id 为 None 表示从空值部分的开头取）
+            conditions.append(Article.published_at.is_(None))
+            if after_id is not None:
+                conditions.append(Article.id < after_id)
+        else:
+            conditions.append(tuple_(Article.published_at, Article.id) < (after_published_at, after_id))
+
+    # 按发布时间降序排序（同一时间按 id 降序，保证翻页顺序稳定）
+    order_by = (Article.published_at.desc(), Article.id.desc())
+
+    # 按订阅源筛选：单个源直接走 ix_article_feed_published，源内已按 (时间, id) 有序
+    if feed_ids and len(feed_ids) == 1:
+        conditions.append(Article.feed_id == feed_ids[0])
+    elif feed_ids:
+        # 多个源时 feed_id IN (...) 会读出这些源的全部文章再排序；
+        # 改为每个源按索引各取前 limit 条，只对这 源数 × limit 个候选 ID 合并排序
+        candidate_query = select(Article.id).join(Feed) if category else select(Article.id)
+        per_feed = [
+            candidate_query.where(Article.feed_id == feed_id, *conditions).order_by(*order_by).limit(limit).subquery()
+            for feed_id in feed_ids
+        ]
+        candidates = union_all(*(select(subquery.c.id) for subquery in per_feed))
+        conditions = [Article.id.in_(candidates)]
+
+    # 只投影响应需要的列（正文动辄几十 KB，列表页不需要）；
+    # 已经 JOIN 了 feed，直接用 JOIN 的结果填充 article.feed，不再额外发一次 SELECT
+    return (
+        select(Article)
+        .join(Feed)
+        .options(
+            load_only(*ARTICLE_LIST_COLUMNS),
+            contains_eager(Article.feed).load_only(*FEED_LIST_COLUMNS),
+        )
+        .where(*conditions)
+        .order_by(*order_by)
+        .limit(limit)
+    )
+
+
+def get_articles(
+    session: Session,
+    limit: int = 50,
+    category: Optional[str] = None,
+    days: Optional[int] = None,
+    date: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    after: Optional[ArticleCursor] = None,
+    feed_ids: Optional[Sequence[int]] = None,
+) -> List[Article]:
+    """
+    获取文章列表
+
+    Args:
+        session: 数据库会话
+        limit: 返回数量限制
+        category: 按分类筛选
+        days: 获取最近几天的文章
+        date: 指定具体日期（YYYY-MM-DD 格式）
+        start_date: 开始日期（YYYY-MM-DD 格式）
+        end_date: 结束日期（YYYY-MM-DD 格式）
+        after: 翻页游标，上一页最后一篇文章的 (published_at, id)（见 decode_article_cursor）
+        feed_ids: 只返回这些订阅源的文章
+
+    Returns:
+        Article 对象列表（只加载 ARTICLE_LIST_COLUMNS，访问其他列会触发额外查询）
+
+    日期过滤优先级:
+        1. date - 如果指定，只返回该日期的文章
+        2. start_date 和 end_date - 如果指定，返回该范围内的文章
+        3. days - 返回最近 N 天的文章
+        4. 无过滤 - 返回所有文章（受 limit 限制）
+    """
+    statement = build_articles_query(
+        limit=limit,
+        category=category,
+        days=days,
+        date=date,
+        start_date=start_date,
+        end_date=end_date,
+        after=after,
+        feed_ids=feed_ids,
+    )
+    results = list(session.exec(statement).all())
+
+    # 行值比较取不到发布时间为空的文章：有发布时间的部分翻完后，接着取空值部分（有日期过滤时它们本就不匹配）
+    has_date_filter = date or start_date or end_date or (days and days > 0)
+    if after and after[0] is not None and len(results) < limit and not has_date_filter:
+        statement = build_articles_query(
+            limit=limit - len(results), category=category, after=(None, None), feed_ids=feed_ids
+        )
+        results.extend(session.exec(statement).all())
+
     logger.info(f"查询到 {len(results)} 篇文章")
-    return list(results)
+    return results
+
+
+def count_articles(
+    session: Session,
+    category: Optional[str] = None,
+    days: Optional[int] = None,
+    date: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    feed_ids: Optional[Sequence[int]] = None,
+) -> int:
+    """
+    统计符合筛选条件的文章数（筛选参数与 get_articles 相同）
+
+    Raises:
+        ValueError: 日期格式错误
+    """
+    statement = select(func.count()).select_from(Article)
+    if category:
+        statement = statement.join(Feed).where(Feed.category == category)
+    conditions = article_date_conditions(days=days, date=date, start_date=start_date, end_date=end_date)
+    if feed_ids:
+        conditions.append(Article.feed_id.in_(feed_ids))
+    if conditions:
+        statement = statement.where(*conditions)
+    return session.exec(statement).one()
+
+
+def encode_article_cursor(article: Article) -> str:
+    """
+    把文章的排序键编码为不透明的翻页游标
+
+    Args:
+        article: 当前页的最后一篇文章
+
+    Returns:
+        URL 安全的游标字符串
+    """
+    published_at = article.published_at.isoformat() if article.published_at else None
+    payload = json.dumps([published_at, article.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_article_cursor(cursor: str) -> ArticleCursor:
+    """
+    解析翻页游标
+
+    Returns:
+        (published_at, id)
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        published_at, article_id = json.loads(payload)
+        if not isinstance(article_id, int):
+            raise TypeError(article_id)
+        return (datetime.fromisoformat(published_at) if published_at else None), article_id
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"无效的翻页游标: {cursor}") from e
 
 
 def article_exists(session: Session, link: str) -> bool:
-    """检查文章是否已存在"""
-    article = get_article_by_link(session, link)
-    return article is not None
+    """检查文章是否已存在（只查 id，不加载整行）"""
+    statement = select(Article.id).where(Article.link == link).limit(1)
+    return session.exec(statement).first() is not None
+
+
+# SQLite 单条语句绑定参数上限（旧版本为 999），IN 查询按此分块
+LINK_LOOKUP_CHUNK_SIZE = 500
+
+
+def get_existing_links(session: Session, links: Iterable[str]) -> Set[str]:
+    """
+    批量查询已存在的文章链接（用于去重）
+
+    按块执行 SELECT link ... WHERE link IN (...)，借助 link 唯一索引，
+    只返回链接列，不加载 content 等大字段。
+
+    Args:
+        session: 数据库会话
+        links: 待检查的链接
+
+    Returns:
+        其中已存在于数据库的链接集合
+    """
+    unique_links = list(dict.fromkeys(link for link in links if link))
+    existing: Set[str] = set()
+    for start in range(0, len(unique_links), LINK_LOOKUP_CHUNK_SIZE):
+        chunk = unique_links[start:start + LINK_LOOKUP_CHUNK_SIZE]
+        statement = select(Article.link).where(Article.link.in_(chunk))
+        existing.update(session.exec(statement).all())
+    return existing
+
+
+# 多行 INSERT 每块行数：10 列 × 200 行远低于 SQLite 32766 个绑定参数的上限
+ARTICLE_INSERT_CHUNK_SIZE = 200
+
+
+def bulk_insert_articles(session: Session, rows: List[dict]) -> List[Tuple[int, str]]:
+    """
+    批量插入文章，链接冲突的行静默忽略
+
+    使用 INSERT ... ON CONFLICT(link) DO NOTHING RETURNING id, link，
+    多行一条语句写入；两次抓取并发写入同一链接时不会抛出唯一约束错误。
+    不会提交事务，由调用方负责 commit。
+
+    正文（content 原始内容 / content_text 纯文本）不在 article 表中，
+    只为实际插入的行压缩写入 article_content 表。
+
+    Args:
+        session: 数据库会话
+        rows: 文章行（各行键需一致，可含 content / content_text）
+
+    Returns:
+        实际插入的 (id, link) 列表
+    """
+    table = Article.__table__
+    article_rows = [{key: value for key, value in row.items() if key in table.c} for row in rows]
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        insert = None
+
+    if insert is None:
+        inserted = _insert_articles_one_by_one(session, article_rows)
+    else:
+        inserted = []
+        for start in range(0, len(article_rows), ARTICLE_INSERT_CHUNK_SIZE):
+            chunk = article_rows[start:start + ARTICLE_INSERT_CHUNK_SIZE]
+            statement = (
+                insert(table)
+                .values(chunk)
+                .on_conflict_do_nothing(index_elements=[table.c.link])
+                .returning(table.c.id, table.c.link)
+            )
+            inserted.extend((row.id, row.link) for row in session.execute(statement))
+
+    rows_by_link = {row["link"]: row for row in rows}
+    store_contents(session, [{**rows_by_link[link], "id": article_id} for article_id, link in inserted])
+    return inserted
+
+
+def _insert_articles_one_by_one(session: Session, rows: List[dict]) -> List[Tuple[int, str]]:
+    """不支持 ON CONFLICT 的数据库：逐条 SAVEPOINT 插入，冲突仅回滚该条"""
+    from sqlalchemy.exc import IntegrityError
+
+    inserted: List[Tuple[int, str]] = []
+    for row in rows:
+        article = Article(**row)
+        try:
+            with session.begin_nested():
+                session.add(article)
+                session.flush()
+            inserted.append((article.id, article.link))
+        except IntegrityError:
+            logger.debug(f"文章已存在，跳过: {row['link']}")
+    return inserted
 
 
 def update_article_summary(session: Session, article_id: int, summary: str) -> Optional[Article]:
@@ -58,6 +58,10 @@ def create_db_and_tables():
     try:
         SQLModel.metadata.create_all(engine)
         logger.info("数据库表创建成功")
+
+        # 全文索引（FTS5 虚拟表不在 SQLModel 元数据中；首次创建时回填存量文章）
+        from app.services.search import ensure_search_index
+        ensure_search_index(engine)
     except Exception as e:
         logger.error(f"创建数据库表失败: {e}")
         raise
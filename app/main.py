@@ -10,6 +10,16 @@ from pathlib import Path
 from app.database import create_db_and_tables, init_default_feeds, engine
 from app.api.routes import router
 from app.scheduler import start_scheduler, stop_scheduler, get_scheduler_status
+from app.services.llm_client import close_llm_client
+from app.services.llm_providers import llm_configured
+from app.services.summary_worker import (
+    start_summary_worker,
+    stop_summary_worker,
+    get_summary_worker_status,
+)
+from app.services.response_cache import response_cache
+from app.services.rss_snapshots import rss_snapshots
+from app.services.summary_cache import flush_hit_counts
 from app.config import settings
 from app.security.logger import setup_secure_logging
 from app.security.middleware import SecurityHeadersMiddleware
@@ -59,9 +69,16 @@ async def lifespan(app: FastAPI):
     with Session(engine) as session:
         init_default_feeds(session)
 
+    # 加载上次运行落盘的 RSS 快照（核对数据水位），重启后的第一次订阅请求不用重新生成
+    with Session(engine) as session:
+        rss_snapshots.load(session)
+
     # 启动定时任务调度器
     start_scheduler()
 
+    # 启动摘要 worker（消费抓取阶段入队的摘要任务）
+    start_summary_worker()
+
     logger.info("应用启动完成")
 
     yield
@@ -69,6 +86,9 @@ async def lifespan(app: FastAPI):
     # 关闭时执行
     logger.info("应用关闭中...")
     stop_scheduler()
+    await stop_summary_worker()
+    flush_hit_counts()
+    await close_llm_client()
     logger.info("应用已关闭")
 
 
@@ -87,6 +107,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link"],  # 文章列表翻页游标
 )
 
 # 添加安全响应头中间件
@@ -146,9 +167,12 @@ def get_status():
     return {
         "status": "running",
         "scheduler": scheduler_status,
+        "summary_worker": get_summary_worker_status(),
+        "response_cache": response_cache.stats(),
+        "rss_snapshots": rss_snapshots.stats(),
         "database": settings.database_url,
         "fetch_interval_hours": settings.fetch_interval_hours,
-        "llm_configured": bool(settings.openai_api_key),
+        "llm_configured": llm_configured(),
     }
 
 
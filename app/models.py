@@ -5,6 +5,13 @@
 from datetime import datetime
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, LargeBinary
+
+
+# 摘要模式：llm 调用大模型生成；extractive 入库时本地抽取，不消耗 API（适合低价值订阅源）
+SUMMARY_MODE_LLM = "llm"
+SUMMARY_MODE_EXTRACTIVE = "extractive"
+SUMMARY_MODES = (SUMMARY_MODE_LLM, SUMMARY_MODE_EXTRACTIVE)
 
 
 class Feed(SQLModel, table=True):
@@ -15,6 +22,11 @@ class Feed(SQLModel, table=True):
     url: str = Field(unique=True, description="RSS 源 URL")
     category: str = Field(index=True, default="tech", description="分类")
     is_active: bool = Field(default=True, description="是否启用")
+    summary_mode: str = Field(default=SUMMARY_MODE_LLM, description="摘要模式：llm / extractive")
+    summary_priority: float = Field(default=1.0, description="摘要优先级权重（大于 1 的源在积压时优先生成摘要）")
+    etag: Optional[str] = Field(default=None, description="上次抓取响应的 ETag（条件请求用）")
+    last_modified: Optional[str] = Field(default=None, description="上次抓取响应的 Last-Modified（条件请求用）")
+    content_hash: Optional[str] = Field(default=None, description="上次抓取响应体的 SHA-256")
     created_at: datetime = Field(default_factory=datetime.now, description="创建时间")
     updated_at: datetime = Field(default_factory=datetime.now, description="更新时间")
 
@@ -33,28 +45,40 @@ class Feed(SQLModel, table=True):
 
 
 class Article(SQLModel, table=True):
-    """文章数据模型"""
+    """
+    文章数据模型
+
+    只保存元数据与摘要；正文体积大、访问少，压缩后存放在 article_content 表中按需读取，
+    主表保持紧凑，按 published_at 的范围扫描能留在 SQLite 页缓存内。
+    """
 
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(index=True, description="文章标题")
     link: str = Field(unique=True, description="文章链接")
-    content: Optional[str] = Field(default=None, description="原始内容")
     summary: Optional[str] = Field(default=None, description="AI 中文总结")
     summary_en: Optional[str] = Field(default=None, description="AI 英文总结")
     qr_code_url: Optional[str] = Field(default=None, description="二维码图片URL")
-    published_at: Optional[datetime] = Field(default=None, index=True, description="发布时间")
+    simhash: Optional[int] = Field(default=None, index=True, description="正文 SimHash 指纹（近似去重用）")
+    published_at: Optional[datetime] = Field(default=None, description="发布时间")
     feed_id: int = Field(foreign_key="feed.id", description="所属 RSS 源 ID")
     created_at: datetime = Field(default_factory=datetime.now, description="创建时间")
 
     # 关联关系
     feed: Optional[Feed] = Relationship(back_populates="articles")
 
+    # 列表查询都按 (published_at, id) 降序取前 N 条（id 决定同一时间文章的顺序，也是翻页游标的一部分）：
+    # (published_at, id, feed_id) 按时间倒序扫描，JOIN feed 所需的 feed_id 直接取自索引，不匹配分类的行不回表；
+    # (feed_id, published_at) 服务按订阅源过滤（索引隐含 rowid，同一源内已按 (时间, id) 有序），也是外键 feed_id 的索引
+    __table_args__ = (
+        Index("ix_article_published_id", "published_at", "id", "feed_id"),
+        Index("ix_article_feed_published", "feed_id", "published_at"),
+    )
+
     class Config:
         json_schema_extra = {
             "example": {
                 "title": "Sample Article",
                 "link": "https://example.com/article",
-                "content": "Full article content...",
                 "summary": "AI generated summary...",
                 "published_at": "2025-12-25T10:00:00",
                 "feed_id": 1,
@@ -62,6 +86,100 @@ class Article(SQLModel, table=True):
         }
 
 
+class ArticleContent(SQLModel, table=True):
+    """
+    文章正文（压缩存储）
+
+    与 article 一对一；原始 HTML 与清洗后的纯文本分别压缩，codec 记录压缩算法，
+    只有摘要、导出与单篇文章详情才读取。
+    """
+
+    __tablename__ = "article_content"
+
+    article_id: int = Field(foreign_key="article.id", primary_key=True)
+    codec: str = Field(default="zlib", description="压缩算法：zlib / zstd / none")
+    raw: Optional[bytes] = Field(default=None, sa_type=LargeBinary, description="压缩后的原始内容")
+    text: Optional[bytes] = Field(default=None, sa_type=LargeBinary, description="压缩后的清洗纯文本")
+    raw_size: int = Field(default=0, description="原始内容未压缩字节数")
+    text_size: int = Field(default=0, description="清洗纯文本未压缩字节数")
+
+
+class ArticleSimhashBand(SQLModel, table=True):
+    """
+    SimHash 分桶索引
+
+    每篇文章的 64 位指纹拆成 4 段 16 位，各占一行；
+    近似重复查询按段值等值查找候选，不随文章总数线性增长。
+    """
+
+    __tablename__ = "article_simhash_band"
+    __table_args__ = (Index("ix_article_simhash_band_key_created", "band_key", "created_at"),)
+
+    article_id: int = Field(foreign_key="article.id", primary_key=True)
+    band_key: int = Field(primary_key=True, description="段序号 << 16 | 段值")
+    created_at: datetime = Field(default_factory=datetime.now, description="文章入库时间")
+
+
+class SummaryTask(SQLModel, table=True):
+    """
+    摘要任务队列
+
+    抓取时为新文章入队，由常驻的摘要 worker 按自身节奏消费；
+    租约超时的任务视为 worker 崩溃，重新回到 pending。
+    按 priority 从高到低领取：越新、所属源权重越高、被 API 返回次数越多的文章越先生成摘要。
+    """
+
+    __tablename__ = "summary_task"
+    __table_args__ = (
+        Index("ix_summary_task_status_available", "status", "available_at"),
+        Index("ix_summary_task_status_priority", "status", "priority"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    article_id: int = Field(foreign_key="article.id", unique=True, description="文章 ID")
+    status: str = Field(default="pending", description="状态：pending / leased / failed")
+    priority: float = Field(default=0.0, description="领取优先级（以小时计的时间分，越大越先处理）")
+    attempts: int = Field(default=0, description="已尝试次数")
+    last_error: Optional[str] = Field(default=None, description="最近一次失败原因")
+    available_at: datetime = Field(default_factory=datetime.now, description="最早可领取时间（重试退避）")
+    lease_expires_at: Optional[datetime] = Field(default=None, description="租约到期时间")
+    created_at: datetime = Field(default_factory=datetime.now, description="入队时间")
+    updated_at: datetime = Field(default_factory=datetime.now, description="更新时间")
+
+
+class LLMRateBucket(SQLModel, table=True):
+    """
+    LLM 调用令牌桶状态
+
+    存在数据库中，使应用内的摘要 worker、抓取接口与命令行脚本等多个进程共享同一份 RPM/TPM 配额。
+    """
+
+    __tablename__ = "llm_rate_bucket"
+
+    name: str = Field(primary_key=True, description="桶名称（requests / tokens）")
+    tokens: float = Field(description="当前剩余令牌（可为负，表示超额请求欠下的令牌）")
+    updated_at: float = Field(description="上次补充令牌的 Unix 时间戳")
+
+
+class SummaryCache(SQLModel, table=True):
+    """
+    摘要缓存
+
+    以（规范化标题 + 提示词实际使用的正文 + 提示词版本 + 摘要模式）的哈希为键，
+    同文转载或重复生成时直接复用，避免重复调用 LLM。
+    """
+
+    __tablename__ = "summary_cache"
+
+    key: str = Field(primary_key=True, description="缓存键（SHA-256）")
+    summary: Optional[str] = Field(default=None, description="中文摘要")
+    summary_en: Optional[str] = Field(default=None, description="英文摘要")
+    model: str = Field(description="生成摘要的模型")
+    prompt_version: str = Field(description="提示词版本")
+    hit_count: int = Field(default=0, description="命中次数")
+    created_at: datetime = Field(default_factory=datetime.now, index=True, description="创建时间")
+
+
 # API 响应模型
 class FeedCreate(SQLModel):
     """创建 Feed 的请求模型"""
@@ -70,6 +188,8 @@ class FeedCreate(SQLModel):
     url: str
     category: str = "tech"
     is_active: bool = True
+    summary_mode: str = SUMMARY_MODE_LLM
+    summary_priority: float = 1.0
 
 
 class FeedResponse(SQLModel):
@@ -80,6 +200,8 @@ class FeedResponse(SQLModel):
     url: str
     category: str
     is_active: bool
+    summary_mode: str = SUMMARY_MODE_LLM
+    summary_priority: float = 1.0
     created_at: datetime
 
 
@@ -98,3 +220,22 @@ class ArticleResponse(SQLModel):
     feed_category: Optional[str] = None  # 来源分类
     feed_url: Optional[str] = None  # 来源RSS URL
     created_at: datetime
+
+
+class ArticleCountResponse(SQLModel):
+    """文章计数响应模型"""
+
+    total: int
+
+
+class ArticleSearchResult(ArticleResponse):
+    """全文搜索结果（含命中片段与相关度）"""
+
+    snippet: Optional[str] = None  # 命中片段，命中词以 <mark></mark> 标出
+    score: Optional[float] = None  # BM25 相关度（越大越相关；只有短词的查询为空）
+
+
+class ArticleDetailResponse(ArticleResponse):
+    """单篇文章详情响应模型（含正文）"""
+
+    content: Optional[str] = None  # 清洗后的纯文本正文
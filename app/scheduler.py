@@ -8,6 +8,10 @@ from sqlmodel import Session
 from app.database import engine
 from app.services.rss_fetcher import fetch_all_feeds
 from app.crud import prune_api_request_logs
+from app.services.summary_cache import flush_hit_counts, prune_summary_cache
+from app.services.summary_queue import flush_article_views
+from app.services.near_dup import prune_simhash_bands
+from app.services.rss_snapshots import rss_snapshots
 from app.config import settings
 import logging
 import signal
@@ -36,7 +40,13 @@ def scheduled_fetch_job():
             with Session(engine) as session:
                 # 先清理过期 API 请求日志，控制表体积与写入放大
                 prune_api_request_logs(session)
+                prune_summary_cache(session)
+                flush_hit_counts()
+                flush_article_views(session)
+                prune_simhash_bands(session)
                 stats = fetch_all_feeds(session)
+                # 重新渲染有新文章的分类的 RSS 快照
+                rss_snapshots.rebuild(session)
                 result["completed"] = True
                 result["stats"] = stats
         except Exception as e:
@@ -61,6 +71,19 @@ def scheduled_fetch_job():
     logger.info("=== 定时任务执行结束 ===")
 
 
+def scheduled_snapshot_job():
+    """
+    定时任务：重建被作废的 RSS 快照
+
+    摘要由 worker 在抓取之后陆续写入，每批写入会作废所属分类的快照，这里定期补齐
+    """
+    try:
+        with Session(engine) as session:
+            rss_snapshots.rebuild(session)
+    except Exception as e:
+        logger.error(f"重建 RSS 快照失败: {e}")
+
+
 def start_scheduler():
     """
     启动调度器
@@ -80,6 +103,16 @@ def start_scheduler():
             max_instances=1,  # 防止任务重叠执行
             misfire_grace_time=300,  # 错过任务的宽限时间（秒）
         )
+        if settings.rss_snapshot_enabled:
+            scheduler.add_job(
+                func=scheduled_snapshot_job,
+                trigger=IntervalTrigger(seconds=settings.rss_snapshot_refresh_seconds),
+                id="rss_snapshot_job",
+                name="RSS 快照重建任务",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
 
         # 启动调度器
         scheduler.start()
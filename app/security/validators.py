@@ -9,6 +9,7 @@ from typing import Optional
 from fastapi import HTTPException, status
 from pydantic import field_validator, BaseModel
 from app.config import settings
+from app.models import SUMMARY_MODE_LLM, SUMMARY_MODES
 import logging
 
 logger = logging.getLogger(__name__)
@@ -95,6 +96,8 @@ class FeedCreateValidated(BaseModel):
     url: str
     category: str = "tech"
     is_active: bool = True
+    summary_mode: str = SUMMARY_MODE_LLM
+    summary_priority: float = 1.0
 
     @field_validator("name")
     @classmethod
@@ -128,3 +131,19 @@ class FeedCreateValidated(BaseModel):
     def validate_url_field(cls, v: str) -> str:
         """验证 URL 字段"""
         return URLValidator.validate_url(v, "RSS 源 URL")
+
+    @field_validator("summary_mode")
+    @classmethod
+    def validate_summary_mode(cls, v: str) -> str:
+        """验证摘要模式字段"""
+        if v not in SUMMARY_MODES:
+            raise ValueError(f"摘要模式只能是 {' / '.join(SUMMARY_MODES)}")
+        return v
+
+    @field_validator("summary_priority")
+    @classmethod
+    def validate_summary_priority(cls, v: float) -> float:
+        """验证摘要优先级权重字段"""
+        if not 0 < v <= 100:
+            raise ValueError("摘要优先级权重必须在 0 到 100 之间（不含 0）")
+        return v
@@ -0,0 +1,46 @@
+"""
+数据变更后的缓存失效
+
+文章、摘要、RSS 源的写入提交后，由写入方（抓取、摘要 worker、摘要重建脚本、路由）调用这里，
+使接口响应缓存与 RSS 快照失效。crud 只负责读写数据库，不依赖缓存服务。
+"""
+from typing import Iterable
+from sqlmodel import Session, select
+from app.models import Article, Feed
+from app.services.response_cache import bump_data_version, category_scope, feed_scope
+from app.services.rss_snapshots import rss_snapshots
+
+
+def mark_articles_changed(
+    session: Session,
+    feed_ids: Iterable[int] = (),
+    article_ids: Iterable[int] = (),
+) -> None:
+    """
+    文章变更已提交：使所属分类、订阅源的缓存响应失效，并作废这些分类的 RSS 快照
+
+    其他分类的缓存响应与快照不受影响。
+
+    Args:
+        session: 数据库会话
+        feed_ids: 写入了新文章的订阅源
+        article_ids: 摘要等字段有变化的文章
+    """
+    feed_ids, article_ids = set(feed_ids), set(article_ids)
+    feeds = set()
+    if feed_ids:
+        feeds.update(session.exec(select(Feed.id, Feed.category).where(Feed.id.in_(feed_ids))).all())
+    if article_ids:
+        statement = select(Feed.id, Feed.category).join(Article).where(Article.id.in_(article_ids)).distinct()
+        feeds.update(session.exec(statement).all())
+    if not feeds:
+        return
+    categories = {category for _, category in feeds}
+    bump_data_version([feed_scope(feed_id) for feed_id, _ in feeds] + [category_scope(c) for c in categories])
+    rss_snapshots.invalidate(categories)
+
+
+def mark_feeds_changed() -> None:
+    """RSS 源增改已提交：源名称、分类会出现在所有包含该源文章的输出中，全部缓存响应与快照失效"""
+    bump_data_version()
+    rss_snapshots.invalidate()
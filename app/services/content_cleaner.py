@@ -0,0 +1,165 @@
+"""
+正文清洗
+入库时把 RSS 条目中的 HTML 一次性转换为纯文本：流式解析（标准库 HTMLParser，逐标签处理、不构建 DOM），
+去掉 script/style、导航、分享按钮、评论区等非正文区块，以及订阅引导、版权声明等样板句子。
+
+清洗结果压缩存入 article_content.text，摘要、近似去重与搜索都直接使用，不再各自反复跑正则去标签。
+"""
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 整个区块（含子节点）都不是正文的标签
+SKIP_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "nav", "aside", "footer", "header", "form", "button", "select", "textarea",
+})
+# 自闭合标签：没有结束标签，不能作为跳过区块的起点
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+})
+# 块级标签：前后断段
+BLOCK_TAGS = frozenset({
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote",
+    "pre", "table", "tr", "section", "article", "figure", "figcaption", "dd", "dt", "hr",
+})
+# class / id 命中这些关键词的区块视为分享、推荐、评论、广告等挂件
+_WIDGET_RE = re.compile(
+    r"\b(share|sharing|social|related|recommend|comments?|advert|ads?|sponsor|newsletter|"
+    r"subscribe|sidebar|breadcrumbs?|menu|navbar|footer|toolbar|popup|modal)\b",
+    re.I,
+)
+# 只有较短的句子才按样板文字过滤，避免误删正文
+BOILERPLATE_MAX_CHARS = 200
+_BOILERPLATE_RE = re.compile(
+    r"subscribe to (our|the)|our newsletter|follow us|sign up for|all rights reserved|share this|"
+    r"read more|continue reading|appeared first on|"
+    r"关注(我们|公众号)|订阅(我们|本站)|版权(所有|归)|转载请|如有侵权|点击(阅读|查看)原文|扫码|责任编辑",
+    re.I,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+# 按句末标点切分，片段拼接后与原文完全一致
+_SENTENCE_PIECE_RE = re.compile(r"[^。！？!?.]*[。！？!?.]+\s*|[^。！？!?.]+$")
+
+
+class _TextExtractor(HTMLParser):
+    """流式提取正文文本：跳过非正文区块，块级标签处断段"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[str] = []
+        self._buffer: List[str] = []
+        # 被跳过区块的起始标签及其同名嵌套层数；只数同名标签，不受区块内未闭合的 <p>/<li> 影响
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+
+    def _break(self) -> None:
+        if self._buffer:
+            self.paragraphs.append("".join(self._buffer))
+            self._buffer = []
+
+    def _is_widget(self, attrs) -> bool:
+        for name, value in attrs:
+            if name in ("class", "id", "role") and value and _WIDGET_RE.search(value):
+                return True
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag not in VOID_TAGS and (tag in SKIP_TAGS or self._is_widget(attrs)):
+            self._break()
+            self._skip_tag, self._skip_depth = tag, 1
+            return
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/> 等自闭合写法：不进入跳过区块
+        if not self._skip_tag and tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_endtag(self, tag):
+        if self._skip_tag:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_data(self, data):
+        if not self._skip_tag:
+            self._buffer.append(data)
+
+    def close(self):
+        super().close()
+        self._break()
+
+
+def _strip_boilerplate(paragraph: str) -> str:
+    """去掉段落中的订阅引导、版权声明等样板句子（RSS 摘要常把它们接在正文后面）"""
+    if not _BOILERPLATE_RE.search(paragraph):
+        return paragraph
+    pieces = _SENTENCE_PIECE_RE.findall(paragraph)
+    kept = [
+        piece for piece in pieces
+        if not (len(piece) <= BOILERPLATE_MAX_CHARS and _BOILERPLATE_RE.search(piece))
+    ]
+    return "".join(kept).strip()
+
+
+def _normalize(paragraphs) -> List[str]:
+    """合并段内空白，去掉空段与样板句子"""
+    result = []
+    for paragraph in paragraphs:
+        paragraph = _strip_boilerplate(_WHITESPACE_RE.sub(" ", paragraph).strip())
+        if paragraph:
+            result.append(paragraph)
+    return result
+
+
+def html_to_paragraphs(content: Optional[str]) -> List[str]:
+    """
+    把 HTML（或纯文本）转换为正文段落列表
+
+    Args:
+        content: RSS 条目内容
+
+    Returns:
+        段落列表（已去掉非正文区块与样板句子）
+    """
+    if not content:
+        return []
+    if "<" not in content and "&" not in content:
+        # 纯文本：按换行分段即可，不必过一遍解析器
+        return _normalize(content.split("\n"))
+
+    parser = _TextExtractor()
+    try:
+        parser.feed(content)
+        parser.close()
+    except Exception as e:
+        # HTMLParser 对残缺标记很宽容，这里只兜底极端输入
+        logger.warning(f"HTML 解析失败，按纯文本处理: {e}")
+        return _normalize(re.sub(r"<[^>]+>", "\n", content).split("\n"))
+    return _normalize(parser.paragraphs)
+
+
+def clean_html(content: Optional[str]) -> str:
+    """
+    把 HTML 转换为清洗后的纯文本（段落之间以换行分隔）
+
+    Args:
+        content: RSS 条目内容
+
+    Returns:
+        纯文本；没有正文时返回空字符串
+    """
+    return "\n".join(html_to_paragraphs(content))
@@ -0,0 +1,165 @@
+"""
+文章正文存储
+正文（原始 HTML 与清洗后的纯文本）压缩后存放在 article_content 表，与 article 元数据分离：
+列表、RSS 与统计查询扫描的主表保持紧凑，只有摘要、导出与单篇详情才按需读取并解压正文。
+
+压缩算法按配置 content_compression 选择：zlib（默认，标准库）/ zstd（需安装 zstandard，更快、压缩率更高）/ none。
+每行记录自己的 codec，切换配置后新旧数据可以混存。
+"""
+import importlib.util
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+from sqlmodel import Session, select
+from app.models import ArticleContent
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+CODEC_NONE = "none"
+# zlib 压缩级别：6 为压缩率与速度的折中，正文多为重复度高的 HTML，压缩率通常在 3~5 倍
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+# 每条 INSERT / IN 查询的行数（article_content 6 列，远低于 SQLite 绑定参数上限）
+CHUNK_SIZE = 500
+
+
+@lru_cache(maxsize=1)
+def _zstd():
+    """zstandard 模块；未安装时返回 None"""
+    if importlib.util.find_spec("zstandard") is None:
+        logger.warning("未安装 zstandard（pip install zstandard），正文压缩使用 zlib")
+        return None
+    import zstandard
+    return zstandard
+
+
+def _active_codec() -> str:
+    codec = settings.content_compression
+    if codec == CODEC_ZSTD and _zstd() is None:
+        return CODEC_ZLIB
+    return codec if codec in (CODEC_ZLIB, CODEC_ZSTD, CODEC_NONE) else CODEC_ZLIB
+
+
+def compress(text: Optional[str], codec: str) -> Optional[bytes]:
+    """按指定算法压缩文本；空文本返回 None"""
+    if not text:
+        return None
+    data = text.encode("utf-8")
+    if codec == CODEC_ZSTD:
+        return _zstd().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if codec == CODEC_NONE:
+        return data
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(blob: Optional[bytes], codec: str) -> Optional[str]:
+    """解压为文本；blob 为空返回 None"""
+    if blob is None:
+        return None
+    if codec == CODEC_ZSTD:
+        zstd = _zstd()
+        if zstd is None:
+            raise RuntimeError("正文使用 zstd 压缩，但未安装 zstandard")
+        data = zstd.ZstdDecompressor().decompress(blob)
+    elif codec == CODEC_NONE:
+        data = blob
+    else:
+        data = zlib.decompress(blob)
+    return data.decode("utf-8")
+
+
+def make_content_row(article_id: int, raw: Optional[str], text: Optional[str]) -> dict:
+    """
+    构造 article_content 表的一行
+
+    Args:
+        article_id: 文章 ID
+        raw: 原始内容（store_raw_content 关闭时不保存）
+        text: 清洗后的纯文本
+    """
+    codec = _active_codec()
+    raw = raw if settings.store_raw_content else None
+    return {
+        "article_id": article_id,
+        "codec": codec,
+        "raw": compress(raw, codec),
+        "text": compress(text, codec),
+        "raw_size": len(raw.encode("utf-8")) if raw else 0,
+        "text_size": len(text.encode("utf-8")) if text else 0,
+    }
+
+
+def store_contents(session: Session, rows: Iterable[dict]) -> int:
+    """
+    为新插入的文章写入正文（不提交）
+
+    Args:
+        session: 数据库会话
+        rows: 已带 id 的文章行（含 content 原始内容与 content_text 纯文本）
+
+    Returns:
+        写入的行数
+    """
+    content_rows = [
+        make_content_row(row["id"], row.get("content"), row.get("content_text"))
+        for row in rows
+        if row.get("content") or row.get("content_text")
+    ]
+    table = ArticleContent.__table__
+    for start in range(0, len(content_rows), CHUNK_SIZE):
+        session.execute(table.insert(), content_rows[start:start + CHUNK_SIZE])
+    return len(content_rows)
+
+
+def decode_text(text: Optional[bytes], raw: Optional[bytes], codec: Optional[str]) -> str:
+    """
+    从 article_content 的列值得到纯文本：优先清洗后的文本，缺失时清洗原始内容
+
+    Returns:
+        纯文本；没有正文时返回空字符串
+    """
+    if codec is None:
+        return ""
+    value = decompress(text, codec)
+    if value is None and raw is not None:
+        from app.services.content_cleaner import clean_html
+        value = clean_html(decompress(raw, codec))
+    return value or ""
+
+
+def load_texts(session: Session, article_ids: Iterable[int]) -> Dict[int, str]:
+    """
+    批量读取文章的纯文本正文
+
+    Returns:
+        {文章 ID: 纯文本}，没有正文的文章不在其中
+    """
+    article_ids = list(dict.fromkeys(article_ids))
+    texts: Dict[int, str] = {}
+    for start in range(0, len(article_ids), CHUNK_SIZE):
+        chunk = article_ids[start:start + CHUNK_SIZE]
+        rows = session.exec(
+            select(ArticleContent.article_id, ArticleContent.codec, ArticleContent.text, ArticleContent.raw)
+            .where(ArticleContent.article_id.in_(chunk))
+        ).all()
+        for row in rows:
+            texts[row.article_id] = decode_text(row.text, row.raw, row.codec)
+    return texts
+
+
+def load_content(session: Session, article_id: int) -> Tuple[Optional[str], Optional[str]]:
+    """
+    读取单篇文章的正文
+
+    Returns:
+        (原始内容, 纯文本)，不存在时为 (None, None)
+    """
+    row = session.get(ArticleContent, article_id)
+    if row is None:
+        return None, None
+    return decompress(row.raw, row.codec), decode_text(row.text, row.raw, row.codec) or None
+
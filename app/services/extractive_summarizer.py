@@ -0,0 +1,191 @@
+"""
+本地抽取式摘要
+纯 CPU、无需调用 API：分句 → TF-IDF 句向量 → 余弦相似度图 → TextRank 打分，
+按原文顺序拼接得分最高的句子。
+
+用途：
+- LLM 调用失败时的降级摘要（取代截取原文开头，开头常是导语或版权声明）
+- 低价值订阅源的"无 LLM"模式，以及历史积压的批量补全（每篇毫秒级）
+"""
+import re
+from typing import List, Tuple
+import numpy as np
+from app.config import settings
+from app.services.content_cleaner import html_to_paragraphs
+import logging
+
+logger = logging.getLogger(__name__)
+
+# TextRank 阻尼系数与迭代参数
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-4
+# 少于该长度的片段不视为句子（多为图片说明、按钮文字）
+MIN_SENTENCE_CHARS = 8
+# 得分低于平均分该比例的句子不入选
+MIN_RELATIVE_SCORE = 0.5
+
+_SENTENCE_END_RE = re.compile(r"(?<=[。！？!?；;])\s*|(?<=[.])\s+(?=[A-Z0-9\"'“])")
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_CJK_RE = re.compile(r"[一-鿿]")
+_CJK_RUN_RE = re.compile(r"[一-鿿]+")
+
+# 常见英文停用词（只用于降低虚词对相似度的干扰，不求完备）
+_STOPWORDS = frozenset(
+    "a an the and or but if of at by for with about against between into through during before after "
+    "above below to from up down in out on off over under again further then once here there when where "
+    "why how all any both each few more most other some such no nor not only own same so than too very "
+    "s t can will just don should now is are was were be been being have has had having do does did "
+    "i me my we our you your he him his she her it its they them their what which who whom this that "
+    "these those am as until while also would could said says".split()
+)
+
+
+def _clean(text: str) -> str:
+    """去掉 HTML、非正文区块与样板段落，合并为一行"""
+    return " ".join(html_to_paragraphs(text))
+
+
+def _is_chinese(text: str) -> bool:
+    """中文字符数不少于英文单词数时按中文处理"""
+    return len(_CJK_RE.findall(text)) >= len(_WORD_RE.findall(text.lower()))
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    中英文分句
+
+    Args:
+        text: 纯文本
+
+    Returns:
+        句子列表（去掉过短片段）
+    """
+    sentences = [s.strip() for s in _SENTENCE_END_RE.split(text) if s and s.strip()]
+    return [s for s in sentences if len(s) >= MIN_SENTENCE_CHARS]
+
+
+def _tokens(sentence: str) -> List[str]:
+    """句子切词：英文按词（去停用词），中文按字 2-gram"""
+    lowered = sentence.lower()
+    tokens = [w for w in _WORD_RE.findall(lowered) if w not in _STOPWORDS]
+    for run in _CJK_RUN_RE.findall(sentence):
+        if len(run) == 1:
+            tokens.append(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _tfidf_matrix(sentences: List[str]) -> np.ndarray:
+    """句子 × 词 的 L2 归一化 TF-IDF 矩阵"""
+    tokenized = [_tokens(s) for s in sentences]
+    vocab = {}
+    for tokens in tokenized:
+        for token in tokens:
+            vocab.setdefault(token, len(vocab))
+
+    matrix = np.zeros((len(sentences), max(1, len(vocab))), dtype=np.float32)
+    for row, tokens in enumerate(tokenized):
+        for token in tokens:
+            matrix[row, vocab[token]] += 1.0
+
+    df = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def textrank_scores(sentences: List[str]) -> np.ndarray:
+    """
+    TextRank 句子得分
+
+    Returns:
+        与 sentences 等长的得分数组
+    """
+    count = len(sentences)
+    if count <= 2:
+        return np.ones(count, dtype=np.float32)
+
+    vectors = _tfidf_matrix(sentences)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+
+    # 行归一化为转移矩阵；孤立句子均匀跳转
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.where(row_sums > 0, similarity / np.where(row_sums == 0, 1, row_sums), 1.0 / count)
+
+    scores = np.full(count, 1.0 / count, dtype=np.float32)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / count + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+
+    # 轻微的位置先验：分数接近时偏向靠前的句子（新闻多为倒金字塔结构）
+    position_prior = 1.0 + 0.1 / (1.0 + np.arange(count))
+    return scores * position_prior
+
+
+def summarize_extractive(text: str, max_chars: int) -> str:
+    """
+    抽取式摘要
+
+    Args:
+        text: 文章内容（可含 HTML）
+        max_chars: 摘要最大字符数
+
+    Returns:
+        按原文顺序拼接的高分句子；无法分句时返回截断的原文
+    """
+    clean = _clean(text)
+    if len(clean) <= max_chars:
+        return clean
+
+    sentences = split_sentences(clean)
+    if not sentences:
+        return clean[:max_chars].rstrip() + "…"
+
+    scores = textrank_scores(sentences)
+    # 与其他句子几乎不相关的句子（订阅引导、分享按钮等）即使放得下也不用来凑字数
+    threshold = scores.mean() * MIN_RELATIVE_SCORE
+    chosen = []
+    used = 0
+    for index in np.argsort(-scores, kind="stable"):
+        if chosen and scores[index] < threshold:
+            break
+        sentence = sentences[index]
+        extra = len(sentence) + (1 if chosen else 0)
+        if used + extra > max_chars:
+            continue
+        chosen.append(int(index))
+        used += extra
+
+    if not chosen:
+        # 最高分的句子本身就超长：截断它
+        best = sentences[int(np.argmax(scores))]
+        return best[:max_chars].rstrip() + "…"
+
+    joiner = "" if _is_chinese(clean) else " "
+    return joiner.join(sentences[i] for i in sorted(chosen))
+
+
+def summarize_extractive_pair(title: str, content: str) -> Tuple[str, str]:
+    """
+    按内容语言生成抽取式摘要，返回与 LLM 摘要相同的 (zh, en) 结构
+
+    中文内容填入中文摘要，英文内容填入英文摘要（按英文摘要的长度上限）
+
+    Args:
+        title: 文章标题（正文为空时使用）
+        content: 文章内容
+
+    Returns:
+        (zh_summary, en_summary)，其中一个为空字符串
+    """
+    text = content or title or ""
+    if _is_chinese(_clean(text)):
+        return summarize_extractive(text, settings.summary_max_length), ""
+    return "", summarize_extractive(text, settings.summary_max_length * 2)
@@ -0,0 +1,86 @@
+"""
+LLM 客户端管理
+进程内共享、长连接复用的 AsyncOpenAI 客户端，避免每篇文章重新握手 TLS、重建连接池；
+服务商池中的每个服务商各自持有一个客户端
+"""
+import asyncio
+import importlib.util
+import weakref
+from typing import Dict, Optional
+import httpx
+from openai import AsyncOpenAI
+from app.config import settings
+from app.services.llm_providers import LLMProvider, get_provider_pool
+import logging
+
+logger = logging.getLogger(__name__)
+
+# httpx 的连接池绑定在创建它的事件循环上：FastAPI 主循环（摘要 worker）与
+# 命令行脚本各自的 asyncio.run 循环分别持有客户端（按服务商名称区分），循环销毁后自动释放
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+
+def _http2_enabled() -> bool:
+    """配置开启且安装了 h2 时才启用 HTTP/2（服务商不支持时 ALPN 会自动回落 HTTP/1.1）"""
+    if not settings.llm_http2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("未安装 h2（pip install httpx[http2]），LLM 客户端使用 HTTP/1.1")
+        return False
+    return True
+
+
+def _create_llm_client(provider: LLMProvider) -> AsyncOpenAI:
+    timeout = provider.timeout or settings.llm_timeout
+    http_client = httpx.AsyncClient(
+        http2=_http2_enabled(),
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        ),
+    )
+    logger.info(
+        f"创建 LLM 客户端: {provider.name} ({provider.api_base}), "
+        f"连接池上限 {settings.llm_max_connections}, "
+        f"长连接 {settings.llm_max_keepalive_connections}"
+    )
+    return AsyncOpenAI(
+        api_key=provider.api_key,
+        base_url=provider.api_base,
+        timeout=timeout,
+        http_client=http_client,
+    )
+
+
+def get_llm_client(provider: Optional[LLMProvider] = None) -> AsyncOpenAI:
+    """
+    获取当前事件循环共享的 AsyncOpenAI 客户端（需在协程中调用）
+
+    Args:
+        provider: 服务商（默认为服务商池中的第一个）
+
+    Returns:
+        AsyncOpenAI 客户端
+    """
+    provider = provider or get_provider_pool().default
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(provider.name)
+    if client is None:
+        client = _create_llm_client(provider)
+        clients[provider.name] = client
+    return client
+
+
+async def close_llm_client() -> None:
+    """
+    关闭当前事件循环的全部 LLM 客户端，释放连接池
+
+    在应用关闭（FastAPI lifespan）或脚本结束前调用
+    """
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+    if clients:
+        logger.info("LLM 客户端已关闭")
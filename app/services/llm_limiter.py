@@ -0,0 +1,146 @@
+"""
+LLM 自适应并发控制
+AIMD（加性增、乘性减）调整并发窗口：请求成功时窗口缓慢增大，
+遇到 429 限流或超时立即减半，自动贴近服务商的实际吞吐上限。
+并发槽位只覆盖单次 API 调用，重试退避等待期间不占用槽位。
+"""
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from openai import APITimeoutError, RateLimitError
+from app.config import settings
+from app.services.llm_providers import LLMProvider, get_provider_pool
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 触发窗口收缩的异常：限流与超时都说明服务商已过载
+CONGESTION_ERRORS = (RateLimitError, APITimeoutError)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD 并发限制器
+
+    - 成功：窗口 += increase / 窗口（约每完成一整个窗口的请求增大 1）
+    - 限流/超时：窗口 *= decrease，不低于 min_limit
+    - 同一次拥塞事件只收缩一次：在上次收缩之前发出的请求再失败不重复收缩
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self.success_count = 0
+        self.congestion_count = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> float:
+        """等待空闲槽位，返回占用开始时间"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return time.monotonic()
+
+    async def release(self, started_at: float, congested: bool = False, succeeded: bool = False) -> None:
+        """释放槽位并按结果调整窗口"""
+        async with self._condition:
+            self.in_flight -= 1
+            if congested:
+                self.congestion_count += 1
+                if started_at >= self._last_decrease:
+                    old = self.limit
+                    self.limit = max(float(self.min_limit), self.limit * self.decrease)
+                    self._last_decrease = time.monotonic()
+                    logger.warning(f"LLM 限流/超时，并发窗口 {old:.1f} → {self.limit:.1f}")
+            elif succeeded:
+                self.success_count += 1
+                self.limit = min(float(self.max_limit), self.limit + self.increase / self.limit)
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """占用一个并发槽位执行一次 API 调用"""
+        started_at = await self.acquire()
+        try:
+            yield
+        except CONGESTION_ERRORS:
+            await _release_shielded(self, started_at, congested=True)
+            raise
+        except BaseException:
+            await _release_shielded(self, started_at)
+            raise
+        else:
+            await _release_shielded(self, started_at, succeeded=True)
+
+    def snapshot(self) -> dict:
+        """当前窗口状态（监控用）"""
+        return {
+            "limit": round(self.limit, 2),
+            "effective_limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "successes": self.success_count,
+            "congestions": self.congestion_count,
+        }
+
+
+async def _release_shielded(limiter: AdaptiveLimiter, started_at: float, **outcome) -> None:
+    """请求被取消时也要归还槽位，否则窗口会永久泄漏"""
+    await asyncio.shield(limiter.release(started_at, **outcome))
+
+
+# asyncio.Condition 绑定事件循环：每个循环各自持有限制器（与 LLM 客户端一致），
+# 每个服务商一个窗口，互不影响
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AdaptiveLimiter]]" = weakref.WeakKeyDictionary()
+
+
+def get_llm_limiter(provider: Optional[LLMProvider] = None) -> AdaptiveLimiter:
+    """
+    获取当前事件循环上某个服务商的 LLM 并发限制器（需在协程中调用）
+
+    Args:
+        provider: 服务商（默认为服务商池中的第一个）
+
+    Returns:
+        AdaptiveLimiter 实例
+    """
+    provider = provider or get_provider_pool().default
+    limiters = _limiters.setdefault(asyncio.get_running_loop(), {})
+    limiter = limiters.get(provider.name)
+    if limiter is None:
+        limiter = AdaptiveLimiter(
+            initial=settings.max_concurrent_summaries,
+            min_limit=settings.llm_concurrency_min,
+            max_limit=provider.max_concurrency or settings.llm_concurrency_max,
+        )
+        limiters[provider.name] = limiter
+    return limiter
+
+
+def get_llm_limiter_stats() -> List[dict]:
+    """
+    获取所有事件循环上各服务商限制器的窗口状态
+
+    Returns:
+        list: 每个限制器的 snapshot()，附带服务商名称（通常只有应用主循环）
+    """
+    return [
+        {"provider": name, **limiter.snapshot()}
+        for limiters in list(_limiters.values())
+        for name, limiter in list(limiters.items())
+    ]
@@ -0,0 +1,186 @@
+"""
+LLM 服务商池
+支持配置多个 OpenAI 兼容服务商（各自的 base、key、模型、权重与限额），
+按近期 p50 延迟与错误率为每次请求排序选路，超时/限流/5xx 时自动切换到下一个，
+单个服务商变慢或宕机时摘要积压不会整体停滞。
+
+未配置 LLM_PROVIDERS 时，池中只有一个由 OPENAI_API_BASE / OPENAI_API_KEY / OPENAI_MODEL 组成的默认服务商。
+"""
+import json
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 健康统计窗口（最近 N 次调用）
+HEALTH_WINDOW = 50
+# 连续失败达到该次数后熔断一段时间，期间排到最后
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_OPEN_SECONDS = 30.0
+# 错误率对排序分数的放大系数
+ERROR_RATE_PENALTY = 4.0
+
+
+@dataclass
+class LLMProvider:
+    """单个 OpenAI 兼容服务商配置"""
+
+    name: str
+    api_base: str
+    api_key: str
+    model: str
+    weight: float = 1.0
+    max_concurrency: Optional[int] = None  # 并发窗口上限（默认 llm_concurrency_max）
+    rpm_limit: int = 0  # 该服务商单独的 RPM 配额（0 表示不单独限制）
+    tpm_limit: int = 0  # 该服务商单独的 TPM 配额（0 表示不单独限制）
+    timeout: Optional[float] = None  # 请求超时（默认 llm_timeout）
+
+
+@dataclass
+class ProviderHealth:
+    """服务商近期健康状况"""
+
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=HEALTH_WINDOW))
+    outcomes: Deque[bool] = field(default_factory=lambda: deque(maxlen=HEALTH_WINDOW))
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    last_error: Optional[str] = None
+
+    @property
+    def p50_latency(self) -> Optional[float]:
+        return statistics.median(self.latencies) if self.latencies else None
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def circuit_open(self) -> bool:
+        return time.monotonic() < self.open_until
+
+
+def load_providers() -> List[LLMProvider]:
+    """
+    从配置加载服务商列表
+
+    LLM_PROVIDERS 为 JSON 数组，例如：
+    [{"name": "deepseek", "api_base": "https://api.deepseek.com/v1", "api_key": "sk-...",
+      "model": "deepseek-chat", "weight": 2, "max_concurrency": 8, "rpm_limit": 300}]
+    解析失败或为空时退回单个默认服务商
+    """
+    if settings.llm_providers:
+        try:
+            providers = [LLMProvider(**item) for item in json.loads(settings.llm_providers)]
+            if providers:
+                return providers
+        except (ValueError, TypeError) as e:
+            logger.error(f"LLM_PROVIDERS 配置解析失败，使用默认服务商: {e}")
+    return [
+        LLMProvider(
+            name="default",
+            api_base=settings.openai_api_base,
+            api_key=settings.openai_api_key,
+            model=settings.openai_model,
+        )
+    ]
+
+
+class ProviderPool:
+    """
+    服务商池：排序选路与健康统计
+
+    排序分数 = p50 延迟 × (1 + 错误率 × 4) / 权重，越小越优先；
+    还没有延迟样本的服务商分数为 0，优先试探；熔断中的服务商排到最后（全部熔断时仍会尝试）。
+    """
+
+    def __init__(self, providers: List[LLMProvider]):
+        self.providers = providers
+        self.health: Dict[str, ProviderHealth] = {p.name: ProviderHealth() for p in providers}
+        self._lock = threading.Lock()
+
+    @property
+    def default(self) -> LLMProvider:
+        return self.providers[0]
+
+    def _score(self, provider: LLMProvider) -> float:
+        health = self.health[provider.name]
+        p50 = health.p50_latency
+        if p50 is None:
+            return 0.0
+        return p50 * (1 + health.error_rate * ERROR_RATE_PENALTY) / max(provider.weight, 0.01)
+
+    def ranked(self) -> List[LLMProvider]:
+        """按优先级排序的服务商列表（依次作为首选与故障切换目标）"""
+        with self._lock:
+            return sorted(
+                self.providers,
+                key=lambda p: (self.health[p.name].circuit_open, self._score(p)),
+            )
+
+    def record_success(self, provider: LLMProvider, latency: float) -> None:
+        with self._lock:
+            health = self.health[provider.name]
+            health.latencies.append(latency)
+            health.outcomes.append(True)
+            health.consecutive_failures = 0
+
+    def record_failure(self, provider: LLMProvider, error: Exception) -> None:
+        with self._lock:
+            health = self.health[provider.name]
+            health.outcomes.append(False)
+            health.consecutive_failures += 1
+            health.last_error = f"{type(error).__name__}: {error}"[:200]
+            if health.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+                health.open_until = time.monotonic() + CIRCUIT_OPEN_SECONDS
+                logger.warning(
+                    f"LLM 服务商 {provider.name} 连续失败 {health.consecutive_failures} 次，"
+                    f"熔断 {CIRCUIT_OPEN_SECONDS:.0f} 秒"
+                )
+
+    def stats(self) -> List[dict]:
+        """各服务商健康状况（监控用）"""
+        with self._lock:
+            result = []
+            for provider in self.providers:
+                health = self.health[provider.name]
+                p50 = health.p50_latency
+                result.append({
+                    "name": provider.name,
+                    "model": provider.model,
+                    "weight": provider.weight,
+                    "p50_latency_ms": round(p50 * 1000, 2) if p50 is not None else None,
+                    "error_rate": round(health.error_rate, 3),
+                    "calls": len(health.outcomes),
+                    "circuit_open": health.circuit_open,
+                    "last_error": health.last_error,
+                })
+            return result
+
+
+_pool: Optional[ProviderPool] = None
+_pool_signature: Optional[tuple] = None
+
+
+def get_provider_pool() -> ProviderPool:
+    """
+    获取进程内的服务商池（配置变化时重建）
+    """
+    global _pool, _pool_signature
+    signature = (settings.llm_providers, settings.openai_api_base, settings.openai_api_key, settings.openai_model)
+    if _pool is None or signature != _pool_signature:
+        _pool = ProviderPool(load_providers())
+        _pool_signature = signature
+        if len(_pool.providers) > 1:
+            logger.info(f"LLM 服务商池: {', '.join(p.name for p in _pool.providers)}")
+    return _pool
+
+
+def llm_configured() -> bool:
+    """是否配置了可用的 LLM 服务商（OPENAI_API_KEY 或 LLM_PROVIDERS 中任一服务商带 API Key）"""
+    return any(provider.api_key for provider in get_provider_pool().providers)
@@ -0,0 +1,229 @@
+"""
+LLM 调用速率限制
+请求数（RPM）与 Token 数（TPM）双令牌桶，在调用 LLM 前按需等待，
+把调用均匀摊开，而不是先突发、吃到 429 再靠 tenacity 长退避恢复。
+
+令牌桶状态保存在数据库中：应用内的摘要 worker、手动抓取接口与
+utils/regenerate_summaries.py 命令行脚本即使在不同进程中，也共用同一份配额。
+"""
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+from sqlmodel import Session, select
+from sqlalchemy import case, literal, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Engine
+from app.models import LLMRateBucket
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+REQUESTS_BUCKET = "requests"
+TOKENS_BUCKET = "tokens"
+# 单次等待的上限：配额被其他进程释放（如结算退还）时能及时重新检查
+MAX_WAIT_SECONDS = 5.0
+
+
+class LLMRateLimiter:
+    """
+    数据库共享的双令牌桶
+
+    每分钟补充 limit 个令牌，桶容量为 llm_rate_burst_seconds 秒的补充量；
+    单次请求超过桶容量时，桶满即可放行并记为欠账（令牌为负），后续请求相应多等。
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        prefix: str = "",
+        rpm_limit: Optional[int] = None,
+        tpm_limit: Optional[int] = None,
+    ):
+        """
+        Args:
+            engine: 数据库引擎（默认应用引擎）
+            prefix: 桶名称前缀（按服务商单独限额时区分各自的桶）
+            rpm_limit / tpm_limit: 配额，None 表示使用全局配置 llm_rpm_limit / llm_tpm_limit
+        """
+        if engine is None:
+            from app.database import engine as default_engine
+            engine = default_engine
+        self.engine = engine
+        self.prefix = prefix
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.wait_count = 0
+        self.wait_seconds = 0.0
+
+    def _per_minute(self) -> dict:
+        rpm = settings.llm_rpm_limit if self.rpm_limit is None else self.rpm_limit
+        tpm = settings.llm_tpm_limit if self.tpm_limit is None else self.tpm_limit
+        return {self.prefix + REQUESTS_BUCKET: rpm, self.prefix + TOKENS_BUCKET: tpm}
+
+    def _limits(self) -> dict:
+        """{桶名称: (每秒补充速率, 容量)}，未配置的桶不参与限流"""
+        limits = {}
+        for name, per_minute in self._per_minute().items():
+            if per_minute > 0:
+                rate = per_minute / 60.0
+                limits[name] = (rate, max(1.0, rate * settings.llm_rate_burst_seconds))
+        return limits
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._limits())
+
+    def _ensure_buckets(self, session: Session, limits: dict, now: float) -> None:
+        dialect = self.engine.dialect.name
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        rows = [{"name": name, "tokens": capacity, "updated_at": now} for name, (_, capacity) in limits.items()]
+        session.execute(insert(LLMRateBucket).values(rows).on_conflict_do_nothing(index_elements=["name"]))
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        尝试扣减一次请求与 tokens 个 Token
+
+        Returns:
+            0 表示已放行；否则为建议等待的秒数
+        """
+        limits = self._limits()
+        if not limits:
+            return 0.0
+
+        costs = {self.prefix + REQUESTS_BUCKET: 1.0, self.prefix + TOKENS_BUCKET: float(max(1, tokens))}
+        now = time.time()
+        with Session(self.engine) as session:
+            self._ensure_buckets(session, limits, now)
+
+            # 两个桶在同一事务中扣减：任一不足则整体回滚，不会只扣一半
+            for name, (rate, capacity) in limits.items():
+                refilled = LLMRateBucket.tokens + (literal(now) - LLMRateBucket.updated_at) * rate
+                available = case((refilled > capacity, literal(capacity)), else_=refilled)
+                cost = costs[name]
+                result = session.execute(
+                    update(LLMRateBucket)
+                    .where(LLMRateBucket.name == name, available >= min(cost, capacity))
+                    .values(tokens=available - cost, updated_at=now)
+                )
+                if result.rowcount == 0:
+                    session.rollback()
+                    return self._wait_time(session, name, rate, capacity, cost, now)
+            session.commit()
+        return 0.0
+
+    @staticmethod
+    def _wait_time(session: Session, name: str, rate: float, capacity: float, cost: float, now: float) -> float:
+        bucket = session.get(LLMRateBucket, name)
+        if bucket is None:
+            return 0.1
+        available = min(capacity, bucket.tokens + (now - bucket.updated_at) * rate)
+        return max(0.05, (min(cost, capacity) - available) / rate)
+
+    async def acquire(self, tokens: int) -> None:
+        """等待配额（异步版本），数据库操作放到线程中执行"""
+        if not self.enabled:
+            return
+        waited = 0.0
+        while True:
+            delay = await asyncio.to_thread(self.try_acquire, tokens)
+            if delay <= 0:
+                break
+            # 加少量抖动，避免多个等待者同时醒来争抢
+            delay = min(delay, MAX_WAIT_SECONDS) * random.uniform(1.0, 1.2)
+            waited += delay
+            await asyncio.sleep(delay)
+        self._record_wait(waited)
+
+    def acquire_sync(self, tokens: int) -> None:
+        """等待配额（同步版本，用于同步客户端调用）"""
+        if not self.enabled:
+            return
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                break
+            delay = min(delay, MAX_WAIT_SECONDS) * random.uniform(1.0, 1.2)
+            waited += delay
+            time.sleep(delay)
+        self._record_wait(waited)
+
+    def _record_wait(self, waited: float) -> None:
+        if waited > 0:
+            self.wait_count += 1
+            self.wait_seconds += waited
+            logger.debug(f"LLM 速率限制等待 {waited:.2f} 秒")
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """
+        按响应中的实际 Token 用量结算预扣的差额（多退少补）
+        """
+        tokens_bucket = self.prefix + TOKENS_BUCKET
+        if self._per_minute()[tokens_bucket] <= 0 or not isinstance(actual, int) or actual == estimated:
+            return
+        try:
+            with Session(self.engine) as session:
+                session.execute(
+                    update(LLMRateBucket)
+                    .where(LLMRateBucket.name == tokens_bucket)
+                    .values(tokens=LLMRateBucket.tokens + (estimated - actual))
+                )
+                session.commit()
+        except Exception as e:
+            logger.warning(f"结算 Token 用量失败: {e}")
+
+    def stats(self) -> dict:
+        """
+        当前配额与等待情况（监控用）
+        """
+        per_minute = self._per_minute()
+        stats = {
+            "rpm_limit": per_minute[self.prefix + REQUESTS_BUCKET],
+            "tpm_limit": per_minute[self.prefix + TOKENS_BUCKET],
+            "waits": self.wait_count,
+            "wait_seconds": round(self.wait_seconds, 2),
+        }
+        if self.enabled:
+            try:
+                with Session(self.engine) as session:
+                    buckets = session.exec(
+                        select(LLMRateBucket).where(LLMRateBucket.name.in_(list(per_minute)))
+                    ).all()
+                    for bucket in buckets:
+                        stats[f"{bucket.name[len(self.prefix):]}_available"] = round(bucket.tokens, 2)
+            except Exception as e:
+                stats["error"] = str(e)
+        return stats
+
+
+_rate_limiter: Optional[LLMRateLimiter] = None
+_provider_rate_limiters: Dict[tuple, LLMRateLimiter] = {}
+
+
+def get_llm_rate_limiter(provider=None) -> LLMRateLimiter:
+    """
+    获取进程内的 LLM 速率限制器（状态在数据库中，跨进程共享）
+
+    Args:
+        provider: 服务商（LLMProvider）；为 None 时返回全局配额的限制器，
+            否则返回该服务商单独配额（rpm_limit / tpm_limit）的限制器
+    """
+    global _rate_limiter
+    if provider is None:
+        if _rate_limiter is None:
+            _rate_limiter = LLMRateLimiter()
+        return _rate_limiter
+
+    key = (provider.name, provider.rpm_limit, provider.tpm_limit)
+    limiter = _provider_rate_limiters.get(key)
+    if limiter is None:
+        limiter = LLMRateLimiter(
+            prefix=f"{provider.name}:",
+            rpm_limit=provider.rpm_limit,
+            tpm_limit=provider.tpm_limit,
+        )
+        _provider_rate_limiters[key] = limiter
+    return limiter
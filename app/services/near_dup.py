@@ -0,0 +1,201 @@
+"""
+近似重复文章检测
+为新文章计算 64 位 SimHash 指纹，按 4 段 × 16 位做 LSH 分桶索引；
+汉明距离不超过 3 的两篇文章至少有一段完全相同（鸽巢原理），
+因此只需按段精确查找候选，再在内存中核对距离，查询代价与文章总数无关。
+"""
+import hashlib
+import re
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from sqlmodel import Session, select
+from sqlalchemy import delete, update
+from app.models import Article, ArticleSimhashBand
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+BAND_COUNT = 4
+BAND_BITS = SIMHASH_BITS // BAND_COUNT
+# 分段数为 4 时，鸽巢原理最多保证距离 3 以内不漏检
+MAX_HAMMING_DISTANCE = BAND_COUNT - 1
+# 特征太少的短文本指纹不稳定，容易误判，不参与检测
+MIN_FEATURES = 16
+# 单次查询最多核对的候选数量（同一段值极度集中时兜底）
+MAX_CANDIDATES = 200
+
+_WORD_RE = re.compile(r"[a-z0-9]+|[一-鿿]")
+
+
+def _features(text: str) -> List[str]:
+    """
+    提取特征：相邻两个词元组成的 2-gram（英文以词为词元，中文以字为词元）
+
+    RSS 正文普遍较短，更长的 shingle 会让少量改写就拉开大段汉明距离
+    """
+    text = re.sub(r"<[^>]+>", " ", text or "").lower()
+    tokens = _WORD_RE.findall(text)
+    return [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _to_signed(value: int) -> int:
+    """SQLite INTEGER 为有符号 64 位，无符号指纹需转换后才能存储"""
+    return value - (1 << SIMHASH_BITS) if value >= (1 << (SIMHASH_BITS - 1)) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value & ((1 << SIMHASH_BITS) - 1)
+
+
+def compute_simhash(text: str) -> Optional[int]:
+    """
+    计算文本的 SimHash 指纹
+
+    Args:
+        text: 文章内容（可含 HTML）
+
+    Returns:
+        有符号 64 位整数；文本过短时返回 None
+    """
+    features = _features(text)
+    if len(features) < MIN_FEATURES:
+        return None
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return _to_signed(value)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """两个指纹的汉明距离"""
+    return bin(_to_unsigned(a) ^ _to_unsigned(b)).count("1")
+
+
+def band_keys(simhash: int) -> List[int]:
+    """
+    把指纹拆成 BAND_COUNT 段，段序号编入高位，得到可直接等值查询的分桶键
+    """
+    value = _to_unsigned(simhash)
+    mask = (1 << BAND_BITS) - 1
+    return [
+        (band << BAND_BITS) | ((value >> (band * BAND_BITS)) & mask)
+        for band in range(BAND_COUNT)
+    ]
+
+
+def index_fingerprints(session: Session, rows: Iterable[dict]) -> int:
+    """
+    为新插入的文章计算指纹，回写 simhash 并写入分桶索引（不提交）
+
+    Args:
+        session: 数据库会话
+        rows: 已带 id 的文章行（需含 content_text 或 content，可含 created_at）
+
+    Returns:
+        成功写入指纹的文章数量
+    """
+    updates = []
+    bands = []
+    for row in rows:
+        simhash = compute_simhash(row.get("content_text") or row.get("content") or "")
+        if simhash is None:
+            continue
+        created_at = row.get("created_at") or datetime.now()
+        updates.append({"id": row["id"], "simhash": simhash})
+        bands.extend(
+            {"article_id": row["id"], "band_key": key, "created_at": created_at}
+            for key in band_keys(simhash)
+        )
+
+    if updates:
+        session.execute(update(Article), updates)
+        session.execute(ArticleSimhashBand.__table__.insert(), bands)
+    return len(updates)
+
+
+def prune_simhash_bands(session: Session, window_days: Optional[int] = None) -> int:
+    """
+    清理分桶索引：删除超出查找窗口的分桶行，以及文章已被删除的分桶行
+
+    查找只命中窗口内的分桶，窗口外的行不会再被用到；文章被删除时
+    （手工清理、迁移脚本等）其分桶行也在这里一并清除。
+
+    Returns:
+        被删除的行数
+    """
+    window_days = window_days or settings.near_dup_window_days
+    cutoff = datetime.now() - timedelta(days=window_days)
+    try:
+        result = session.execute(
+            delete(ArticleSimhashBand).where(
+                (ArticleSimhashBand.created_at < cutoff)
+                | ArticleSimhashBand.article_id.not_in(select(Article.id))
+            )
+        )
+        session.commit()
+        deleted = result.rowcount or 0
+        if deleted:
+            logger.info(f"清理 SimHash 分桶: 删除 {deleted} 行（保留近 {window_days} 天）")
+        return deleted
+    except Exception as e:
+        session.rollback()
+        logger.error(f"清理 SimHash 分桶失败: {e}")
+        return 0
+
+
+def find_summarized_duplicate(
+    session: Session,
+    article_id: int,
+    simhash: int,
+    window_days: Optional[int] = None,
+) -> Optional[Tuple[int, str, Optional[str]]]:
+    """
+    在近期窗口内查找已有摘要的近似重复文章
+
+    Args:
+        session: 数据库会话
+        article_id: 当前文章 ID（排除自身）
+        simhash: 当前文章指纹
+        window_days: 查找窗口（天）
+
+    Returns:
+        (article_id, summary, summary_en)，未找到返回 None
+    """
+    window_days = window_days or settings.near_dup_window_days
+    cutoff = datetime.now() - timedelta(days=window_days)
+
+    # 分桶键 + 时间窗口命中 (band_key, created_at) 复合索引
+    candidate_ids = select(ArticleSimhashBand.article_id).where(
+        ArticleSimhashBand.band_key.in_(band_keys(simhash)),
+        ArticleSimhashBand.created_at >= cutoff,
+        ArticleSimhashBand.article_id != article_id,
+    ).distinct().limit(MAX_CANDIDATES)
+
+    rows = session.exec(
+        select(Article.id, Article.simhash, Article.summary, Article.summary_en).where(
+            Article.id.in_(candidate_ids),
+            Article.summary.is_not(None),
+        )
+    ).all()
+
+    best = None
+    for row in rows:
+        distance = hamming_distance(simhash, row.simhash)
+        if distance <= MAX_HAMMING_DISTANCE and (best is None or distance < best[0]):
+            best = (distance, row)
+    if best is None:
+        return None
+
+    distance, row = best
+    logger.info(f"文章 {article_id} 与文章 {row.id} 近似重复（汉明距离 {distance}），复用已有摘要")
+    return row.id, row.summary, row.summary_en
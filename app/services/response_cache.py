@@ -0,0 +1,272 @@
+"""
+接口响应缓存
+RSS 阅读器每隔几分钟轮询 /api/rss，而文章数据只在抓取、摘要写入时才变化。
+渲染好的响应体按规范化后的查询参数缓存在进程内，所依赖数据的版本号变化后失效：
+
+- 数据版本按范围计数：每个分类、每个订阅源各有版本号，另有“全部文章”与全局版本号。
+  抓取写入新文章、摘要回写时只递增受影响分类与订阅源的版本（连同“全部文章”），
+  其他分类的缓存不受影响；RSS 源增改会改变分类归属，递增全局版本使全部缓存失效
+- 响应带强 ETag（响应体哈希）与 Last-Modified（本进程首次渲染出该响应体的时间），
+  命中 If-None-Match / If-Modified-Since 时返回 304，不查库也不重新生成 XML。
+  Last-Modified 取自响应体是否变化，而不是本进程的版本号变化时间：
+  其他进程写库后重新渲染出的新内容总是带更晚的 Last-Modified，不会对只带 If-Modified-Since 的客户端误返回 304
+- 条目记录响应中尚无摘要的文章，命中缓存与 304 时同样回调记录访问
+- 其他进程（如 utils/regenerate_summaries.py）写库不会更新本进程的版本号，由 TTL 兜底
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Dict, Hashable, Iterable, Optional, Sequence, Tuple
+from fastapi import Request, Response
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 渲染函数返回 (响应体, Content-Type, 额外响应头, 需要记录访问的文章 id)
+Renderer = Callable[[], Tuple[bytes, str, Dict[str, str], Sequence[int]]]
+
+# 数据范围：不带分类、订阅源筛选的响应依赖全部文章
+ALL_ARTICLES: Hashable = ("all",)
+
+
+def category_scope(category: Optional[str]) -> Hashable:
+    """某个分类的数据范围（None 表示全部文章）"""
+    return ALL_ARTICLES if category is None else ("category", category)
+
+
+def feed_scope(feed_id: int) -> Hashable:
+    """某个订阅源的数据范围"""
+    return ("feed", feed_id)
+
+
+def article_scopes(category: Optional[str] = None, feed_ids: Optional[Iterable[int]] = None) -> Tuple[Hashable, ...]:
+    """文章列表类响应依赖的数据范围：按订阅源筛选时只依赖这些源，否则依赖分类（或全部文章）"""
+    if feed_ids:
+        return tuple(feed_scope(feed_id) for feed_id in sorted(set(feed_ids)))
+    return (category_scope(category),)
+
+
+@dataclass
+class CachedResponse:
+    """一条缓存的响应"""
+    body: bytes
+    media_type: str
+    etag: str
+    last_modified: datetime
+    version: Tuple[int, ...]
+    expires_at: float
+    headers: Dict[str, str] = field(default_factory=dict)
+    scopes: Tuple[Hashable, ...] = (ALL_ARTICLES,)
+    article_ids: Tuple[int, ...] = ()
+
+
+_version_lock = threading.Lock()
+_data_version = 0
+# 数据范围 -> 版本号；未出现过的范围版本号为 0
+_scope_versions: Dict[Hashable, int] = {}
+
+
+def bump_data_version(scopes: Optional[Iterable[Hashable]] = None) -> int:
+    """
+    数据已提交变更：使依赖这些数据的缓存响应失效
+
+    Args:
+        scopes: 有变化的分类、订阅源范围（category_scope / feed_scope），“全部文章”总是一并递增；
+            None 表示全局变化（如 RSS 源增改），全部缓存失效
+
+    Returns:
+        全局版本号
+    """
+    global _data_version
+    with _version_lock:
+        if scopes is None:
+            _data_version += 1
+        else:
+            for scope in {ALL_ARTICLES, *scopes}:
+                _scope_versions[scope] = _scope_versions.get(scope, 0) + 1
+        return _data_version
+
+
+def get_data_version(scopes: Iterable[Hashable] = (ALL_ARTICLES,)) -> Tuple[int, ...]:
+    """返回这些范围的数据版本"""
+    with _version_lock:
+        return (_data_version, *(_scope_versions.get(scope, 0) for scope in scopes))
+
+
+class ResponseCache:
+    """按键缓存渲染好的响应（LRU，条目在数据版本变化或 TTL 到期后失效）"""
+
+    def __init__(self, max_entries: int = 256, ttl: int = 600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """取出仍然有效的缓存条目"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is None
+                or entry.version != get_data_version(entry.scopes)
+                or entry.expires_at <= time.monotonic()
+            ):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        key: Hashable,
+        body: bytes,
+        media_type: str,
+        headers: Optional[Dict[str, str]] = None,
+        version: Optional[Tuple[int, ...]] = None,
+        scopes: Sequence[Hashable] = (ALL_ARTICLES,),
+        article_ids: Sequence[int] = (),
+    ) -> CachedResponse:
+        """
+        写入缓存
+
+        Args:
+            version: 渲染前读取的数据版本；渲染期间数据有变化时该条目下次读取即失效
+            scopes: 响应依赖的数据范围
+            article_ids: 响应中需要记录访问的文章
+        """
+        scopes = tuple(scopes)
+        etag = make_etag(body)
+        now = datetime.now(UTC).replace(microsecond=0)
+        with self._lock:
+            previous = self._entries.get(key)
+        if previous is None:
+            last_modified = now
+        elif previous.etag == etag:
+            # 失效后重新渲染出同样的内容：沿用原来的时间，客户端的 If-Modified-Since 继续命中
+            last_modified = previous.last_modified
+        else:
+            # 内容变化：Last-Modified 必须晚于旧内容的（同一秒内的变化也不能误判为未修改）
+            last_modified = max(now, previous.last_modified + timedelta(seconds=1))
+        entry = CachedResponse(
+            body=body,
+            media_type=media_type,
+            etag=etag,
+            last_modified=last_modified,
+            version=get_data_version(scopes) if version is None else version,
+            expires_at=time.monotonic() + self.ttl,
+            headers=dict(headers or {}),
+            scopes=scopes,
+            article_ids=tuple(article_ids),
+        )
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries if settings.response_cache_enabled else 0,
+    ttl=settings.response_cache_ttl,
+)
+
+
+def make_etag(body: bytes) -> str:
+    """强 ETag：响应体内容哈希（内容不变时重新渲染也得到同一个值）"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """条件请求是否命中（If-None-Match 优先于 If-Modified-Since）"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        return last_modified <= since
+    return False
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    media_type: str,
+    etag: str,
+    last_modified: datetime,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    带校验值的响应：条件请求命中时返回 304 空响应，否则返回 200 与响应体
+
+    Args:
+        last_modified: 带时区的最后修改时间（精确到秒）
+    """
+    validators = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        # 允许客户端缓存，但每次使用前都要带校验值回来确认
+        "Cache-Control": "no-cache",
+    }
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=validators)
+    return Response(content=body, media_type=media_type, headers={**(headers or {}), **validators})
+
+
+def cached_response(
+    request: Request,
+    key: Hashable,
+    render: Renderer,
+    scopes: Sequence[Hashable] = (ALL_ARTICLES,),
+    on_served: Optional[Callable[[Sequence[int]], None]] = None,
+) -> Response:
+    """
+    返回缓存的响应，未命中时调用 render 生成并缓存
+
+    Args:
+        request: 当前请求（读取条件请求头）
+        key: 缓存键（路由名 + 规范化后的查询参数）
+        render: 生成响应的函数，只在未命中时调用
+        scopes: 响应依赖的数据范围，其中任一范围的版本变化后缓存失效
+        on_served: 每次返回响应（含命中缓存与 304）时以 render 给出的文章 id 回调，用于记录访问
+
+    Returns:
+        200 响应，或条件请求命中时的 304 空响应
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        version = get_data_version(scopes)
+        body, media_type, headers, article_ids = render()
+        entry = response_cache.put(
+            key, body, media_type, headers, version=version, scopes=scopes, article_ids=article_ids
+        )
+    if on_served is not None and entry.article_ids:
+        on_served(entry.article_ids)
+    return conditional_response(
+        request, entry.body, entry.media_type, entry.etag, entry.last_modified, entry.headers
+    )
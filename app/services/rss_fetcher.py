@@ -4,12 +4,25 @@ RSS 抓取服务
 """
 import feedparser
 import asyncio
+import hashlib
+import httpx
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 from sqlmodel import Session
-from app.models import Feed, Article
-from app.crud import get_all_feeds, article_exists, create_article
-from app.services.summarizer import summarize_article_bilingual
+from sqlalchemy import update
+from app.models import Feed, Article, SUMMARY_MODE_EXTRACTIVE
+from app.crud import get_all_feeds, get_existing_links, create_article, bulk_insert_articles
+from app.services.summary_queue import compute_priority, enqueue_articles
+from app.services.near_dup import index_fingerprints
+from app.services.content_cleaner import clean_html
+from app.services.content_store import store_contents
+from app.services.search import index_articles
+from app.services.cache_invalidation import mark_articles_changed
+from app.services.extractive_summarizer import summarize_extractive_pair
+from app.services.llm_providers import llm_configured
 from app.config import settings
 import logging
 import time
@@ -17,6 +30,9 @@ from email.utils import parsedate_to_datetime
 
 logger = logging.getLogger(__name__)
 
+# 抓取 RSS 时使用的 User-Agent（部分站点会拒绝默认的 python-httpx UA）
+FEED_USER_AGENT = "AI-RSS-Hub/1.0 (+https://github.com/goodniuniu/AI-RSS-Hub)"
+
 
 def parse_published_date(entry) -> Optional[datetime]:
     """
@@ -48,160 +64,408 @@ def parse_published_date(entry) -> Optional[datetime]:
     return None
 
 
-async def fetch_feed(feed: Feed, session: Session) -> int:
+@dataclass
+class FeedDownload:
+    """
+    单个 RSS 源的下载结果
+
+    not_modified 为 True 表示源内容未变化（304 或响应体哈希与上次一致），
+    此时 parsed 为空，调用方应直接跳过解析与去重。
+    """
+
+    parsed: Optional[feedparser.FeedParserDict] = None
+    not_modified: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+
+
+class FetchLimiter:
+    """
+    抓取并发控制器：全局并发上限 + 单主机并发上限
+
+    同一主机下往往挂着多个源（如同一站点的多个分类 Feed），
+    单主机上限避免瞬时打满对方连接而被限流或封禁。
+    """
+
+    def __init__(self, max_concurrency: int, per_host_concurrency: int):
+        self._global = asyncio.Semaphore(max(1, max_concurrency))
+        self._per_host_concurrency = max(1, per_host_concurrency)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._per_host_concurrency)
+            self._hosts[host] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """先占主机槽位再占全局槽位，排队等同一主机时不白占全局名额"""
+        async with self._host_semaphore(url):
+            async with self._global:
+                yield
+
+
+def create_fetch_client() -> httpx.AsyncClient:
+    """创建抓取 RSS 用的共享 HTTP 客户端（复用连接池）"""
+    return httpx.AsyncClient(
+        timeout=settings.request_timeout,
+        follow_redirects=True,
+        headers={"User-Agent": FEED_USER_AGENT},
+        limits=httpx.Limits(
+            max_connections=max(1, settings.fetch_max_concurrency),
+            max_keepalive_connections=max(1, settings.fetch_max_concurrency),
+        ),
+    )
+
+
+@asynccontextmanager
+async def _borrowed(client: httpx.AsyncClient):
+    """包装调用方传入的客户端：复用但不负责关闭"""
+    yield client
+
+
+def create_fetch_limiter() -> FetchLimiter:
+    """按配置创建抓取并发控制器"""
+    return FetchLimiter(
+        settings.fetch_max_concurrency,
+        settings.fetch_per_host_concurrency,
+    )
+
+
+async def download_and_parse(
+    name: str,
+    url: str,
+    client: httpx.AsyncClient,
+    limiter: FetchLimiter,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    content_hash: Optional[str] = None,
+) -> Optional[FeedDownload]:
+    """
+    异步下载并解析单个 RSS 源（HTTP 条件请求）
+
+    下载走共享的 httpx.AsyncClient，受全局/单主机并发上限约束；
+    带上次的 ETag / Last-Modified 发送条件请求，304 或响应体哈希未变时不解析。
+    feedparser 解析是纯 CPU 的同步调用，放到线程池执行，避免阻塞事件循环。
+
+    Args:
+        name: RSS 源名称（用于日志）
+        url: RSS 源 URL
+        client: 共享 HTTP 客户端
+        limiter: 抓取并发控制器
+        etag: 上次响应的 ETag（可选）
+        last_modified: 上次响应的 Last-Modified（可选）
+        content_hash: 上次响应体的 SHA-256（可选）
+
+    Returns:
+        FeedDownload 下载结果，下载失败返回 None
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    try:
+        async with limiter.slot(url):
+            response = await client.get(url, headers=headers)
+        if response.status_code == 304:
+            logger.info(f"RSS 源未更新（304）: {name}")
+            return FeedDownload(not_modified=True)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.error(f"下载 RSS 源失败: {name}, 错误: {e}")
+        return None
+
+    body = response.content
+    body_hash = hashlib.sha256(body).hexdigest()
+    # 不支持条件请求的服务器每次都返回 200，用响应体哈希兜底
+    if content_hash and body_hash == content_hash:
+        logger.info(f"RSS 源内容未变化（哈希一致）: {name}")
+        return FeedDownload(not_modified=True)
+
+    # 传入响应头，保证相对链接解析与编码探测与直接 parse(url) 一致
+    response_headers = {
+        "content-location": str(response.url),
+        "content-type": response.headers.get("content-type", ""),
+    }
+    parsed = await asyncio.to_thread(
+        feedparser.parse, body, response_headers=response_headers
+    )
+
+    # 检查是否解析成功
+    if parsed.bozo:
+        logger.warning(f"RSS 解析警告: {name}, 错误: {parsed.bozo_exception}")
+
+    return FeedDownload(
+        parsed=parsed,
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+        content_hash=body_hash,
+    )
+
+
+def _feed_validators(feed: Feed) -> dict:
+    """取出 Feed 上保存的条件请求校验值"""
+    return {
+        "etag": feed.etag,
+        "last_modified": feed.last_modified,
+        "content_hash": feed.content_hash,
+    }
+
+
+async def fetch_feed(
+    feed: Feed,
+    session: Session,
+    client: Optional[httpx.AsyncClient] = None,
+    limiter: Optional[FetchLimiter] = None,
+) -> int:
     """
     抓取单个 RSS 源（异步版本）
 
     Args:
         feed: Feed 对象
         session: 数据库会话
+        client: 共享 HTTP 客户端（可选，不传则临时创建）
+        limiter: 抓取并发控制器（可选）
 
     Returns:
         新增文章数量
     """
     logger.info(f"开始抓取 RSS 源: {feed.name} ({feed.url})")
 
-    try:
-        # 解析 RSS
-        parsed = feedparser.parse(feed.url)
+    limiter = limiter or create_fetch_limiter()
+    validators = _feed_validators(feed)
+    if client is None:
+        async with create_fetch_client() as own_client:
+            download = await download_and_parse(
+                feed.name, feed.url, own_client, limiter, **validators
+            )
+    else:
+        download = await download_and_parse(feed.name, feed.url, client, limiter, **validators)
 
-        # 检查是否解析成功
-        if parsed.bozo:
-            logger.warning(f"RSS 解析警告: {feed.name}, 错误: {parsed.bozo_exception}")
+    if download is None or download.not_modified:
+        return 0
+    return await store_feed_entries(feed, download, session)
 
-        if not hasattr(parsed, "entries") or not parsed.entries:
-            logger.warning(f"RSS 源没有条目: {feed.name}")
-            return 0
 
-        # 用于存储需要生成摘要的文章
-        articles_to_summarize: List[Tuple[Article, str]] = []
-        new_articles_count = 0
+def _filter_new_entries(feed: Feed, entries: list, session: Session) -> List[Tuple[str, dict]]:
+    """
+    批量去重：收集本源全部链接，一次集合查询找出已存在的，只保留新条目
 
-        # 遍历所有条目，先保存文章
-        for entry in parsed.entries:
-            try:
-                # 获取文章链接（用于去重）
-                link = entry.get("link", "")
-                if not link:
-                    logger.warning(f"条目缺少链接，跳过: {entry.get('title', 'Unknown')}")
-                    continue
+    同一源内重复出现的链接只保留第一条。
 
-                # 检查文章是否已存在
-                if article_exists(session, link):
-                    logger.debug(f"文章已存在，跳过: {link}")
-                    continue
+    Returns:
+        [(link, entry), ...] 待入库的新条目
+    """
+    candidates: Dict[str, dict] = {}
+    for entry in entries:
+        link = entry.get("link", "")
+        if not link:
+            logger.warning(f"条目缺少链接，跳过: {entry.get('title', 'Unknown')}")
+            continue
+        candidates.setdefault(link, entry)
+
+    existing = get_existing_links(session, candidates.keys())
+    if existing:
+        logger.debug(f"{feed.name}: {len(existing)} 篇文章已存在，跳过")
+    return [(link, entry) for link, entry in candidates.items() if link not in existing]
+
+
+def _entry_to_row(feed: Feed, link: str, entry) -> dict:
+    """把 feedparser 条目转换为 article 表的一行"""
+    # 提取文章信息
+    title = entry.get("title", "无标题")
+
+    # 提取内容（尝试多个字段）
+    content = ""
+    if hasattr(entry, "content") and entry.content:
+        content = entry.content[0].get("value", "")
+    elif hasattr(entry, "summary"):
+        content = entry.summary
+    elif hasattr(entry, "description"):
+        content = entry.description
+
+    # 入库时一次性清洗为纯文本，摘要、去重与搜索都直接使用
+    content_text = clean_html(content)
+
+    # 解析发布时间
+    published_at = parse_published_date(entry) or datetime.now()
+
+    # 抽取式摘要模式的订阅源入库时直接生成摘要，不进入 LLM 摘要队列
+    summary = summary_en = None
+    if feed.summary_mode == SUMMARY_MODE_EXTRACTIVE and content_text:
+        zh_summary, en_summary = summarize_extractive_pair(title, content_text)
+        # 英文内容没有中文摘要：summary 也填入英文抽取结果，与 LLM 降级摘要的行为一致
+        summary, summary_en = (zh_summary or en_summary) or None, en_summary or None
+
+    return {
+        "title": title,
+        "link": link,
+        # 正文由 bulk_insert_articles 压缩写入 article_content 表（原始内容是否保留取决于 store_raw_content）
+        "content": content,
+        "content_text": content_text,
+        "summary": summary,
+        "summary_en": summary_en,
+        "published_at": published_at,
+        "feed_id": feed.id,
+        "created_at": datetime.now(),
+    }
 
-                # 提取文章信息
-                title = entry.get("title", "无标题")
-
-                # 提取内容（尝试多个字段）
-                content = ""
-                if hasattr(entry, "content") and entry.content:
-                    content = entry.content[0].get("value", "")
-                elif hasattr(entry, "summary"):
-                    content = entry.summary
-                elif hasattr(entry, "description"):
-                    content = entry.description
-
-                # 解析发布时间
-                published_at = parse_published_date(entry) or datetime.now()
-
-                # 创建文章对象
-                article = Article(
-                    title=title,
-                    link=link,
-                    content=content,
-                    published_at=published_at,
-                    feed_id=feed.id,
-                )
-
-                # 用 SAVEPOINT 包裹单条：flush 取得 article.id（WAL + synchronous=NORMAL
-                # 下不 fsync），二维码文件名依赖 id 故必须在 flush 后生成；该条失败仅回滚自身。
-                try:
-                    with session.begin_nested():
-                        session.add(article)
-                        session.flush()
-                        try:
-                            from app.services.qr_generator import generate_qr_code_url
-                            qr_url = generate_qr_code_url(article.id, article.link)
-                            if qr_url:
-                                article.qr_code_url = qr_url
-                                logger.debug(f"生成二维码: {qr_url}")
-                        except Exception as qr_error:
-                            logger.warning(f"生成二维码失败: {qr_error}")
-                except Exception as save_error:
-                    logger.error(f"保存文章失败，跳过该条: {save_error}")
-                    continue
 
-                # 如果有内容且配置了 API Key，收集起来待生成摘要
-                if settings.openai_api_key and content and len(content.strip()) >= 10:
-                    articles_to_summarize.append((article, content))
+class ArticleWriter:
+    """
+    新文章批量写入缓冲
+
+    攒够一个源（per_feed=True）或一整轮抓取（per_feed=False）的新文章后，
+    用一条多行 INSERT ... ON CONFLICT(link) DO NOTHING RETURNING id, link 写入，
+    二维码、SimHash 指纹、摘要入队等依赖 id 的工作在插入之后统一处理。并发抓取同一链接时冲突行被静默忽略。
+    """
+
+    def __init__(self, session: Session, per_feed: bool = True):
+        self.session = session
+        self.per_feed = per_feed
+        self.inserted_count = 0
+        self.queued_count = 0
+        self._rows: List[dict] = []
+        self._links: set = set()
+
+    def add(self, row: dict) -> bool:
+        """缓冲一行；同一缓冲内重复的链接只保留第一条"""
+        if row["link"] in self._links:
+            return False
+        self._links.add(row["link"])
+        self._rows.append(row)
+        return True
+
+    def flush(self) -> List[dict]:
+        """
+        写入缓冲中的全部文章并提交
+
+        Returns:
+            实际插入的行（已带 id），被唯一约束忽略的行不在其中
+        """
+        rows, self._rows, self._links = self._rows, [], set()
+        if not rows:
+            self.session.commit()
+            return []
+
+        inserted = bulk_insert_articles(self.session, rows)
+        id_by_link = {link: article_id for article_id, link in inserted}
+        new_rows = [dict(row, id=id_by_link[row["link"]]) for row in rows if row["link"] in id_by_link]
+
+        _attach_qr_codes(self.session, new_rows)
+        index_fingerprints(self.session, new_rows)
+        index_articles(self.session, new_rows)
+        self.queued_count += _enqueue_for_summary(self.session, new_rows)
+
+        # WAL + synchronous=NORMAL 下不 fsync，文章、正文、索引、二维码与摘要任务同一次写事务提交
+        self.session.commit()
+        self.inserted_count += len(new_rows)
+        if new_rows:
+            mark_articles_changed(self.session, feed_ids={row["feed_id"] for row in new_rows})
+
+        skipped = len(rows) - len(new_rows)
+        if skipped:
+            logger.info(f"{skipped} 篇文章已被其他抓取写入，忽略")
+        return new_rows
+
+
+def _attach_qr_codes(session: Session, rows: List[dict]) -> None:
+    """为新插入的文章生成二维码，并按主键批量回写 qr_code_url"""
+    from app.services.qr_generator import generate_qr_code_url
+
+    updates = []
+    for row in rows:
+        try:
+            qr_url = generate_qr_code_url(row["id"], row["link"])
+            if qr_url:
+                updates.append({"id": row["id"], "qr_code_url": qr_url})
+                logger.debug(f"生成二维码: {qr_url}")
+        except Exception as qr_error:
+            logger.warning(f"生成二维码失败: {qr_error}")
+    if updates:
+        session.execute(update(Article), updates)
+
+
+def _enqueue_for_summary(session: Session, rows: List[dict]) -> int:
+    """
+    有内容、尚无摘要且配置了 LLM 服务的新文章加入摘要队列，由摘要 worker 异步消费
+
+    按发布时间与所属源的摘要权重计算优先级，worker 积压时先处理新的、重要源的文章
+    """
+    if not llm_configured():
+        return 0
+    now = datetime.now()
+    priorities = {}
+    for row in rows:
+        if row.get("summary") or row.get("summary_en") or len(row.get("content_text") or "") < 10:
+            continue
+        feed = session.get(Feed, row["feed_id"])
+        weight = feed.summary_priority if feed else 1.0
+        priorities[row["id"]] = compute_priority(row.get("published_at"), weight, now=now)
+    return enqueue_articles(session, priorities.keys(), priorities)
+
+
+async def store_feed_entries(
+    feed: Feed,
+    download: FeedDownload,
+    session: Session,
+    writer: Optional[ArticleWriter] = None,
+) -> int:
+    """
+    保存已解析 RSS 源中的新文章，并将其加入摘要队列
+
+    新的条件请求校验值与文章在同一事务中提交：入库失败回滚时校验值一并回滚，
+    下一轮仍会完整抓取，不会因为"未变化"而漏掉文章。
+
+    Args:
+        feed: Feed 对象
+        download: 下载结果（含解析结果与新的校验值）
+        session: 数据库会话
+        writer: 批量写入缓冲（可选；按轮写入时由调用方在本轮结束时统一 flush）
+
+    Returns:
+        新增文章数量（按轮写入时为本源缓冲的文章数）
+    """
+    parsed = download.parsed
+    writer = writer or ArticleWriter(session)
+    try:
+        feed.etag = download.etag
+        feed.last_modified = download.last_modified
+        feed.content_hash = download.content_hash
+        session.add(feed)
+
+        if not hasattr(parsed, "entries") or not parsed.entries:
+            logger.warning(f"RSS 源没有条目: {feed.name}")
+            session.commit()
+            return 0
 
-                new_articles_count += 1
-                logger.info(f"新增文章: {title[:50]}...")
+        # 一次集合查询完成去重，替代逐条 article_exists
+        new_entries = _filter_new_entries(feed, parsed.entries, session)
 
+        buffered = 0
+        for link, entry in new_entries:
+            try:
+                if writer.add(_entry_to_row(feed, link, entry)):
+                    buffered += 1
+                    logger.info(f"新增文章: {entry.get('title', '无标题')[:50]}...")
             except Exception as e:
                 logger.error(f"处理条目失败: {e}")
                 continue
 
-        # 分批并发生成摘要：限制单批同时驻留的原文/响应以压低内存峰值，每批提交一次。
-        if articles_to_summarize:
-            batch_size = max(1, settings.summary_batch_size)
-            total = len(articles_to_summarize)
-            n_batches = (total + batch_size - 1) // batch_size
-            logger.info(
-                f"开始分批并发生成 {total} 篇文章的双语摘要"
-                f"（每批 {batch_size} 篇，共 {n_batches} 批）..."
-            )
-            summary_start_time = time.time()
-
-            # 信号量在整个摘要阶段共享，跨批次约束 LLM 并发
-            semaphore = asyncio.Semaphore(settings.max_concurrent_summaries)
-
-            for batch_idx in range(n_batches):
-                start = batch_idx * batch_size
-                batch = articles_to_summarize[start:start + batch_size]
-
-                # 并发生成本批双语摘要；return_exceptions 隔离单条失败
-                tasks = [
-                    summarize_article_bilingual(article.title, content, semaphore)
-                    for article, content in batch
-                ]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                for (article, _), result in zip(batch, results):
-                    if isinstance(result, Exception):
-                        logger.error(f"摘要生成异常，跳过该篇: {result}")
-                        continue
-                    zh_summary, en_summary = result
-                    # zh/en 各自独立判断：双语生成也可能因解析失败只拿到其中一种，
-                    # 不能用 zh_summary 作总开关，否则英文摘要可能不落库。
-                    changed = False
-                    if zh_summary and "失败" not in zh_summary and "异常" not in zh_summary:
-                        article.summary = zh_summary          # 中文摘要
-                        changed = True
-                    if en_summary and "失败" not in en_summary and "异常" not in en_summary:
-                        article.summary_en = en_summary       # 英文摘要
-                        changed = True
-                    if changed:
-                        session.add(article)
-
-                # 每批提交一次（WAL + synchronous=NORMAL 下不 fsync，仅推进事务、释放引用）
-                session.commit()
-                logger.info(f"摘要批次 {batch_idx + 1}/{n_batches} 完成（{len(batch)} 篇）")
-
-            summary_duration = time.time() - summary_start_time
-            logger.info(
-                f"摘要生成完成: {total} 篇, "
-                f"耗时 {summary_duration:.2f} 秒, "
-                f"平均 {summary_duration / total:.2f} 秒/篇"
-            )
-        else:
-            # 没有需要摘要的文章：把本轮 flush 的文章插入一次性提交
-            session.commit()
+        if not writer.per_feed:
+            logger.info(f"RSS 源 {feed.name} 解析完成，缓冲 {buffered} 篇新文章待本轮统一写入")
+            return buffered
 
-        logger.info(f"RSS 源 {feed.name} 抓取完成，新增 {new_articles_count} 篇文章")
-        return new_articles_count
+        new_rows = writer.flush()
+
+        logger.info(f"RSS 源 {feed.name} 抓取完成，新增 {len(new_rows)} 篇文章")
+        return len(new_rows)
 
     except Exception as e:
         logger.error(f"抓取 RSS 源失败: {feed.name}, 错误: {e}")
@@ -213,12 +477,20 @@ async def fetch_feed(feed: Feed, session: Session) -> int:
         return 0
 
 
-async def fetch_all_feeds_async(session: Session) -> dict:
+async def fetch_all_feeds_async(
+    session: Session,
+    client: Optional[httpx.AsyncClient] = None,
+) -> dict:
     """
     抓取所有活跃的 RSS 源（异步版本）
 
+    下载与解析阶段并发执行（全局 + 单主机并发上限），
+    入库阶段按下载完成顺序串行执行，数据库会话只在当前协程中使用。
+    新文章只加入摘要队列，摘要由常驻 worker 生成，抓取耗时只取决于网络与解析。
+
     Args:
         session: 数据库会话
+        client: 共享 HTTP 客户端（可选，不传则按配置创建）
 
     Returns:
         抓取统计信息
@@ -233,27 +505,66 @@ async def fetch_all_feeds_async(session: Session) -> dict:
         logger.warning("没有活跃的 RSS 源")
         return {"total_feeds": 0, "total_articles": 0, "duration": 0}
 
-    # 串行抓取每个 Feed（避免同时解析多个 RSS 源）
-    total_articles = 0
-    for feed in feeds:
+    limiter = create_fetch_limiter()
+    writer = ArticleWriter(session, per_feed=settings.article_insert_scope != "cycle")
+    unchanged_feeds = 0
+
+    async def _download_feed(
+        feed: Feed, http_client: httpx.AsyncClient
+    ) -> Tuple[Feed, Optional[FeedDownload]]:
+        # 在首次挂起前取出属性：入库阶段 commit 会使 ORM 对象过期
+        name, url, validators = feed.name, feed.url, _feed_validators(feed)
+        logger.info(f"开始抓取 RSS 源: {name} ({url})")
         try:
-            count = await fetch_feed(feed, session)
-            total_articles += count
+            return feed, await download_and_parse(name, url, http_client, limiter, **validators)
         except Exception as e:
-            logger.error(f"抓取 Feed {feed.name} 时发生异常: {e}")
-            continue
+            logger.error(f"抓取 Feed {name} 时发生异常: {e}")
+            return feed, None
+
+    async with (create_fetch_client() if client is None else _borrowed(client)) as http_client:
+        tasks = [asyncio.create_task(_download_feed(feed, http_client)) for feed in feeds]
+        try:
+            # 谁先下载完谁先入库，慢源不阻塞快源
+            for next_done in asyncio.as_completed(tasks):
+                feed, result = await next_done
+                if result is None:
+                    continue
+                if result.not_modified:
+                    unchanged_feeds += 1
+                    continue
+                try:
+                    await store_feed_entries(feed, result, session, writer)
+                except Exception as e:
+                    logger.error(f"保存 Feed {feed.name} 时发生异常: {e}")
+                    continue
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # 按轮写入：全部源解析完后一条多行 INSERT 写入
+    if not writer.per_feed:
+        try:
+            writer.flush()
+        except Exception as e:
+            logger.error(f"批量写入本轮新文章失败: {e}")
+            session.rollback()
+    total_articles = writer.inserted_count
 
     duration = time.time() - start_time
 
     stats = {
         "total_feeds": len(feeds),
+        "unchanged_feeds": unchanged_feeds,
         "total_articles": total_articles,
+        "queued_summaries": writer.queued_count,
         "duration": round(duration, 2),
     }
 
     logger.info(
-        f"批量抓取完成: {stats['total_feeds']} 个源, "
-        f"{stats['total_articles']} 篇新文章, "
+        f"批量抓取完成: {stats['total_feeds']} 个源"
+        f"（{stats['unchanged_feeds']} 个未更新）, "
+        f"{stats['total_articles']} 篇新文章"
+        f"（{stats['queued_summaries']} 篇待摘要）, "
         f"耗时 {stats['duration']} 秒"
     )
 
@@ -285,17 +596,14 @@ def fetch_all_feeds(session: Session) -> dict:
             return {"total_feeds": 0, "total_articles": 0, "duration": 0}
 
         total_articles = 0
+        changed_feeds = set()
         for feed in feeds:
             try:
                 parsed = feedparser.parse(feed.url)
                 if not hasattr(parsed, "entries") or not parsed.entries:
                     continue
 
-                for entry in parsed.entries:
-                    link = entry.get("link", "")
-                    if not link or article_exists(session, link):
-                        continue
-
+                for link, entry in _filter_new_entries(feed, parsed.entries, session):
                     title = entry.get("title", "无标题")
                     content = ""
                     if hasattr(entry, "content") and entry.content:
@@ -308,15 +616,21 @@ def fetch_all_feeds(session: Session) -> dict:
                     article = Article(
                         title=title,
                         link=link,
-                        content=content,
                         published_at=published_at,
                         feed_id=feed.id,
                     )
                     create_article(session, article)
+                    row = {"id": article.id, "title": title, "content": content, "content_text": clean_html(content)}
+                    store_contents(session, [row])
+                    index_articles(session, [row])
+                    session.commit()
                     total_articles += 1
+                    changed_feeds.add(feed.id)
             except Exception as e:
                 logger.error(f"抓取 Feed {feed.name} 失败: {e}")
 
+        if total_articles:
+            mark_articles_changed(session, feed_ids=changed_feeds)
         duration = time.time() - start_time
         return {
             "total_feeds": len(feeds),
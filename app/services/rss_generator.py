@@ -75,9 +75,8 @@ class RSSGenerator:
         fg.language(self.language)
         fg.generator("AI-RSS-Hub 1.0")
 
-        # 设置最后构建时间（使用字符串格式）
-        last_build = datetime.now().strftime('%a, %d %b %Y %H:%M:%S GMT')
-        fg.lastBuildDate(last_build)
+        # 最后构建时间取文章的最新时间（使用字符串格式）：内容不变时重新生成的 XML 逐字节相同，ETag 不变
+        fg.lastBuildDate(self._last_build_date(articles).strftime('%a, %d %b %Y %H:%M:%S GMT'))
 
         # 添加文章条目
         entry_count = 0
@@ -99,6 +98,21 @@ class RSSGenerator:
 
         return rss_xml
 
+    @staticmethod
+    def _last_build_date(articles: List[Article]) -> datetime:
+        """
+        频道内容的最后变化时间：文章发布时间与入库时间中最新的一个
+
+        没有文章时返回固定的 Unix 纪元，同样保证输出稳定
+        """
+        times = [
+            value.replace(tzinfo=None)
+            for article in articles
+            for value in (article.published_at, article.created_at)
+            if value is not None
+        ]
+        return max(times, default=datetime(1970, 1, 1))
+
     def _create_entry(self, fg: FeedGenerator, article: Article, summary_type: str) -> None:
         """
         创建单个 RSS 条目
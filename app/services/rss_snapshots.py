@@ -0,0 +1,352 @@
+"""
+预渲染 RSS 快照
+/api/rss 的常用变体（全部文章、每个分类 × zh/en/bilingual，默认数量、不限天数）
+由抓取任务预先渲染成字节串，保存在内存并落盘，路由直接返回，不再按请求生成 XML。
+
+- 文章或摘要变化时按分类作废对应快照（连同“全部文章”快照），内存与磁盘文件一起删除
+- 重建只渲染缺失的快照：抓取任务结束时与定时刷新任务中执行，只有新增文章/摘要的分类会被重建
+- 每份快照带数据水位（渲染所用文章字段的哈希，写在文件名里）。本进程之外的写库
+  （摘要重建脚本、迁移脚本、手工改库、提交后未及作废就崩溃）不会作废快照，因此：
+  超过 rss_snapshot_max_age 的快照不再直接返回，由定时任务核对水位，一致则续期，不一致则重新渲染；
+  进程重启加载磁盘快照时同样核对水位，不一致的文件删除
+- 作废与重建并发时按分类代号判断：渲染期间被作废的结果丢弃，不会覆盖成旧数据
+- 快照记录其中尚无摘要的文章，命中快照时照常记录访问
+"""
+import base64
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlmodel import Session, select
+from app.models import Article, Feed
+from app.services.rss_generator import generate_rss_response
+from app.services.response_cache import make_etag
+from app.services.summary_queue import unsummarized_ids
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_TYPES = ("zh", "en", "bilingual")
+# 与 /api/rss 的 limit 默认值一致，只有默认数量的请求走快照
+SNAPSHOT_LIMIT = 50
+RSS_MEDIA_TYPE = "application/rss+xml; charset=utf-8"
+# 全部文章快照的分类键
+ALL_CATEGORIES = None
+
+SnapshotKey = Tuple[Optional[str], str]
+
+
+@dataclass
+class RssSnapshot:
+    """一份预渲染的 RSS"""
+    body: bytes
+    etag: str
+    built_at: datetime
+    # 渲染时的数据水位（_watermark）
+    watermark: str = ""
+    # 其中尚无摘要的文章（命中快照时记录访问）
+    article_ids: Tuple[int, ...] = ()
+    # 最近一次确认与数据库一致的时间（time.monotonic）
+    checked_at: float = 0.0
+
+
+def _watermark(articles: List[Article]) -> str:
+    """数据水位：渲染用到的文章字段的哈希，数据库中这些字段有任何变化都会不同"""
+    digest = hashlib.sha256()
+    for article in articles:
+        feed = article.feed
+        digest.update(repr((
+            article.id, article.title, article.link, article.summary, article.summary_en,
+            article.published_at, article.created_at,
+            feed.name if feed else None, feed.category if feed else None,
+        )).encode())
+    return digest.hexdigest()[:16]
+
+
+def _token(category: Optional[str]) -> str:
+    """分类名做 URL 安全的 base64 编码，避免路径字符"""
+    if category is ALL_CATEGORIES:
+        return "all"
+    return "c-" + base64.urlsafe_b64encode(category.encode()).decode().rstrip("=")
+
+
+def _file_name(category: Optional[str], summary_type: str, watermark: str) -> str:
+    """快照文件名：摘要类型.分类.数据水位.xml"""
+    return f"{summary_type}.{_token(category)}.{watermark}.xml"
+
+
+def _file_pattern(category: Optional[str], summary_type: str) -> str:
+    """某个快照各个水位的文件"""
+    return f"{summary_type}.{_token(category)}.*.xml"
+
+
+def _parse_file_name(name: str) -> Optional[Tuple[SnapshotKey, str]]:
+    """
+    _file_name 的逆运算；不是快照文件时返回 None
+
+    旧版本不带水位的文件名（摘要类型.分类.xml）水位为空字符串，加载时总会被判为过期
+    """
+    parts = name.split(".")
+    if len(parts) == 3:
+        parts.insert(2, "")
+    if len(parts) != 4 or parts[0] not in SUMMARY_TYPES or parts[3] != "xml":
+        return None
+    summary_type, token, watermark = parts[0], parts[1], parts[2]
+    if token == "all":
+        return (ALL_CATEGORIES, summary_type), watermark
+    if not token.startswith("c-"):
+        return None
+    try:
+        encoded = token[2:]
+        category = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+    except ValueError:
+        return None
+    return (category, summary_type), watermark
+
+
+def _is_fresh(snapshot: RssSnapshot) -> bool:
+    """快照最近一次核对水位后未超过最长使用时间"""
+    return time.monotonic() - snapshot.checked_at <= settings.rss_snapshot_max_age
+
+
+class RssSnapshotStore:
+    """RSS 快照的内存索引与磁盘目录"""
+
+    def __init__(self):
+        self._snapshots: Dict[SnapshotKey, RssSnapshot] = {}
+        # 每个分类的作废次数：重建前后不一致说明渲染期间数据有变化
+        self._generations: Dict[Optional[str], int] = {}
+        self._everything_generation = 0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    @property
+    def directory(self) -> Optional[Path]:
+        """落盘目录（未配置时只保存在内存）"""
+        return Path(settings.rss_snapshot_dir) if settings.rss_snapshot_dir else None
+
+    def get(self, category: Optional[str], summary_type: str) -> Optional[RssSnapshot]:
+        """取出有效的快照（超过最长使用时间、尚未重新核对的快照视为无效）"""
+        if not settings.rss_snapshot_enabled:
+            return None
+        with self._lock:
+            snapshot = self._snapshots.get((category, summary_type))
+        if snapshot is None or not _is_fresh(snapshot):
+            return None
+        return snapshot
+
+    def _generation(self, category: Optional[str]) -> Tuple[int, int]:
+        return self._everything_generation, self._generations.get(category, 0)
+
+    def invalidate(self, categories: Optional[Iterable[str]] = None) -> None:
+        """
+        作废快照
+
+        Args:
+            categories: 数据有变化的分类（“全部文章”快照总是一并作废）；None 表示作废全部快照
+        """
+        with self._lock:
+            if categories is None:
+                self._everything_generation += 1
+                keys = list(self._snapshots)
+            else:
+                affected = {ALL_CATEGORIES, *categories}
+                for category in affected:
+                    self._generations[category] = self._generations.get(category, 0) + 1
+                keys = [(category, summary_type) for category in affected for summary_type in SUMMARY_TYPES]
+            for key in keys:
+                self._snapshots.pop(key, None)
+
+        directory = self.directory
+        if directory is None or not directory.is_dir():
+            return
+        if categories is None:
+            paths = [path for path in directory.glob("*.xml") if _parse_file_name(path.name)]
+        else:
+            paths = [path for key in keys for path in directory.glob(_file_pattern(*key))]
+        self._unlink(paths)
+
+    @staticmethod
+    def _unlink(paths: Iterable[Path]) -> None:
+        for path in paths:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"删除 RSS 快照文件失败 {path}: {e}")
+
+    def load(self, session: Session) -> int:
+        """
+        从磁盘加载快照（应用启动时调用）
+
+        逐个分类按当前数据计算水位，与文件名中的水位一致的快照才加载，不一致的文件删除
+
+        Returns:
+            加载的快照数量
+        """
+        from app.crud import get_articles
+
+        directory = self.directory
+        if not settings.rss_snapshot_enabled or directory is None or not directory.is_dir():
+            return 0
+        files: Dict[Optional[str], List[Tuple[Path, str, str]]] = {}
+        for path in directory.glob("*.xml"):
+            parsed = _parse_file_name(path.name)
+            if parsed is not None:
+                (category, summary_type), watermark = parsed
+                files.setdefault(category, []).append((path, summary_type, watermark))
+
+        loaded = {}
+        stale = []
+        for category, entries in files.items():
+            articles = get_articles(session, limit=SNAPSHOT_LIMIT, category=category)
+            current = _watermark(articles)
+            article_ids = tuple(unsummarized_ids(articles))
+            for path, summary_type, watermark in entries:
+                if watermark != current:
+                    stale.append(path)
+                    continue
+                try:
+                    body = path.read_bytes()
+                    built_at = datetime.fromtimestamp(int(path.stat().st_mtime), UTC)
+                except OSError as e:
+                    logger.warning(f"读取 RSS 快照失败 {path}: {e}")
+                    continue
+                loaded[(category, summary_type)] = RssSnapshot(
+                    body=body,
+                    etag=make_etag(body),
+                    built_at=built_at,
+                    watermark=watermark,
+                    article_ids=article_ids,
+                    checked_at=time.monotonic(),
+                )
+        self._unlink(stale)
+
+        with self._lock:
+            # 已经在内存中重建过的快照更新，不用磁盘上的覆盖
+            for key, snapshot in loaded.items():
+                self._snapshots.setdefault(key, snapshot)
+        logger.info(f"从磁盘加载了 {len(loaded)} 份 RSS 快照，删除 {len(stale)} 份过期快照: {directory}")
+        return len(loaded)
+
+    def rebuild(self, session: Session) -> int:
+        """
+        渲染缺失的快照（被作废的分类、新出现的分类、首次启动时的全部快照）
+
+        超过最长使用时间的快照一并核对：数据水位不变时只续期，不重新渲染
+
+        Returns:
+            本次渲染的快照数量
+        """
+        if not settings.rss_snapshot_enabled:
+            return 0
+        # 抓取任务与定时刷新任务可能同时触发，只让一个执行
+        if not self._build_lock.acquire(blocking=False):
+            return 0
+        try:
+            categories: List[Optional[str]] = [ALL_CATEGORIES]
+            categories += sorted(c for c in session.exec(select(Feed.category).distinct()).all() if c)
+            with self._lock:
+                missing = [
+                    category for category in categories
+                    if any(
+                        (category, summary_type) not in self._snapshots
+                        or not _is_fresh(self._snapshots[(category, summary_type)])
+                        for summary_type in SUMMARY_TYPES
+                    )
+                ]
+
+            built = 0
+            for category in missing:
+                try:
+                    built += self._build_category(session, category)
+                except Exception as e:
+                    logger.error(f"生成 RSS 快照失败 [{category or '全部'}]: {e}")
+            if built:
+                logger.info(f"生成 RSS 快照 {built} 份（分类: {[c or '全部' for c in missing]}）")
+            return built
+        finally:
+            self._build_lock.release()
+
+    def _build_category(self, session: Session, category: Optional[str]) -> int:
+        """渲染一个分类的三种摘要类型并保存（数据水位与现有快照一致时只续期）"""
+        from app.crud import get_articles
+
+        with self._lock:
+            generation = self._generation(category)
+
+        articles = get_articles(session, limit=SNAPSHOT_LIMIT, category=category)
+        watermark = _watermark(articles)
+        article_ids = tuple(unsummarized_ids(articles))
+        keys = [(category, summary_type) for summary_type in SUMMARY_TYPES]
+        with self._lock:
+            existing = [self._snapshots.get(key) for key in keys]
+            if self._generation(category) == generation and all(
+                snapshot is not None and snapshot.watermark == watermark for snapshot in existing
+            ):
+                for snapshot in existing:
+                    snapshot.article_ids = article_ids
+                    snapshot.checked_at = time.monotonic()
+                return 0
+
+        snapshots = {}
+        for summary_type in SUMMARY_TYPES:
+            # 与 /api/rss 路由的渲染参数一致
+            rss_xml = generate_rss_response(
+                articles=articles,
+                summary_type=summary_type,
+                base_url="http://localhost:8000",
+                title=f"AI-RSS-Hub - {category}" if category else None,
+                description=f"AI 智能聚合的 {category} 资讯" if category else None,
+            )
+            body = rss_xml if isinstance(rss_xml, bytes) else rss_xml.encode("utf-8")
+            snapshots[(category, summary_type)] = RssSnapshot(
+                body=body,
+                etag=make_etag(body),
+                built_at=datetime.now(UTC).replace(microsecond=0),
+                watermark=watermark,
+                article_ids=article_ids,
+                checked_at=time.monotonic(),
+            )
+
+        with self._lock:
+            if self._generation(category) != generation:
+                # 渲染期间数据已变化，留给下一次重建
+                return 0
+            self._snapshots.update(snapshots)
+            # 在锁内落盘：之后的作废一定能删掉这里写入的文件
+            for key, snapshot in snapshots.items():
+                self._write(key, snapshot)
+        return len(snapshots)
+
+    def _write(self, key: SnapshotKey, snapshot: RssSnapshot) -> None:
+        """原子写入快照文件（先写临时文件再替换），再删除同一快照其他水位的旧文件"""
+        directory = self.directory
+        if directory is None:
+            return
+        name = _file_name(*key, snapshot.watermark)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = directory / f".{name}.tmp"
+            tmp_path.write_bytes(snapshot.body)
+            os.replace(tmp_path, directory / name)
+        except OSError as e:
+            logger.warning(f"写入 RSS 快照文件失败 {name}: {e}")
+            return
+        self._unlink(path for path in directory.glob(_file_pattern(*key)) if path.name != name)
+
+    def clear(self) -> None:
+        """清空内存中的快照（不删除磁盘文件）"""
+        with self._lock:
+            self._snapshots.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"snapshots": len(self._snapshots)}
+
+
+rss_snapshots = RssSnapshotStore()
@@ -0,0 +1,405 @@
+"""
+文章全文搜索
+基于两张 SQLite FTS5 虚拟表（rowid 即文章 ID），都不保存正文副本：
+
+- article_fts：外部内容表（content='article'），索引标题与中英文摘要，列值直接读 article 表，
+  由触发器随文章插入、摘要修改与删除同步
+- article_body_fts：无内容表（content=''），只保存清洗后正文的倒排索引，正文仍只在 article_content 中压缩存放；
+  正文入库后不再修改，由入库流程写入
+
+- 分词使用 trigram：按 3 字切片，中文不需要分词词典，英文不区分大小写，任意子串都能命中
+- 每个词在标题/摘要或正文中命中即可，多个词之间为 AND；按两张表的 BM25 之和排序（标题权重最高）
+- 命中片段优先取标题/摘要的 snippet()，只有正文命中时从解压后的正文截取
+
+trigram 无法用全文索引匹配不足 3 个字的词：这类词在候选集上逐行过滤（正文按需解压）；
+查询只包含短词时退化为逐行扫描（按文章 ID 倒序，读满 limit 即停，否则代价随文章数线性增长）。
+无内容表在 SQLite 3.43 之前不支持按 rowid 删除：文章删除后正文索引中的旧条目保留，查询时与 article 表连接过滤掉。
+"""
+import re
+import weakref
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlmodel import Session, select
+from sqlalchemy import column, func, inspect, literal_column, null, table, text, union_all
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import contains_eager, load_only
+from app.models import Article, Feed
+from app.crud import ARTICLE_LIST_COLUMNS, FEED_LIST_COLUMNS, article_date_conditions
+from app.services.content_store import decode_text, load_texts
+import logging
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "article_fts"
+BODY_FTS_TABLE = "article_body_fts"
+# trigram 分词下能走全文索引的最短词长
+MIN_MATCH_CHARS = 3
+# BM25 列权重：title, summary, summary_en；正文为 1
+BM25_WEIGHTS = (10.0, 4.0, 4.0)
+SNIPPET_TOKENS = 32
+SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_ELLIPSIS = "<mark>", "</mark>", "…"
+# 短词过滤每次读取的候选行数
+SCAN_CHUNK = 200
+# 建立索引时每批回填的正文数
+BACKFILL_BATCH_SIZE = 500
+
+SEARCH_INDEX_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+    USING fts5(title, summary, summary_en, content='article', content_rowid='id', tokenize='trigram')
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {BODY_FTS_TABLE}
+    USING fts5(content, content='', tokenize='trigram')
+    """,
+    # 摘要由多条路径写入（摘要队列、批量重建、近似重复复用……），用触发器统一同步；
+    # 外部内容表删除旧条目时要传入原来的列值
+    f"""
+    CREATE TRIGGER IF NOT EXISTS article_fts_insert AFTER INSERT ON article
+    BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, summary, summary_en)
+        VALUES (new.id, new.title, new.summary, new.summary_en);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS article_fts_update AFTER UPDATE OF title, summary, summary_en ON article
+    BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, summary, summary_en)
+        VALUES ('delete', old.id, old.title, old.summary, old.summary_en);
+        INSERT INTO {FTS_TABLE} (rowid, title, summary, summary_en)
+        VALUES (new.id, new.title, new.summary, new.summary_en);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS article_fts_delete AFTER DELETE ON article
+    BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, summary, summary_en)
+        VALUES ('delete', old.id, old.title, old.summary, old.summary_en);
+    END
+    """,
+)
+
+_fts = table(FTS_TABLE, column("rowid"))
+_fts_ref = literal_column(FTS_TABLE)
+_body_fts = table(BODY_FTS_TABLE, column("rowid"))
+_body_fts_ref = literal_column(BODY_FTS_TABLE)
+
+# 各引擎是否已建立全文索引（未执行迁移的旧库上入库流程跳过索引写入）
+_index_available: "weakref.WeakKeyDictionary[Engine, bool]" = weakref.WeakKeyDictionary()
+
+
+class SearchUnavailableError(Exception):
+    """当前数据库没有全文索引（非 SQLite，或尚未执行迁移）"""
+
+
+def ensure_search_index(engine: Engine) -> bool:
+    """
+    创建全文索引表与同步触发器（已存在时跳过）
+
+    索引表第一次创建时在同一事务中回填存量文章，建好后立即可搜；
+    旧版本保存正文副本的 article_fts 会被删除重建。
+
+    Returns:
+        是否可用（非 SQLite 或 SQLite 不支持 FTS5 trigram 时返回 False）
+    """
+    if engine.dialect.name != "sqlite":
+        _index_available[engine] = False
+        return False
+    try:
+        with engine.begin() as conn:
+            # pysqlite 不会为 DDL 隐式开启事务；显式 BEGIN，失败时不留下未回填的半成品索引表
+            conn.exec_driver_sql("BEGIN")
+            _create_index(conn)
+    except Exception as e:
+        logger.warning(f"全文索引不可用（需要 SQLite 3.34+ 的 FTS5 trigram 分词）: {e}")
+        _index_available[engine] = False
+        return False
+    _index_available[engine] = True
+    return True
+
+
+def _create_index(conn: Connection) -> None:
+    """建表、建触发器，并回填新建的索引表"""
+    existing = dict(conn.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+        (FTS_TABLE, BODY_FTS_TABLE),
+    ).all())
+    if FTS_TABLE in existing and "content=" not in existing[FTS_TABLE].replace(" ", ""):
+        # 旧版本的普通 FTS5 表保存了标题、摘要与正文的完整副本
+        conn.exec_driver_sql(f"DROP TABLE {FTS_TABLE}")
+        for trigger in ("article_fts_update", "article_fts_delete"):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        del existing[FTS_TABLE]
+        logger.info(f"已删除旧版全文索引 {FTS_TABLE}（含正文副本），改为外部内容表")
+
+    for statement in SEARCH_INDEX_DDL:
+        conn.exec_driver_sql(statement)
+
+    if FTS_TABLE not in existing:
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    if BODY_FTS_TABLE not in existing:
+        indexed = _backfill_bodies(conn)
+        if indexed:
+            logger.info(f"全文索引回填正文 {indexed} 篇")
+
+
+def _backfill_bodies(conn: Connection) -> int:
+    """把存量文章的正文写入正文索引（优先 article_content，其次 article 表的旧正文列）"""
+    tables = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "article" not in tables:
+        return 0
+    article_columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(article)")}
+    has_content_table = "article_content" in tables
+    selected = [
+        "c.codec, c.text, c.raw" if has_content_table else "NULL, NULL, NULL",
+        "a.content_text" if "content_text" in article_columns else "NULL",
+        "a.content" if "content" in article_columns else "NULL",
+    ]
+    join = "LEFT JOIN article_content c ON c.article_id = a.id" if has_content_table else ""
+
+    from app.services.content_cleaner import clean_html
+
+    last_id = 0
+    indexed = 0
+    while True:
+        rows = conn.exec_driver_sql(
+            f"SELECT a.id, {', '.join(selected)} FROM article a {join} WHERE a.id > ? ORDER BY a.id LIMIT ?",
+            (last_id, BACKFILL_BATCH_SIZE),
+        ).all()
+        if not rows:
+            return indexed
+        last_id = rows[-1][0]
+        params = []
+        for article_id, codec, text_blob, raw, content_text, content in rows:
+            body = decode_text(text_blob, raw, codec) or content_text or (clean_html(content) if content else "")
+            if body:
+                params.append((article_id, body))
+        if params:
+            conn.exec_driver_sql(f"INSERT INTO {BODY_FTS_TABLE} (rowid, content) VALUES (?, ?)", params)
+            indexed += len(params)
+
+
+def _is_available(session: Session) -> bool:
+    engine = session.get_bind()
+    if isinstance(engine, Engine) and engine in _index_available:
+        return _index_available[engine]
+    # 用会话自己的连接检查：另取连接在单连接池（内存库）上归还时会回滚会话中未提交的写入
+    available = engine.dialect.name == "sqlite" and inspect(session.connection()).has_table(BODY_FTS_TABLE)
+    if isinstance(engine, Engine):
+        _index_available[engine] = available
+    return available
+
+
+def index_articles(session: Session, rows: Iterable[dict]) -> int:
+    """
+    把新插入文章的正文写入正文索引（不提交；标题与摘要由触发器索引）
+
+    Args:
+        session: 数据库会话
+        rows: 已带 id 的文章行（含 content_text）
+
+    Returns:
+        写入的行数；没有全文索引时为 0
+    """
+    if not _is_available(session):
+        return 0
+    params = [
+        {"rowid": row["id"], "content": row["content_text"]}
+        for row in rows
+        if row.get("content_text")
+    ]
+    if params:
+        session.execute(
+            text(f"INSERT INTO {BODY_FTS_TABLE} (rowid, content) VALUES (:rowid, :content)"),
+            params,
+        )
+    return len(params)
+
+
+def parse_query(query: str) -> Tuple[Optional[str], List[str]]:
+    """
+    把用户输入拆成 FTS5 查询表达式与短词
+
+    每个词按短语匹配（双引号转义，用户输入中的 FTS5 语法不生效），多个词之间为 AND。
+
+    Returns:
+        (MATCH 表达式，没有可索引的词时为 None, 不足 3 个字的短词列表)
+    """
+    terms = [term for term in re.split(r"\s+", query.replace('"', " ")) if term]
+    long_terms = [term for term in terms if len(term) >= MIN_MATCH_CHARS]
+    short_terms = [term for term in terms if len(term) < MIN_MATCH_CHARS]
+    match = " AND ".join(f'"{term}"' for term in long_terms) or None
+    return match, short_terms
+
+
+def _term_ids(phrase: str):
+    """标题/摘要或正文中包含该短语的文章 ID"""
+    return union_all(
+        select(_fts.c.rowid).where(_fts_ref.op("MATCH")(phrase)),
+        select(_body_fts.c.rowid).where(_body_fts_ref.op("MATCH")(phrase)),
+    )
+
+
+def _excerpt(values: Iterable[Optional[str]], term: str) -> Optional[str]:
+    """从第一个包含该词的文本中截取命中位置附近的文字"""
+    for value in values:
+        if not value:
+            continue
+        index = value.lower().find(term.lower())
+        if index < 0:
+            continue
+        start = max(0, index - SNIPPET_TOKENS // 2)
+        end = index + len(term) + SNIPPET_TOKENS // 2
+        return (
+            (SNIPPET_ELLIPSIS if start > 0 else "")
+            + value[start:index] + SNIPPET_OPEN + value[index:index + len(term)] + SNIPPET_CLOSE
+            + value[index + len(term):end]
+            + (SNIPPET_ELLIPSIS if end < len(value) else "")
+        )
+    return None
+
+
+def _fields(article: Article, body: Optional[str]) -> Tuple[Optional[str], ...]:
+    return article.title, article.summary, article.summary_en, body
+
+
+def _contains_all(article: Article, body: Optional[str], terms: List[str]) -> bool:
+    values = [value.lower() for value in _fields(article, body) if value]
+    return all(any(term.lower() in value for value in values) for term in terms)
+
+
+def _scan_short_terms(session: Session, statement, short_terms: List[str], limit: int, offset: int):
+    """
+    按候选顺序分块读取，逐行过滤短词（标题、摘要与解压后的正文），读满 offset + limit 即停
+
+    Returns:
+        [(查询行, 正文)]
+    """
+    matched = []
+    skipped = 0
+    position = 0
+    while len(matched) < limit:
+        rows = session.exec(statement.limit(SCAN_CHUNK).offset(position)).all()
+        position += len(rows)
+        bodies: Dict[int, str] = load_texts(session, [row[0].id for row in rows])
+        for row in rows:
+            body = bodies.get(row[0].id)
+            if not _contains_all(row[0], body, short_terms):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            matched.append((row, body))
+            if len(matched) == limit:
+                break
+        if len(rows) < SCAN_CHUNK:
+            break
+    return matched
+
+
+def search_articles(
+    session: Session,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    category: Optional[str] = None,
+    days: Optional[int] = None,
+    date: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[Tuple[Article, Optional[str], Optional[float]]]:
+    """
+    全文搜索文章
+
+    Args:
+        session: 数据库会话
+        query: 搜索词（空白分隔的多个词之间为 AND）
+        limit: 返回数量
+        offset: 跳过的结果数
+        category: 按分类筛选
+        days / date / start_date / end_date: 发布时间过滤（与文章列表相同）
+
+    Returns:
+        [(文章, 命中片段, 相关度得分)]，按相关度降序；只有短词时按文章 ID 倒序、得分为 None
+
+    Raises:
+        SearchUnavailableError: 当前数据库没有全文索引
+        ValueError: 日期格式错误
+    """
+    if not _is_available(session):
+        raise SearchUnavailableError("全文索引未建立（需要 SQLite，并执行 scripts/migration/create_article_fts.py）")
+
+    match, short_terms = parse_query(query)
+    if not match and not short_terms:
+        return []
+    long_terms = re.findall(r'"([^"]*)"', match) if match else []
+
+    conditions = article_date_conditions(days=days, date=date, start_date=start_date, end_date=end_date)
+    if category:
+        conditions.append(Feed.category == category)
+    if len(long_terms) > 1:
+        # 多个长词时每个词都要在标题/摘要或正文中命中（各自走全文索引）
+        conditions += [Article.id.in_(_term_ids(f'"{term}"')) for term in long_terms]
+
+    # 结果行统一为 (文章, 命中片段, 得分)
+    statement = select(Article, null().label("snippet"), null().label("score"))
+    if match:
+        # 任一长词命中的文章及相关度：bm25 越小越相关，两张表相加后对外取相反数
+        any_term = " OR ".join(f'"{term}"' for term in long_terms)
+        hits = union_all(
+            select(
+                _fts.c.rowid.label("id"),
+                func.bm25(_fts_ref, *(literal_column(repr(weight)) for weight in BM25_WEIGHTS)).label("score"),
+                func.snippet(
+                    _fts_ref, -1, SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_ELLIPSIS, SNIPPET_TOKENS
+                ).label("snippet"),
+            ).where(_fts_ref.op("MATCH")(any_term)),
+            select(
+                _body_fts.c.rowid.label("id"),
+                func.bm25(_body_fts_ref).label("score"),
+                null().label("snippet"),
+            ).where(_body_fts_ref.op("MATCH")(any_term)),
+        ).subquery()
+        ranked = select(
+            hits.c.id,
+            func.sum(hits.c.score).label("score"),
+            func.max(hits.c.snippet).label("snippet"),
+        ).group_by(hits.c.id).subquery()
+        score = ranked.c.score
+        # 从命中集合出发按主键取文章，不扫描 article 表
+        statement = (
+            select(Article, ranked.c.snippet, (-score).label("score"))
+            .select_from(ranked)
+            .join(Article, Article.id == ranked.c.id)
+        )
+    statement = (
+        statement
+        .join(Feed, Feed.id == Article.feed_id)
+        .options(
+            load_only(*ARTICLE_LIST_COLUMNS),
+            contains_eager(Article.feed).load_only(*FEED_LIST_COLUMNS),
+        )
+        .where(*conditions)
+        .order_by(score if match else Article.id.desc())
+    )
+
+    if short_terms:
+        rows = _scan_short_terms(session, statement, short_terms, limit, offset)
+    else:
+        rows = [(row, None) for row in session.exec(statement.limit(limit).offset(offset)).all()]
+
+    if not match:
+        return [
+            (row[0], _excerpt(_fields(row[0], body), short_terms[0]), None)
+            for row, body in rows
+        ]
+
+    # 只有正文命中的文章没有 snippet()，从解压后的正文截取
+    missing = [row[0].id for row, body in rows if row[1] is None and body is None]
+    bodies = load_texts(session, missing) if missing else {}
+    results = []
+    for row, body in rows:
+        article, snippet, row_score = row
+        if snippet is None:
+            snippet = _excerpt([body or bodies.get(article.id)], long_terms[0])
+        results.append((article, snippet, row_score))
+    return results
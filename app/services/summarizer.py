@@ -3,21 +3,103 @@ AI 总结服务
 使用 OpenAI 兼容接口进行文本总结
 可以轻松替换为 DeepSeek、Gemini 等其他提供商
 """
-from openai import AsyncOpenAI, APITimeoutError, APIError, RateLimitError
+from openai import APITimeoutError, APIConnectionError, APIError, InternalServerError, RateLimitError
 from app.config import settings
+from app.services.llm_client import get_llm_client
+from app.services.llm_limiter import get_llm_limiter
+from app.services.llm_rate_limiter import get_llm_rate_limiter
+from app.services.llm_providers import get_provider_pool, llm_configured
+from app.services.extractive_summarizer import summarize_extractive
+from app.services.prompt_budget import clean_content, count_tokens, fit_content, output_tokens
+from app.services.summary_cache import make_cache_key, get_cached_summary, store_cached_summary
 import logging
 import asyncio
+import json
+import time
 import re
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
 from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
     retry_if_exception_type,
-    before_sleep_log
+    before_sleep_log,
+    RetryError,
 )
 
 logger = logging.getLogger(__name__)
 
+# 失败时返回的占位文本：只用于展示，不能当作摘要落库或写入缓存
+SUMMARY_NOT_CONFIGURED = "未配置 AI 服务"
+SUMMARY_TOO_SHORT = "内容过短，无需总结"
+SUMMARY_TIMEOUT = "总结生成超时"
+SUMMARY_FAILED = "总结生成失败"
+SUMMARY_ERROR = "总结生成异常"
+SUMMARY_PLACEHOLDERS = frozenset({
+    SUMMARY_NOT_CONFIGURED, SUMMARY_TOO_SHORT, SUMMARY_TIMEOUT, SUMMARY_FAILED, SUMMARY_ERROR,
+})
+
+
+class FallbackSummary(str):
+    """LLM 调用失败时的降级摘要（本地抽取式）：照常返回给调用方，但不写入摘要缓存"""
+
+# 可切换到下一个服务商的错误：超时/连接失败（含 APITimeoutError）、限流与服务端 5xx
+FAILOVER_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+# 当前任务最近一次调用实际使用的模型（写摘要缓存时记录）
+_served_model: ContextVar[Optional[str]] = ContextVar("served_model", default=None)
+
+
+async def _create_chat_completion(semaphore: asyncio.Semaphore = None, **kwargs):
+    """
+    发起一次 chat completion 调用
+
+    先按全局 RPM/TPM 令牌桶等待配额（跨进程共享），再按服务商池的排序依次尝试：
+    每个服务商先等待自己的配额，再占用调用方信号量（可选）与该服务商的自适应并发槽位；
+    超时、连接失败、限流或 5xx 时记录失败并切换到下一个服务商，全部失败才抛出（交给 tenacity 退避重试）。
+    槽位只覆盖单次 API 调用，退避等待期间不占用任何槽位。
+    """
+    pool = get_provider_pool()
+    rate_limiter = get_llm_rate_limiter()
+    estimated = _estimate_request_tokens(kwargs)
+    await rate_limiter.acquire(estimated)
+
+    last_error = None
+    for provider in pool.ranked():
+        provider_rate_limiter = get_llm_rate_limiter(provider)
+        await provider_rate_limiter.acquire(estimated)
+
+        # 复用进程内共享的长连接客户端，不再逐篇新建连接池
+        client = get_llm_client(provider)
+        try:
+            async with semaphore or nullcontext():
+                async with get_llm_limiter(provider).slot():
+                    started_at = time.monotonic()
+                    response = await client.chat.completions.create(model=provider.model, **kwargs)
+        except FAILOVER_ERRORS as e:
+            pool.record_failure(provider, e)
+            last_error = e
+            logger.warning(f"LLM 服务商 {provider.name} 调用失败（{type(e).__name__}），尝试下一个")
+            continue
+        pool.record_success(provider, time.monotonic() - started_at)
+        _served_model.set(provider.model)
+
+        usage = getattr(response, "usage", None)
+        for limiter in (rate_limiter, provider_rate_limiter):
+            if limiter.enabled:
+                await asyncio.to_thread(limiter.settle, estimated, getattr(usage, "total_tokens", None))
+        return response
+
+    raise last_error
+
+
+def _estimate_request_tokens(kwargs: dict) -> int:
+    """估算一次请求消耗的 Token：提示词估算 + 输出上限"""
+    prompt_tokens = sum(count_tokens(message["content"]) for message in kwargs.get("messages", []))
+    return prompt_tokens + kwargs.get("max_tokens", 0)
+
 
 async def summarize_text_async(text: str, semaphore: asyncio.Semaphore = None) -> str:
     """
@@ -31,75 +113,64 @@ async def summarize_text_async(text: str, semaphore: asyncio.Semaphore = None) -
         总结后的文本（100字以内）
     """
     # 检查 API Key
-    if not settings.openai_api_key:
-        logger.warning("未配置 OPENAI_API_KEY，跳过 AI 总结")
-        return "未配置 AI 服务"
+    if not llm_configured():
+        logger.warning("未配置 LLM 服务（OPENAI_API_KEY / LLM_PROVIDERS），跳过 AI 总结")
+        return SUMMARY_NOT_CONFIGURED
 
     # 如果文本为空或太短，直接返回
     if not text or len(text.strip()) < 10:
-        return "内容过短，无需总结"
+        return SUMMARY_TOO_SHORT
 
-    # 使用信号量控制并发
-    if semaphore:
-        async with semaphore:
-            return await _do_summarize(text)
-    else:
-        return await _do_summarize(text)
+    return await _do_summarize(text, semaphore)
 
 
-async def _do_summarize(text: str) -> str:
+async def _do_summarize(text: str, semaphore: asyncio.Semaphore = None) -> str:
     """
     实际执行 AI 总结的内部函数
     """
     try:
-        # 初始化异步 OpenAI 客户端（上下文管理器确保连接正确释放）
-        async with AsyncOpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-            timeout=settings.llm_timeout,
-        ) as client:
-            # 构建提示词
-            prompt = f"""请用中文对以下文章内容进行简短总结，不超过{settings.summary_max_length}字：
+        # 构建提示词
+        prompt = f"""请用中文对以下文章内容进行简短总结，不超过{settings.summary_max_length}字：
 
-{text[:2000]}  # 限制输入长度，避免超出 token 限制
+{fit_content(text)}
 
 请直接输出总结内容，不要添加其他说明。"""
 
-            # 调用 API
-            response = await client.chat.completions.create(
-                model=settings.openai_model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的文章摘要助手。"},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.3,  # 较低的温度值，使输出更加确定
-                max_tokens=200,  # 限制输出长度
-            )
+        # 调用 API
+        response = await _create_chat_completion(
+            semaphore,
+            messages=[
+                {"role": "system", "content": "你是一个专业的文章摘要助手。"},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.3,  # 较低的温度值，使输出更加确定
+            max_tokens=output_tokens(zh_chars=settings.summary_max_length),  # 按期望输出长度限制
+        )
 
-            # 提取总结内容
-            summary = response.choices[0].message.content.strip()
+        # 提取总结内容
+        summary = response.choices[0].message.content.strip()
 
-            # 确保长度不超过限制
-            if len(summary) > settings.summary_max_length:
-                summary = summary[: settings.summary_max_length] + "..."
+        # 确保长度不超过限制
+        if len(summary) > settings.summary_max_length:
+            summary = summary[: settings.summary_max_length] + "..."
 
-            logger.info(f"AI 总结成功，原文长度: {len(text)}, 总结长度: {len(summary)}")
-            return summary
+        logger.info(f"AI 总结成功，原文长度: {len(text)}, 总结长度: {len(summary)}")
+        return summary
 
     except APITimeoutError:
         error_msg = f"LLM API 调用超时（超过 {settings.llm_timeout} 秒）"
         logger.error(error_msg)
-        return "总结生成超时"
+        return SUMMARY_TIMEOUT
 
     except APIError as e:
         error_msg = f"LLM API 调用失败: {e}"
         logger.error(error_msg)
-        return "总结生成失败"
+        return SUMMARY_FAILED
 
     except Exception as e:
         error_msg = f"AI 总结发生未知错误: {e}"
         logger.error(error_msg)
-        return "总结生成异常"
+        return SUMMARY_ERROR
 
 
 def summarize_text(text: str) -> str:
@@ -113,39 +184,46 @@ def summarize_text(text: str) -> str:
         总结后的文本（100字以内）
     """
     # 检查 API Key
-    if not settings.openai_api_key:
-        logger.warning("未配置 OPENAI_API_KEY，跳过 AI 总结")
-        return "未配置 AI 服务"
+    if not llm_configured():
+        logger.warning("未配置 LLM 服务（OPENAI_API_KEY / LLM_PROVIDERS），跳过 AI 总结")
+        return SUMMARY_NOT_CONFIGURED
 
     # 如果文本为空或太短，直接返回
     if not text or len(text.strip()) < 10:
-        return "内容过短，无需总结"
+        return SUMMARY_TOO_SHORT
 
     try:
-        # 初始化同步 OpenAI 客户端
+        # 初始化同步 OpenAI 客户端（使用排序最前且配置了 API Key 的服务商）
         from openai import OpenAI
+        provider = next(p for p in get_provider_pool().ranked() if p.api_key)
         client = OpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-            timeout=settings.llm_timeout,
+            api_key=provider.api_key,
+            base_url=provider.api_base,
+            timeout=provider.timeout or settings.llm_timeout,
         )
 
         # 构建提示词
         prompt = f"""请用中文对以下文章内容进行简短总结，不超过{settings.summary_max_length}字：
 
-{text[:2000]}  # 限制输入长度，避免超出 token 限制
+{fit_content(text)}
 
 请直接输出总结内容，不要添加其他说明。"""
+        messages = [
+            {"role": "system", "content": "你是一个专业的文章摘要助手。"},
+            {"role": "user", "content": prompt},
+        ]
+
+        # 与异步调用共用 RPM/TPM 配额
+        max_tokens = output_tokens(zh_chars=settings.summary_max_length)
+        estimated = _estimate_request_tokens({"messages": messages, "max_tokens": max_tokens})
+        get_llm_rate_limiter().acquire_sync(estimated)
 
         # 调用 API
         response = client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {"role": "system", "content": "你是一个专业的文章摘要助手。"},
-                {"role": "user", "content": prompt},
-            ],
+            model=provider.model,
+            messages=messages,
             temperature=0.3,
-            max_tokens=200,
+            max_tokens=max_tokens,
         )
 
         # 提取总结内容
@@ -161,7 +239,7 @@ def summarize_text(text: str) -> str:
     except Exception as e:
         error_msg = f"AI 总结失败: {e}"
         logger.error(error_msg)
-        return "总结生成失败"
+        return SUMMARY_FAILED
 
 
 async def test_llm_connection_async() -> bool:
@@ -171,8 +249,8 @@ async def test_llm_connection_async() -> bool:
     Returns:
         bool: 连接正常返回 True，否则返回 False
     """
-    if not settings.openai_api_key:
-        logger.warning("未配置 OPENAI_API_KEY")
+    if not llm_configured():
+        logger.warning("未配置 LLM 服务（OPENAI_API_KEY / LLM_PROVIDERS）")
         return False
 
     try:
@@ -190,8 +268,8 @@ def test_llm_connection() -> bool:
     Returns:
         bool: 连接正常返回 True，否则返回 False
     """
-    if not settings.openai_api_key:
-        logger.warning("未配置 OPENAI_API_KEY")
+    if not llm_configured():
+        logger.warning("未配置 LLM 服务（OPENAI_API_KEY / LLM_PROVIDERS）")
         return False
 
     try:
@@ -259,10 +337,44 @@ def _truncate_at_sentence(text: str, limit: int) -> str:
     return cut.rstrip() + "…"
 
 
+# 提示词版本：修改摘要提示词时递增，使旧的摘要缓存自然失效
+PROMPT_VERSION = "1"
+
+
+async def _lookup_cache(mode: str, title: str, content: str, use_cache: bool):
+    """
+    查询摘要缓存（计算缓存键与 SQLite 查询都在线程中执行，不阻塞事件循环）
+
+    Returns:
+        (cache_key, cached): 未启用缓存时 cache_key 为 None；未命中时 cached 为 None
+    """
+    if not use_cache or not settings.summary_cache_enabled:
+        return None, None
+    cache_key = await asyncio.to_thread(make_cache_key, mode, title, content, PROMPT_VERSION)
+    return cache_key, await asyncio.to_thread(get_cached_summary, cache_key)
+
+
+async def _store_cache(cache_key: str, zh_summary: str, en_summary: str) -> None:
+    """在线程中写入摘要缓存，记录实际生成摘要的模型"""
+    await asyncio.to_thread(
+        store_cached_summary, cache_key, zh_summary, en_summary, PROMPT_VERSION, _served_model.get()
+    )
+
+
+def _is_cacheable(summary: str) -> bool:
+    """只缓存 LLM 真正生成的摘要，排除失败占位文本和降级摘要"""
+    return (
+        bool(summary)
+        and summary.strip() not in SUMMARY_PLACEHOLDERS
+        and not isinstance(summary, FallbackSummary)
+    )
+
+
 async def summarize_article_bilingual(
     title: str,
     content: str,
-    semaphore: asyncio.Semaphore = None
+    semaphore: asyncio.Semaphore = None,
+    use_cache: bool = True
 ) -> tuple[str, str]:
     """
     生成中英文双语摘要
@@ -271,25 +383,30 @@ async def summarize_article_bilingual(
         title: 文章标题
         content: 文章内容
         semaphore: 并发控制信号量（可选）
+        use_cache: 是否查询/写入摘要缓存
 
     Returns:
         (zh_summary, en_summary): 中文摘要和英文摘要
     """
     # 检查 API Key
-    if not settings.openai_api_key:
-        logger.warning("未配置 OPENAI_API_KEY，跳过双语总结")
-        return "未配置 AI 服务", ""
+    if not llm_configured():
+        logger.warning("未配置 LLM 服务（OPENAI_API_KEY / LLM_PROVIDERS），跳过双语总结")
+        return SUMMARY_NOT_CONFIGURED, ""
 
     # 如果内容为空或太短，直接返回
     if not content or len(content.strip()) < 10:
-        return "内容过短，无需总结", ""
+        return SUMMARY_TOO_SHORT, ""
 
-    # 使用信号量控制并发
-    if semaphore:
-        async with semaphore:
-            return await _do_summarize_bilingual(title, content)
-    else:
-        return await _do_summarize_bilingual(title, content)
+    cache_key, cached = await _lookup_cache("bilingual", title, content, use_cache)
+    if cached is not None:
+        return cached
+
+    # 信号量只在实际调用 API 时占用，重试退避期间不占用
+    zh_summary, en_summary = await _do_summarize_bilingual(title, content, semaphore)
+
+    if cache_key and _is_cacheable(zh_summary) and en_summary:
+        await _store_cache(cache_key, zh_summary, en_summary)
+    return zh_summary, en_summary
 
 
 @retry(
@@ -298,22 +415,20 @@ async def summarize_article_bilingual(
     retry=retry_if_exception_type((APIError, APITimeoutError)),
     before_sleep=before_sleep_log(logger, logging.INFO),
 )
-async def _do_summarize_bilingual(title: str, content: str) -> tuple[str, str]:
+async def _do_summarize_bilingual(
+    title: str,
+    content: str,
+    semaphore: asyncio.Semaphore = None
+) -> tuple[str, str]:
     """
     实际执行双语摘要生成的内部函数（带重试机制）
     """
     try:
-        # 初始化异步 OpenAI 客户端（上下文管理器确保连接正确释放）
-        async with AsyncOpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-            timeout=settings.llm_timeout,
-        ) as client:
-            # 构建双语摘要提示词
-            prompt = f"""Please summarize the following article in BOTH Chinese and English.
+        # 构建双语摘要提示词
+        prompt = f"""Please summarize the following article in BOTH Chinese and English.
 
 Title: {title}
-Content: {content[:3000]}
+Content: {fit_content(content)}
 
 Requirements:
 1. Chinese summary (中文摘要): No more than {settings.summary_max_length} Chinese characters
@@ -328,36 +443,39 @@ English: [Your English Summary]
 
 Important: Only provide the summaries, no other text."""
 
-            # 调用 API
-            response = await client.chat.completions.create(
-                model=settings.openai_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional bilingual summarizer (Chinese and English)."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    },
-                ],
-                temperature=0.3,
-                max_tokens=500,  # 增加输出token限制以容纳双语摘要
-            )
+        # 调用 API
+        response = await _create_chat_completion(
+            semaphore,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a professional bilingual summarizer (Chinese and English)."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                },
+            ],
+            temperature=0.3,
+            max_tokens=output_tokens(
+                zh_chars=settings.summary_max_length,
+                en_chars=settings.summary_max_length * 2,
+            ),
+        )
 
-            # 提取响应内容
-            result = response.choices[0].message.content.strip()
+        # 提取响应内容
+        result = response.choices[0].message.content.strip()
 
-            # 解析中英文摘要
-            zh_summary = extract_chinese_summary(result)
-            en_summary = extract_english_summary(result)
+        # 解析中英文摘要
+        zh_summary = extract_chinese_summary(result)
+        en_summary = extract_english_summary(result)
 
-            # 截断过长的摘要（按句末标点收尾，避免半句话）
-            zh_summary = _truncate_at_sentence(zh_summary, settings.summary_max_length)
-            en_summary = _truncate_at_sentence(en_summary, settings.summary_max_length * 2)
+        # 截断过长的摘要（按句末标点收尾，避免半句话）
+        zh_summary = _truncate_at_sentence(zh_summary, settings.summary_max_length)
+        en_summary = _truncate_at_sentence(en_summary, settings.summary_max_length * 2)
 
-            logger.info(f"双语摘要生成成功 - 中文: {len(zh_summary)}字, 英文: {len(en_summary)}字符")
-            return zh_summary, en_summary
+        logger.info(f"双语摘要生成成功 - 中文: {len(zh_summary)}字, 英文: {len(en_summary)}字符")
+        return zh_summary, en_summary
 
     except RateLimitError:
         # 429 限流：抛给 tenacity 长退避重试，跨过 RPM 分钟窗口，不做降级
@@ -467,7 +585,8 @@ def extract_english_summary(text: str) -> str:
 async def summarize_article_auto(
     title: str,
     content: str,
-    semaphore: asyncio.Semaphore = None
+    semaphore: asyncio.Semaphore = None,
+    use_cache: bool = True
 ) -> tuple[str, str]:
     """
     自动检测语言并生成摘要
@@ -479,6 +598,7 @@ async def summarize_article_auto(
         title: 文章标题
         content: 文章内容
         semaphore: 并发控制信号量（可选）
+        use_cache: 是否查询/写入摘要缓存
 
     Returns:
         (zh_summary, en_summary): 中文摘要和英文摘要（其中一个可能为空）
@@ -488,17 +608,26 @@ async def summarize_article_auto(
 
     logger.info(f"内容语言检测结果: {language}, 标题: {title[:50]}...")
 
+    if language not in ('zh', 'en'):
+        # 混合内容：使用双语摘要（缓存在双语函数内处理）
+        return await summarize_article_bilingual(title, content, semaphore, use_cache)
+
+    cache_key, cached = await _lookup_cache(language, title, content, use_cache)
+    if cached is not None:
+        return cached
+
     if language == 'zh':
         # 纯中文内容：只生成中文摘要
         zh_summary = await _summarize_chinese_only(title, content, semaphore)
+        if cache_key and _is_cacheable(zh_summary):
+            await _store_cache(cache_key, zh_summary, "")
         return zh_summary, ""
-    elif language == 'en':
+    else:
         # 纯英文内容：只生成英文摘要
         en_summary = await _summarize_english_only(title, content, semaphore)
+        if cache_key and _is_cacheable(en_summary):
+            await _store_cache(cache_key, "", en_summary)
         return "", en_summary
-    else:
-        # 混合内容：使用双语摘要
-        return await summarize_article_bilingual(title, content, semaphore)
 
 
 @retry(
@@ -516,12 +645,7 @@ async def _summarize_chinese_only(
     只生成中文摘要（用于纯中文内容）
     """
     try:
-        # 使用信号量控制并发
-        if semaphore:
-            async with semaphore:
-                return await _do_summarize_chinese(title, content)
-        else:
-            return await _do_summarize_chinese(title, content)
+        return await _do_summarize_chinese(title, content, semaphore)
     except RateLimitError:
         # 429 限流：抛给 tenacity 长退避重试，跨过 RPM 分钟窗口，不做降级
         raise
@@ -530,42 +654,37 @@ async def _summarize_chinese_only(
         return _generate_fallback_summary(content)
 
 
-async def _do_summarize_chinese(title: str, content: str) -> str:
+async def _do_summarize_chinese(title: str, content: str, semaphore: asyncio.Semaphore = None) -> str:
     """
     实际执行中文摘要生成
     """
-    async with AsyncOpenAI(
-        api_key=settings.openai_api_key,
-        base_url=settings.openai_api_base,
-        timeout=settings.llm_timeout,
-    ) as client:
-        prompt = f"""请用中文对以下文章进行简短总结，不超过{settings.summary_max_length}字。
+    prompt = f"""请用中文对以下文章进行简短总结，不超过{settings.summary_max_length}字。
 
 标题：{title}
-内容：{content[:3000]}
+内容：{fit_content(content)}
 
 要求：
 1. 直接输出总结内容，不要有任何前缀或说明
 2. 保持简洁，抓住要点
 3. 只输出中文"""
 
-        response = await client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {"role": "system", "content": "你是一个专业的中文文章摘要助手。"},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,
-            max_tokens=200,
-        )
+    response = await _create_chat_completion(
+        semaphore,
+        messages=[
+            {"role": "system", "content": "你是一个专业的中文文章摘要助手。"},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+        max_tokens=output_tokens(zh_chars=settings.summary_max_length),
+    )
 
-        summary = response.choices[0].message.content.strip()
+    summary = response.choices[0].message.content.strip()
 
-        # 截断过长的摘要（按句末标点收尾）
-        summary = _truncate_at_sentence(summary, settings.summary_max_length)
+    # 截断过长的摘要（按句末标点收尾）
+    summary = _truncate_at_sentence(summary, settings.summary_max_length)
 
-        logger.info(f"中文摘要生成成功，长度: {len(summary)}字")
-        return summary
+    logger.info(f"中文摘要生成成功，长度: {len(summary)}字")
+    return summary
 
 
 @retry(
@@ -583,12 +702,7 @@ async def _summarize_english_only(
     只生成英文摘要（用于纯英文内容）
     """
     try:
-        # 使用信号量控制并发
-        if semaphore:
-            async with semaphore:
-                return await _do_summarize_english(title, content)
-        else:
-            return await _do_summarize_english(title, content)
+        return await _do_summarize_english(title, content, semaphore)
     except RateLimitError:
         # 429 限流：抛给 tenacity 长退避重试，跨过 RPM 分钟窗口，不做降级
         raise
@@ -597,58 +711,269 @@ async def _summarize_english_only(
         return ""
 
 
-async def _do_summarize_english(title: str, content: str) -> str:
+async def _do_summarize_english(title: str, content: str, semaphore: asyncio.Semaphore = None) -> str:
     """
     实际执行英文摘要生成
     """
-    async with AsyncOpenAI(
-        api_key=settings.openai_api_key,
-        base_url=settings.openai_api_base,
-        timeout=settings.llm_timeout,
-    ) as client:
-        prompt = f"""Please summarize the following article in English, no more than {settings.summary_max_length * 2} characters.
+    prompt = f"""Please summarize the following article in English, no more than {settings.summary_max_length * 2} characters.
 
 Title: {title}
-Content: {content[:3000]}
+Content: {fit_content(content)}
 
 Requirements:
 1. Output ONLY the summary, no prefixes or explanations
 2. Keep it concise and capture key points
 3. Output in English only"""
 
-        response = await client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {"role": "system", "content": "You are a professional article summarizer."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,
-            max_tokens=300,
-        )
+    response = await _create_chat_completion(
+        semaphore,
+        messages=[
+            {"role": "system", "content": "You are a professional article summarizer."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+        max_tokens=output_tokens(en_chars=settings.summary_max_length * 2),
+    )
 
-        summary = response.choices[0].message.content.strip()
+    summary = response.choices[0].message.content.strip()
 
-        # 截断过长的摘要（按句末标点收尾）
-        summary = _truncate_at_sentence(summary, settings.summary_max_length * 2)
+    # 截断过长的摘要（按句末标点收尾）
+    summary = _truncate_at_sentence(summary, settings.summary_max_length * 2)
 
-        logger.info(f"英文摘要生成成功，长度: {len(summary)}字符")
-        return summary
+    logger.info(f"英文摘要生成成功，长度: {len(summary)}字符")
+    return summary
+
+
+# ==================== 批量摘要功能 ====================
+
+def is_packable(content: str) -> bool:
+    """文章是否足够短、适合与其他短文章打包成一次请求"""
+    text = clean_content(content)
+    return 10 <= len(text) <= settings.summary_pack_item_max_chars
+
+
+def pack_articles(items: List[dict]) -> List[List[dict]]:
+    """
+    按篇数上限与 Token 预算把文章依次装箱
+
+    Args:
+        items: 文章列表（含 title、content）
+
+    Returns:
+        分组后的文章列表；超出预算的单篇文章自成一组
+    """
+    groups: List[List[dict]] = []
+    current: List[dict] = []
+    used = 0
+    for item in items:
+        cost = count_tokens(item["title"]) + count_tokens(clean_content(item["content"]))
+        if current and (
+            len(current) >= settings.summary_pack_max_items
+            or used + cost > settings.summary_pack_token_budget
+        ):
+            groups.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def parse_packed_response(text: str, count: int) -> Dict[int, Tuple[str, str]]:
+    """
+    解析打包请求返回的 JSON 数组
+
+    Args:
+        text: LLM 响应文本（允许包裹在 ```json 代码块或说明文字中）
+        count: 请求中的文章数（序号为 1..count）
+
+    Returns:
+        {序号: (zh_summary, en_summary)}，缺失或格式不对的条目不在其中
+    """
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        logger.warning("打包摘要响应中找不到 JSON 数组")
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        logger.warning(f"打包摘要响应 JSON 解析失败: {e}")
+        return {}
+
+    results = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        zh_summary = str(entry.get("zh") or "").strip()
+        en_summary = str(entry.get("en") or "").strip()
+        if 1 <= index <= count and zh_summary:
+            results[index] = (
+                _truncate_at_sentence(zh_summary, settings.summary_max_length),
+                _truncate_at_sentence(en_summary, settings.summary_max_length * 2),
+            )
+    return results
+
+
+async def _do_summarize_packed(
+    group: List[dict],
+    semaphore: asyncio.Semaphore = None
+) -> Dict[int, Tuple[str, str]]:
+    """
+    实际执行打包摘要请求：一次请求为多篇短文章生成双语摘要
+    """
+    articles = [
+        {"id": index, "title": item["title"], "content": clean_content(item["content"])}
+        for index, item in enumerate(group, 1)
+    ]
+    prompt = f"""Summarize EACH of the following {len(articles)} articles in BOTH Chinese and English.
+
+Requirements:
+1. Chinese summary (zh): No more than {settings.summary_max_length} Chinese characters
+2. English summary (en): No more than {settings.summary_max_length * 2} characters
+3. Keep key information and main points; summarize every article independently
+4. Each summary MUST end with a complete sentence; NEVER use ellipsis (... or …)
+
+Respond with ONLY a JSON array containing one object per article, using the same id:
+[{{"id": 1, "zh": "中文摘要", "en": "English summary"}}]
+
+Articles:
+{json.dumps(articles, ensure_ascii=False)}"""
+
+    response = await _create_chat_completion(
+        semaphore,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a professional bilingual summarizer (Chinese and English). You always answer with valid JSON."
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+        # 每篇一份双语摘要，另加 JSON 结构开销
+        max_tokens=min(
+            4000,
+            len(articles) * output_tokens(
+                zh_chars=settings.summary_max_length,
+                en_chars=settings.summary_max_length * 2,
+            ) + 100,
+        ),
+    )
+
+    results = parse_packed_response(response.choices[0].message.content or "", len(articles))
+    logger.info(f"打包摘要生成完成: {len(results)}/{len(articles)} 篇")
+    return results
+
+
+@retry(
+    stop=stop_after_attempt(settings.summary_retry_attempts),
+    wait=wait_exponential(multiplier=1, min=10, max=60),
+    retry=retry_if_exception_type((APIError, APITimeoutError)),
+    before_sleep=before_sleep_log(logger, logging.INFO),
+)
+async def _summarize_packed(
+    group: List[dict],
+    semaphore: asyncio.Semaphore = None
+) -> Dict[int, Tuple[str, str]]:
+    """
+    打包摘要（带重试机制；退避等待期间不占用信号量）
+    """
+    return await _do_summarize_packed(group, semaphore)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    if isinstance(error, RetryError):
+        error = error.last_attempt.exception()
+    return isinstance(error, RateLimitError)
+
+
+async def summarize_articles_batch(
+    items: List[dict],
+    semaphore: asyncio.Semaphore = None,
+    use_cache: bool = True
+) -> Dict[int, Tuple[str, str]]:
+    """
+    批量生成双语摘要：短文章按 Token 预算打包成一次请求，长文章逐篇生成
+
+    打包响应中缺失或无效的条目逐篇回退到 summarize_article_bilingual；
+    打包请求被限流且重试耗尽时抛出异常，交由调用方稍后整体重试。
+
+    Args:
+        items: 文章列表，每项含 id、title、content
+        semaphore: 并发控制信号量（可选）
+        use_cache: 是否查询/写入摘要缓存
+
+    Returns:
+        {id: (zh_summary, en_summary)}
+    """
+    if not llm_configured():
+        logger.warning("未配置 LLM 服务（OPENAI_API_KEY / LLM_PROVIDERS），跳过双语总结")
+        return {item["id"]: (SUMMARY_NOT_CONFIGURED, "") for item in items}
+
+    results: Dict[int, Tuple[str, str]] = {}
+    cache_keys: Dict[int, str] = {}
+    packable = []
+    single = []
+    for item in items:
+        if not (settings.summary_pack_enabled and is_packable(item["content"])):
+            single.append(item)
+            continue
+        cache_key, cached = await _lookup_cache("bilingual", item["title"], item["content"], use_cache)
+        if cached is not None:
+            results[item["id"]] = cached
+            continue
+        if cache_key:
+            cache_keys[item["id"]] = cache_key
+        packable.append(item)
+
+    async def run_group(group: List[dict]) -> None:
+        packed = {}
+        if len(group) > 1:
+            try:
+                packed = await _summarize_packed(group, semaphore)
+            except Exception as e:
+                if _is_rate_limited(e):
+                    # 被限流时逐篇回退只会放大请求量，交给调用方整体稍后重试
+                    raise
+                logger.warning(f"打包摘要请求失败，逐篇回退: {e}")
+
+        for index, item in enumerate(group, 1):
+            if index in packed:
+                zh_summary, en_summary = packed[index]
+                results[item["id"]] = (zh_summary, en_summary)
+                cache_key = cache_keys.get(item["id"])
+                if cache_key and _is_cacheable(zh_summary) and en_summary:
+                    await _store_cache(cache_key, zh_summary, en_summary)
+            else:
+                single.append(item)
+
+    groups = pack_articles(packable)
+    await asyncio.gather(*(run_group(group) for group in groups))
+    if groups:
+        logger.info(f"打包摘要: {len(packable)} 篇短文章合并为 {len(groups)} 次请求")
+
+    async def run_single(item: dict) -> None:
+        results[item["id"]] = await summarize_article_bilingual(
+            item["title"], item["content"], semaphore, use_cache
+        )
+
+    await asyncio.gather(*(run_single(item) for item in single))
+    return results
 
 
 def _generate_fallback_summary(content: str) -> str:
     """
-    生成降级摘要（使用原文开头）
+    生成降级摘要（本地抽取式摘要，挑选原文中最具代表性的句子）
+
+    返回 FallbackSummary，调用方据此识别降级结果，不必重新计算比对
     """
     if not content:
         return ""
-    # 清理 HTML 标签
-    import re
-    clean_content = re.sub(r'<[^>]+>', '', content)
-    clean_content = clean_content.strip()
-
-    if len(clean_content) > settings.summary_max_length:
-        clean_content = _truncate_at_sentence(clean_content, settings.summary_max_length)
-    return clean_content
+    return FallbackSummary(summarize_extractive(content, settings.summary_max_length))
 
 
 async def summarize_text_async(text: str, semaphore: asyncio.Semaphore = None) -> str:
@@ -0,0 +1,191 @@
+"""
+摘要缓存服务
+按内容哈希缓存 LLM 摘要：多个源转载的同一篇稿件、强制重新生成时输入未变的文章，
+都直接复用已有摘要，不再重复支付 LLM 延迟与费用
+
+服务商池按健康状况选路，查询缓存时还不知道由哪个模型生成，因此模型不参与缓存键，
+只在写入时记录实际生成摘要的模型
+
+读写都是同步的 SQLite 操作，异步代码中经 asyncio.to_thread 调用；
+命中次数先在内存中累计，由定时任务 flush_hit_counts() 批量写回，命中本身不写库
+"""
+import hashlib
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlmodel import Session, select
+from sqlalchemy import bindparam, func, update, delete
+from app.database import engine
+from app.models import SummaryCache
+from app.services.llm_providers import get_provider_pool
+from app.services.prompt_budget import fit_content
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 进程内命中统计
+_stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0}
+# 尚未写回数据库的命中次数（缓存键 -> 次数）
+_pending_hits: Dict[str, int] = {}
+_pending_lock = threading.Lock()
+
+
+def _normalize(text: str) -> str:
+    """去掉 HTML 标签、合并空白、统一小写，使排版差异不影响缓存键"""
+    text = re.sub(r"<[^>]+>", " ", text or "")
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def make_cache_key(mode: str, title: str, content: str, prompt_version: str) -> str:
+    """
+    生成缓存键
+
+    Args:
+        mode: 摘要模式（bilingual / zh / en）
+        title: 文章标题
+        content: 文章内容（按提示词实际使用的 fit_content 结果参与哈希，预算外的部分不影响摘要）
+        prompt_version: 提示词版本（改提示词时递增，旧缓存自然失效）
+
+    Returns:
+        SHA-256 十六进制字符串
+    """
+    parts = [
+        mode,
+        prompt_version,
+        _normalize(title),
+        _normalize(fit_content(content or "")),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def get_cached_summary(key: str) -> Optional[Tuple[str, str]]:
+    """
+    查询缓存
+
+    Returns:
+        (zh_summary, en_summary)，未命中返回 None
+    """
+    try:
+        with Session(engine) as session:
+            entry = session.exec(
+                select(SummaryCache.summary, SummaryCache.summary_en).where(SummaryCache.key == key)
+            ).first()
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        with _pending_lock:
+            _pending_hits[key] = _pending_hits.get(key, 0) + 1
+        _stats["hits"] += 1
+        logger.info(f"摘要缓存命中: {key[:12]}")
+        summary, summary_en = entry
+        return summary or "", summary_en or ""
+    except Exception as e:
+        # 缓存故障不影响摘要生成
+        logger.warning(f"查询摘要缓存失败: {e}")
+        return None
+
+
+def store_cached_summary(
+    key: str,
+    zh_summary: str,
+    en_summary: str,
+    prompt_version: str,
+    model: Optional[str] = None,
+) -> None:
+    """
+    写入缓存（同键已存在时覆盖）
+
+    Args:
+        model: 实际生成摘要的模型（未知时记录服务商池的默认模型）
+    """
+    try:
+        with Session(engine) as session:
+            session.merge(
+                SummaryCache(
+                    key=key,
+                    summary=zh_summary or None,
+                    summary_en=en_summary or None,
+                    model=model or get_provider_pool().default.model,
+                    prompt_version=prompt_version,
+                )
+            )
+            session.commit()
+            _stats["stores"] += 1
+    except Exception as e:
+        logger.warning(f"写入摘要缓存失败: {e}")
+
+
+def flush_hit_counts() -> int:
+    """
+    把内存中累计的命中次数批量写回数据库（定时任务调用）
+
+    Returns:
+        写回的缓存条目数
+    """
+    with _pending_lock:
+        pending = dict(_pending_hits)
+        _pending_hits.clear()
+    if not pending:
+        return 0
+    try:
+        with Session(engine) as session:
+            session.connection().execute(
+                update(SummaryCache)
+                .where(SummaryCache.key == bindparam("cache_key"))
+                .values(hit_count=SummaryCache.hit_count + bindparam("hits")),
+                [{"cache_key": key, "hits": hits} for key, hits in pending.items()],
+            )
+            session.commit()
+        return len(pending)
+    except Exception as e:
+        # 写回失败时放回内存，下次再写
+        with _pending_lock:
+            for key, hits in pending.items():
+                _pending_hits[key] = _pending_hits.get(key, 0) + hits
+        logger.warning(f"写回摘要缓存命中次数失败: {e}")
+        return 0
+
+
+def prune_summary_cache(session: Session, keep_days: Optional[int] = None) -> int:
+    """
+    清理超过 keep_days 天的摘要缓存
+
+    Returns:
+        被删除的行数
+    """
+    keep_days = keep_days or settings.summary_cache_keep_days
+    cutoff = datetime.now() - timedelta(days=keep_days)
+    try:
+        result = session.execute(delete(SummaryCache).where(SummaryCache.created_at < cutoff))
+        session.commit()
+        deleted = result.rowcount or 0
+        if deleted:
+            logger.info(f"清理摘要缓存: 删除 {deleted} 条（保留近 {keep_days} 天）")
+        return deleted
+    except Exception as e:
+        session.rollback()
+        logger.error(f"清理摘要缓存失败: {e}")
+        return 0
+
+
+def get_cache_stats() -> dict:
+    """
+    获取缓存命中统计
+
+    Returns:
+        dict: 本进程的命中/未命中/写入次数、命中率与缓存条目数
+    """
+    lookups = _stats["hits"] + _stats["misses"]
+    stats = {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups * 100, 2) if lookups else 0,
+        "enabled": settings.summary_cache_enabled,
+    }
+    try:
+        with Session(engine) as session:
+            stats["entries"] = session.exec(select(func.count()).select_from(SummaryCache)).one()
+    except Exception as e:
+        stats["error"] = str(e)
+    return stats
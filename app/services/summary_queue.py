@@ -0,0 +1,339 @@
+"""
+摘要任务队列
+基于 SQLite 表 summary_task 的持久化工作队列：
+抓取阶段入队文章 ID，摘要 worker 租用任务、完成后出队，失败按退避重试
+
+领取顺序按优先级分（以小时计）：文章发布时间 + 源权重折算的小时数 + 被 API 返回次数折算的小时数。
+分数是绝对时间刻度，新文章自然排在前面，不需要定期重算；LLM 容量不足时，
+用户最可能看到的文章先有摘要。
+"""
+import math
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlmodel import Session, select
+from sqlalchemy import func, update, delete
+from app.models import SummaryTask
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 任务状态（完成的任务直接出队删除，表中只保留待处理与失败的任务）
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_FAILED = "failed"
+
+# 退避上限（秒）
+MAX_RETRY_BACKOFF = 6 * 3600
+
+# 读接口记录的访问次数 {文章 ID: 次数}，由 worker 领取任务前、定时任务批量写回
+_pending_views: Counter = Counter()
+_views_lock = threading.Lock()
+
+
+def compute_priority(
+    published_at: Optional[datetime],
+    feed_weight: float = 1.0,
+    now: Optional[datetime] = None,
+) -> float:
+    """
+    计算摘要任务的优先级分
+
+    Args:
+        published_at: 文章发布时间（为空或晚于当前时间时按当前时间计，避免未来时间戳插队）
+        feed_weight: 所属订阅源的摘要优先级权重
+        now: 当前时间（测试用）
+
+    Returns:
+        以小时计的分数，越大越先处理
+    """
+    now = now or datetime.now()
+    moment = min(published_at or now, now)
+    weight_hours = math.log2(max(feed_weight, 0.01)) * settings.summary_priority_weight_hours
+    return moment.timestamp() / 3600 + weight_hours
+
+
+def enqueue_articles(
+    session: Session,
+    article_ids: Iterable[int],
+    priorities: Optional[Dict[int, float]] = None,
+) -> int:
+    """
+    将文章加入摘要队列（不提交事务）
+
+    与文章插入放在同一事务中提交，保证"文章已入库但未入队"不会发生。
+    已在队列中的文章被忽略（article_id 唯一）。
+
+    Args:
+        session: 数据库会话
+        article_ids: 文章 ID
+        priorities: {文章 ID: 优先级分}（缺省按入队时间计算）
+
+    Returns:
+        实际入队数量
+    """
+    now = datetime.now()
+    priorities = priorities or {}
+    default_priority = compute_priority(now, now=now)
+    rows = [
+        {
+            "article_id": article_id,
+            "status": STATUS_PENDING,
+            "priority": priorities.get(article_id, default_priority),
+            "attempts": 0,
+            "available_at": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for article_id in dict.fromkeys(article_ids)
+    ]
+    if not rows:
+        return 0
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = SummaryTask.__table__
+    statement = (
+        insert(table)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[table.c.article_id])
+        .returning(table.c.id)
+    )
+    return len(session.execute(statement).all())
+
+
+def boost_tasks(session: Session, article_ids: Iterable[int], hours: Optional[float] = None) -> int:
+    """
+    提升待处理任务的优先级（不提交事务）
+
+    文章被 API 返回却还没有摘要时调用：被访问越多的文章越先生成摘要
+
+    Args:
+        session: 数据库会话
+        article_ids: 文章 ID
+        hours: 提升的小时数（默认 summary_priority_view_hours）
+
+    Returns:
+        实际提升的任务数量
+    """
+    article_ids = list(dict.fromkeys(article_ids))
+    hours = settings.summary_priority_view_hours if hours is None else hours
+    if not article_ids or hours <= 0:
+        return 0
+    result = session.execute(
+        update(SummaryTask)
+        .where(SummaryTask.article_id.in_(article_ids), SummaryTask.status == STATUS_PENDING)
+        .values(priority=SummaryTask.priority + hours)
+    )
+    return result.rowcount or 0
+
+
+def unsummarized_ids(articles: Iterable) -> List[int]:
+    """
+    文章列表中尚无摘要的文章 id
+
+    读接口渲染时取出，随缓存的响应保存，之后每次返回该响应都记录一次访问
+
+    Args:
+        articles: 本次返回的文章（需有 id、summary 属性）
+    """
+    return [article.id for article in articles if not article.summary]
+
+
+def record_article_views(article_ids: Iterable[int]) -> None:
+    """
+    记录一次文章列表的访问：只在内存中累加，不写数据库
+
+    读接口调用（含命中响应缓存、304 与快照的请求），由 flush_article_views 批量提升优先级
+
+    Args:
+        article_ids: 本次返回的尚无摘要的文章 id（unsummarized_ids）
+    """
+    article_ids = list(article_ids)
+    if not article_ids:
+        return
+    with _views_lock:
+        _pending_views.update(article_ids)
+
+
+def flush_article_views(session: Session) -> int:
+    """
+    把内存中累计的访问次数批量写回：每次访问提升 summary_priority_view_hours 并提交
+
+    Args:
+        session: 数据库会话
+
+    Returns:
+        实际提升的任务数量
+    """
+    with _views_lock:
+        pending = dict(_pending_views)
+        _pending_views.clear()
+    if not pending:
+        return 0
+    by_count: Dict[int, List[int]] = {}
+    for article_id, count in pending.items():
+        by_count.setdefault(count, []).append(article_id)
+    try:
+        boosted = sum(
+            boost_tasks(session, article_ids, settings.summary_priority_view_hours * count)
+            for count, article_ids in by_count.items()
+        )
+        session.commit()
+        return boosted
+    except Exception as e:
+        session.rollback()
+        # 写回失败时放回内存，下次再写
+        with _views_lock:
+            _pending_views.update(pending)
+        logger.warning(f"提升摘要任务优先级失败: {e}")
+        return 0
+
+
+def recover_expired_leases(session: Session, now: Optional[datetime] = None) -> int:
+    """
+    回收租约已过期的任务（worker 崩溃或被强杀后遗留的 leased 任务）
+
+    Returns:
+        回收数量
+    """
+    now = now or datetime.now()
+    expired = (SummaryTask.status == STATUS_LEASED, SummaryTask.lease_expires_at < now)
+
+    # 每次领取都计入尝试次数：反复让 worker 崩溃或超时的任务用尽次数后标记为 failed，不再无限重领
+    exhausted = session.execute(
+        update(SummaryTask)
+        .where(*expired, SummaryTask.attempts >= settings.summary_max_attempts)
+        .values(
+            status=STATUS_FAILED,
+            lease_expires_at=None,
+            last_error="租约过期（worker 崩溃或处理超时）次数过多",
+            updated_at=now,
+        )
+    ).rowcount or 0
+    if exhausted:
+        logger.error(f"{exhausted} 个摘要任务租约过期且已达最大尝试次数，标记为失败")
+
+    result = session.execute(
+        update(SummaryTask)
+        .where(*expired)
+        .values(status=STATUS_PENDING, lease_expires_at=None, updated_at=now)
+    )
+    recovered = result.rowcount or 0
+    if recovered:
+        logger.warning(f"回收 {recovered} 个租约过期的摘要任务")
+    return recovered
+
+
+def lease_tasks(session: Session, limit: int, lease_seconds: Optional[int] = None) -> List[dict]:
+    """
+    租用一批可执行的摘要任务并提交
+
+    先回收过期租约，再用一条 UPDATE ... WHERE id IN (SELECT ... LIMIT n) RETURNING
+    原子地领取任务，多个 worker 并存时不会领到同一任务。按优先级分从高到低领取。
+
+    Args:
+        session: 数据库会话
+        limit: 最多领取数量
+        lease_seconds: 租约时长（秒，默认取配置）
+
+    Returns:
+        [{"task_id", "article_id", "attempts"}, ...]
+    """
+    now = datetime.now()
+    lease_seconds = lease_seconds or settings.summary_lease_seconds
+    recover_expired_leases(session, now)
+
+    candidates = (
+        select(SummaryTask.id)
+        .where(SummaryTask.status == STATUS_PENDING, SummaryTask.available_at <= now)
+        .order_by(SummaryTask.priority.desc(), SummaryTask.id)
+        .limit(limit)
+    )
+    statement = (
+        update(SummaryTask)
+        .where(SummaryTask.id.in_(candidates), SummaryTask.status == STATUS_PENDING)
+        .values(
+            status=STATUS_LEASED,
+            attempts=SummaryTask.attempts + 1,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            updated_at=now,
+        )
+        .returning(SummaryTask.id, SummaryTask.article_id, SummaryTask.attempts)
+    )
+    leased = [
+        {"task_id": row.id, "article_id": row.article_id, "attempts": row.attempts}
+        for row in session.execute(statement).all()
+    ]
+    session.commit()
+    return leased
+
+
+def complete_tasks(session: Session, task_ids: Iterable[int]) -> None:
+    """任务完成：出队（不提交事务，与摘要回写同一事务提交）"""
+    task_ids = list(task_ids)
+    if task_ids:
+        session.execute(delete(SummaryTask).where(SummaryTask.id.in_(task_ids)))
+
+
+def fail_task(session: Session, task_id: int, attempts: int, error: str) -> None:
+    """
+    任务失败：未超过最大尝试次数则按指数退避重新排队，否则标记为 failed（不提交事务）
+
+    Args:
+        session: 数据库会话
+        task_id: 任务 ID
+        attempts: 已尝试次数（含本次）
+        error: 失败原因
+    """
+    now = datetime.now()
+    if attempts >= settings.summary_max_attempts:
+        values = {"status": STATUS_FAILED}
+        logger.error(f"摘要任务 {task_id} 已失败 {attempts} 次，不再重试: {error}")
+    else:
+        backoff = min(
+            settings.summary_retry_backoff_seconds * 2 ** (attempts - 1),
+            MAX_RETRY_BACKOFF,
+        )
+        values = {"status": STATUS_PENDING, "available_at": now + timedelta(seconds=backoff)}
+        logger.warning(f"摘要任务 {task_id} 第 {attempts} 次失败，{backoff} 秒后重试: {error}")
+
+    session.execute(
+        update(SummaryTask)
+        .where(SummaryTask.id == task_id)
+        .values(last_error=error[:500], lease_expires_at=None, updated_at=now, **values)
+    )
+
+
+def retry_failed_tasks(session: Session) -> int:
+    """将所有 failed 任务重置为 pending（人工排障后使用），并提交"""
+    now = datetime.now()
+    result = session.execute(
+        update(SummaryTask)
+        .where(SummaryTask.status == STATUS_FAILED)
+        .values(status=STATUS_PENDING, attempts=0, available_at=now, updated_at=now)
+    )
+    session.commit()
+    return result.rowcount or 0
+
+
+def get_queue_stats(session: Session) -> Dict[str, int]:
+    """
+    获取队列统计
+
+    Returns:
+        {"pending": n, "leased": n, "failed": n}
+    """
+    stats = {STATUS_PENDING: 0, STATUS_LEASED: 0, STATUS_FAILED: 0}
+    rows = session.exec(
+        select(SummaryTask.status, func.count()).group_by(SummaryTask.status)
+    ).all()
+    for status, count in rows:
+        stats[status] = count
+    return stats
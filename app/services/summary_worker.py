@@ -0,0 +1,300 @@
+"""
+摘要 worker
+常驻的异步任务，按自身节奏消费摘要队列，与 RSS 抓取解耦：
+慢速或被限流的 LLM 调用只拖慢摘要，不再拖慢入库
+"""
+import asyncio
+import time
+from typing import List, Optional
+from sqlmodel import Session, select
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
+from app.models import Article
+from app.services.cache_invalidation import mark_articles_changed
+from app.services.summary_queue import (
+    lease_tasks,
+    flush_article_views,
+    complete_tasks,
+    fail_task,
+    recover_expired_leases,
+    get_queue_stats,
+)
+from app.services.summarizer import (
+    summarize_article_bilingual,
+    summarize_articles_batch,
+    is_packable,
+    SUMMARY_PLACEHOLDERS,
+)
+from app.services.llm_providers import llm_configured
+from app.services.near_dup import find_summarized_duplicate
+from app.services.content_store import load_texts
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _is_valid_summary(summary: str) -> bool:
+    """
+    摘要是否可落库（排除"内容过短/超时/失败/异常"等占位文本）
+
+    只按占位文本整体比对：正文谈到“失败”“异常”的正常摘要照常落库
+    """
+    return bool(summary) and summary.strip() not in SUMMARY_PLACEHOLDERS
+
+
+class SummaryWorker:
+    """
+    摘要队列消费者
+
+    每轮租用一批任务，并发生成双语摘要（并发度由 LLM 自适应限制器统一控制），
+    与近期已有摘要的文章近似重复时直接复用其摘要，不调用 LLM；
+    短文章按 Token 预算打包成一次请求，长文章逐篇请求；
+    结果与出队在同一事务中提交；数据库操作放到线程中执行，不阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        if engine is None:
+            from app.database import engine as default_engine
+            engine = default_engine
+        self.engine = engine
+        self.batch_size = max(1, batch_size or settings.summary_batch_size)
+        self.poll_interval = poll_interval if poll_interval is not None else settings.summary_worker_poll_interval
+        self.processed_count = 0
+        self.failed_count = 0
+        self.reused_count = 0
+        self._stop_event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """在当前事件循环中启动 worker"""
+        if self.running:
+            logger.warning("摘要 worker 已经在运行中")
+            return
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self.run_forever(), name="summary-worker")
+        logger.info(f"摘要 worker 已启动（每批 {self.batch_size} 篇）")
+
+    async def stop(self) -> None:
+        """停止 worker；进行中的任务租约到期后会被自动回收"""
+        if not self.running:
+            return
+        self._stop_event.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        logger.info("摘要 worker 已停止")
+
+    async def run_forever(self) -> None:
+        """主循环：有任务就处理，队列为空时等待轮询间隔"""
+        # 崩溃恢复：上次进程遗留的租约到期前不会被领取，启动时先回收已过期的
+        await asyncio.to_thread(self._recover)
+
+        while not self._stop_event.is_set():
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.error(f"摘要 worker 本轮执行失败: {e}")
+                processed = 0
+
+            if processed == 0:
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_once(self) -> int:
+        """
+        处理一批任务
+
+        Returns:
+            本轮领取的任务数量
+        """
+        tasks = await asyncio.to_thread(self._lease)
+        if not tasks:
+            return 0
+
+        start_time = time.time()
+
+        results = await self._summarize_batch(tasks)
+        await asyncio.to_thread(self._save, tasks, results)
+
+        duration = time.time() - start_time
+        logger.info(f"摘要批次完成: {len(tasks)} 篇, 耗时 {duration:.2f} 秒")
+        return len(tasks)
+
+    async def _summarize_batch(self, tasks: List[dict]) -> list:
+        """
+        生成一批任务的摘要
+
+        Returns:
+            与 tasks 顺序对齐的结果列表，元素为 (zh, en) 或异常
+        """
+        packed = [
+            task for task in tasks
+            if "duplicate" not in task and settings.summary_pack_enabled and is_packable(task["content"])
+        ]
+        if len(packed) < 2:
+            packed = []
+        packed_ids = {task["task_id"] for task in packed}
+        single = [task for task in tasks if task["task_id"] not in packed_ids]
+
+        results = await asyncio.gather(
+            self._summarize_packed(packed),
+            *(self._summarize(task) for task in single),
+            return_exceptions=True,
+        )
+        packed_result = results[0]
+        by_task = {task["task_id"]: result for task, result in zip(single, results[1:])}
+        for task in packed:
+            by_task[task["task_id"]] = (
+                packed_result if isinstance(packed_result, Exception)
+                else packed_result[task["article_id"]]
+            )
+        return [by_task[task["task_id"]] for task in tasks]
+
+    async def _summarize_packed(self, tasks: List[dict]) -> dict:
+        if not tasks:
+            return {}
+        return await summarize_articles_batch(
+            [{"id": task["article_id"], "title": task["title"], "content": task["content"]} for task in tasks]
+        )
+
+    async def _summarize(self, task: dict) -> tuple:
+        if task.get("duplicate"):
+            self.reused_count += 1
+            return task["duplicate"]
+        return await summarize_article_bilingual(task["title"], task["content"])
+
+    def _recover(self) -> None:
+        with Session(self.engine) as session:
+            recover_expired_leases(session)
+            session.commit()
+
+    def _lease(self) -> List[dict]:
+        """租用任务并带出文章标题、正文，以及可复用摘要的近似重复文章"""
+        with Session(self.engine) as session:
+            # 先写回累计的访问次数，本次领取即按最新优先级排序
+            flush_article_views(session)
+            tasks = lease_tasks(session, self.batch_size)
+            if not tasks:
+                return []
+            article_ids = [task["article_id"] for task in tasks]
+            rows = session.exec(
+                select(Article.id, Article.title, Article.simhash).where(Article.id.in_(article_ids))
+            ).all()
+            articles = {row.id: row for row in rows}
+            # 正文只为本批租到的文章解压
+            texts = load_texts(session, articles)
+
+            missing = [task["task_id"] for task in tasks if task["article_id"] not in articles]
+            if missing:
+                # 文章已被删除：直接出队
+                complete_tasks(session, missing)
+                session.commit()
+
+            leased = []
+            for task in tasks:
+                article = articles.get(task["article_id"])
+                if article is None:
+                    continue
+                item = {**task, "title": article.title, "content": texts.get(article.id, "")}
+                if settings.near_dup_enabled and article.simhash is not None:
+                    duplicate = find_summarized_duplicate(session, article.id, article.simhash)
+                    if duplicate:
+                        _, summary, summary_en = duplicate
+                        item["duplicate"] = (summary, summary_en or "")
+                leased.append(item)
+            return leased
+
+    def _save(self, tasks: List[dict], results: list) -> None:
+        """回写摘要并出队；失败的任务按退避重新排队"""
+        updates = []
+        done = []
+        with Session(self.engine) as session:
+            for task, result in zip(tasks, results):
+                if isinstance(result, Exception):
+                    fail_task(session, task["task_id"], task["attempts"], f"{type(result).__name__}: {result}")
+                    self.failed_count += 1
+                    continue
+
+                zh_summary, en_summary = result
+                # zh/en 各自独立判断：双语生成也可能因解析失败只拿到其中一种
+                values = {}
+                if _is_valid_summary(zh_summary):
+                    values["summary"] = zh_summary          # 中文摘要
+                if _is_valid_summary(en_summary):
+                    values["summary_en"] = en_summary       # 英文摘要
+                if not values:
+                    fail_task(session, task["task_id"], task["attempts"], f"摘要无效: {zh_summary[:50]}")
+                    self.failed_count += 1
+                    continue
+
+                updates.append({"id": task["article_id"], **values})
+                done.append(task["task_id"])
+
+            # 按键分组批量 UPDATE，zh/en 缺失的一侧不覆盖
+            for keys in {tuple(sorted(u)) for u in updates}:
+                session.execute(update(Article), [u for u in updates if tuple(sorted(u)) == keys])
+            complete_tasks(session, done)
+            session.commit()
+            if updates:
+                # RSS 输出带摘要，缓存的响应与所属分类的快照需要重新生成
+                mark_articles_changed(session, article_ids=[u["id"] for u in updates])
+        self.processed_count += len(done)
+
+
+# 全局 worker 实例（随 FastAPI 应用生命周期启停）
+summary_worker = SummaryWorker()
+
+
+def start_summary_worker() -> None:
+    """
+    启动摘要 worker（需在事件循环中调用）
+    """
+    if not settings.summary_worker_enabled:
+        logger.info("摘要 worker 已禁用")
+        return
+    if not llm_configured():
+        logger.warning("未配置 LLM 服务（OPENAI_API_KEY / LLM_PROVIDERS），摘要 worker 不启动")
+        return
+    summary_worker.start()
+
+
+async def stop_summary_worker() -> None:
+    """
+    停止摘要 worker
+    """
+    await summary_worker.stop()
+
+
+def get_summary_worker_status() -> dict:
+    """
+    获取摘要 worker 与队列状态
+
+    Returns:
+        dict: 运行状态、累计处理数与队列积压
+    """
+    status = {
+        "running": summary_worker.running,
+        "processed": summary_worker.processed_count,
+        "failed": summary_worker.failed_count,
+        "reused": summary_worker.reused_count,
+    }
+    try:
+        with Session(summary_worker.engine) as session:
+            status["queue"] = get_queue_stats(session)
+    except Exception as e:
+        status["queue_error"] = str(e)
+    return status
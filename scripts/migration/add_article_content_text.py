@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：为 article 表添加 content_text 字段（清洗后的纯文本）
+
+- 添加 content_text 字段
+- 按批回填存量文章：把 content 中的 HTML 清洗为纯文本
+- 可选 --drop-raw：回填后清空原始 HTML（配合 STORE_RAW_CONTENT=false 使用），之后建议执行 VACUUM 回收空间
+
+用法:
+    python scripts/migration/add_article_content_text.py [--drop-raw]
+"""
+import argparse
+import sys
+from pathlib import Path
+import sqlite3
+import logging
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+from app.services.content_cleaner import clean_html
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+# 每批回填的文章数（每批单独提交，避免长事务阻塞应用写入）
+BATCH_SIZE = 500
+
+
+def get_db_path() -> str:
+    """从settings获取数据库文件路径"""
+    db_url = settings.database_url or "sqlite:///./ai_rss_hub.db"
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "")
+    return db_url
+
+
+def add_article_content_text(drop_raw: bool = False):
+    """添加 content_text 字段并回填存量文章"""
+    db_path = get_db_path()
+    logger.info(f"数据库路径: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(article)")
+        existing = {col[1] for col in cursor.fetchall()}
+        if "content_text" in existing:
+            logger.info("ℹ️  content_text 字段已存在，跳过")
+        else:
+            cursor.execute("ALTER TABLE article ADD COLUMN content_text TEXT")
+            logger.info("✅ content_text 字段添加成功")
+        conn.commit()
+
+        # 按主键分批回填
+        last_id = 0
+        backfilled = 0
+        while True:
+            cursor.execute(
+                "SELECT id, content FROM article WHERE id > ? AND content_text IS NULL AND content IS NOT NULL "
+                "ORDER BY id LIMIT ?",
+                (last_id, BATCH_SIZE),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            if drop_raw:
+                cursor.executemany(
+                    "UPDATE article SET content_text = ?, content = NULL WHERE id = ?",
+                    [(clean_html(content), article_id) for article_id, content in rows],
+                )
+            else:
+                cursor.executemany(
+                    "UPDATE article SET content_text = ? WHERE id = ?",
+                    [(clean_html(content), article_id) for article_id, content in rows],
+                )
+            conn.commit()
+            backfilled += len(rows)
+            logger.info(f"  已回填 {backfilled} 篇")
+
+        logger.info(f"✅ 回填纯文本 {backfilled} 篇" + ("（已清空原始 HTML）" if drop_raw else ""))
+        logger.info("✅ 迁移完成")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="为 article 表添加并回填 content_text 字段")
+    parser.add_argument("--drop-raw", action="store_true", help="回填后清空原始 HTML（content 字段）")
+    args = parser.parse_args()
+    try:
+        add_article_content_text(drop_raw=args.drop_raw)
+    except Exception:
+        sys.exit(1)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：把文章时间索引改为 (published_at, id, feed_id)
+
+文章列表按 (published_at, id) 键集翻页，排序键必须完整落在索引里，
+否则同一时间的文章要额外用临时 B 树排序。
+
+- 创建 ix_article_published_id (published_at, id, feed_id)
+- 删除被它取代的 ix_article_published_feed 与 ix_article_published_at
+
+用法:
+    python scripts/migration/add_article_cursor_index.py
+"""
+import sys
+from pathlib import Path
+import sqlite3
+import logging
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "ix_article_published_id"
+INDEX_DEFINITION = "article (published_at, id, feed_id)"
+# 被取代的旧索引
+OBSOLETE_INDEXES = ("ix_article_published_feed", "ix_article_published_at")
+
+
+def get_db_path() -> str:
+    """从settings获取数据库文件路径"""
+    db_url = settings.database_url or "sqlite:///./ai_rss_hub.db"
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "")
+    return db_url
+
+
+def add_article_cursor_index():
+    """创建翻页用的时间索引并删除旧索引"""
+    db_path = get_db_path()
+    logger.info(f"数据库路径: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA index_list(article)")
+        existing = {row[1] for row in cursor.fetchall()}
+
+        if INDEX_NAME in existing:
+            logger.info(f"ℹ️  {INDEX_NAME} 索引已存在，跳过")
+        else:
+            cursor.execute(f"CREATE INDEX {INDEX_NAME} ON {INDEX_DEFINITION}")
+            logger.info(f"✅ {INDEX_NAME} 索引创建成功")
+
+        for name in OBSOLETE_INDEXES:
+            if name in existing:
+                cursor.execute(f"DROP INDEX {name}")
+                logger.info(f"✅ 已删除旧索引 {name}")
+
+        conn.commit()
+        logger.info("✅ 迁移完成")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        add_article_cursor_index()
+    except Exception:
+        sys.exit(1)
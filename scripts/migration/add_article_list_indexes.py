@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：为文章列表查询添加复合索引
+
+- ix_article_published_feed (published_at, feed_id)：按时间倒序取前 N 条，按分类过滤时 feed_id 直接取自索引
+- ix_article_feed_published (feed_id, published_at)：按订阅源过滤，同时作为外键 feed_id 的索引
+- 删除被 ix_article_published_feed 覆盖的单列索引 ix_article_published_at
+
+用法:
+    python scripts/migration/add_article_list_indexes.py
+"""
+import sys
+from pathlib import Path
+import sqlite3
+import logging
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    "ix_article_published_feed": "article (published_at, feed_id)",
+    "ix_article_feed_published": "article (feed_id, published_at)",
+}
+# 被复合索引的前缀覆盖、不再需要的旧索引
+OBSOLETE_INDEXES = ("ix_article_published_at",)
+
+
+def get_db_path() -> str:
+    """从settings获取数据库文件路径"""
+    db_url = settings.database_url or "sqlite:///./ai_rss_hub.db"
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "")
+    return db_url
+
+
+def add_article_list_indexes():
+    """创建文章列表复合索引并删除冗余的单列索引"""
+    db_path = get_db_path()
+    logger.info(f"数据库路径: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA index_list(article)")
+        existing = {row[1] for row in cursor.fetchall()}
+
+        for name, definition in INDEXES.items():
+            if name in existing:
+                logger.info(f"ℹ️  {name} 索引已存在，跳过")
+                continue
+            cursor.execute(f"CREATE INDEX {name} ON {definition}")
+            logger.info(f"✅ {name} 索引创建成功")
+
+        for name in OBSOLETE_INDEXES:
+            if name in existing:
+                cursor.execute(f"DROP INDEX {name}")
+                logger.info(f"✅ 已删除冗余索引 {name}")
+
+        conn.commit()
+        logger.info("✅ 迁移完成")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        add_article_list_indexes()
+    except Exception:
+        sys.exit(1)
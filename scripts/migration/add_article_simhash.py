@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：为 article 表添加 SimHash 指纹及分桶索引
+
+- 添加 simhash 字段及索引
+- 创建 article_simhash_band 分桶表（段序号 << 16 | 段值，按 (band_key, created_at) 索引）
+- 为近期窗口（NEAR_DUP_WINDOW_DAYS）内的文章回填指纹，使存量文章也能参与近似去重
+  （与入库时一样对清洗后的纯文本计算；正文已移到 article_content 表时从该表解压读取）
+
+用法:
+    python scripts/migration/add_article_simhash.py
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Set
+import sqlite3
+import logging
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+from app.services.near_dup import compute_simhash, band_keys
+from app.services.content_cleaner import clean_html
+from app.services.content_store import decode_text
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+# 每批读取正文的文章数
+BATCH_SIZE = 500
+
+
+def get_db_path() -> str:
+    """从settings获取数据库文件路径"""
+    db_url = settings.database_url or "sqlite:///./ai_rss_hub.db"
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "")
+    return db_url
+
+
+def load_texts(cursor: sqlite3.Cursor, article_ids: List[int], article_columns: Set[str]) -> Dict[int, str]:
+    """
+    读取文章的纯文本正文（与入库时计算指纹的输入一致）
+
+    优先读取 article_content 表（move_article_content.py 之后正文只在这里），
+    其余文章回退到 article 表的 content_text / content 旧字段。
+    """
+    texts: Dict[int, str] = {}
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'article_content'")
+    has_content_table = cursor.fetchone() is not None
+    has_text = "content_text" in article_columns
+    has_content = "content" in article_columns
+
+    for start in range(0, len(article_ids), BATCH_SIZE):
+        chunk = article_ids[start:start + BATCH_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        if has_content_table:
+            cursor.execute(
+                f"SELECT article_id, text, raw, codec FROM article_content WHERE article_id IN ({placeholders})",
+                chunk,
+            )
+            for article_id, text, raw, codec in cursor.fetchall():
+                texts[article_id] = decode_text(text, raw, codec)
+
+        if has_text or has_content:
+            text_column = "content_text" if has_text else "NULL"
+            content_column = "content" if has_content else "NULL"
+            cursor.execute(
+                f"SELECT id, {text_column}, {content_column} FROM article WHERE id IN ({placeholders})",
+                chunk,
+            )
+            for article_id, content_text, content in cursor.fetchall():
+                if not texts.get(article_id):
+                    texts[article_id] = content_text or (clean_html(content) if content else "")
+    return texts
+
+
+def add_article_simhash():
+    """添加 simhash 字段、分桶表并回填近期文章指纹"""
+    db_path = get_db_path()
+    logger.info(f"数据库路径: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(article)")
+        existing = {col[1] for col in cursor.fetchall()}
+        if "simhash" in existing:
+            logger.info("ℹ️  simhash 字段已存在，跳过")
+        else:
+            cursor.execute("ALTER TABLE article ADD COLUMN simhash INTEGER")
+            logger.info("✅ simhash 字段添加成功")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_article_simhash ON article (simhash)")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS article_simhash_band (
+                article_id INTEGER NOT NULL REFERENCES article (id),
+                band_key INTEGER NOT NULL,
+                created_at DATETIME NOT NULL,
+                PRIMARY KEY (article_id, band_key)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_article_simhash_band_key_created
+            ON article_simhash_band (band_key, created_at)
+        """)
+        logger.info("✅ article_simhash_band 表已就绪")
+
+        # 回填近期文章指纹
+        cutoff = datetime.now() - timedelta(days=settings.near_dup_window_days)
+        cursor.execute(
+            "SELECT id, created_at FROM article WHERE simhash IS NULL AND created_at >= ?",
+            (cutoff.isoformat(sep=" "),),
+        )
+        pending = cursor.fetchall()
+        texts = load_texts(cursor, [article_id for article_id, _ in pending], existing)
+        backfilled = 0
+        for article_id, created_at in pending:
+            simhash = compute_simhash(texts.get(article_id, ""))
+            if simhash is None:
+                continue
+            cursor.execute("UPDATE article SET simhash = ? WHERE id = ?", (simhash, article_id))
+            cursor.executemany(
+                "INSERT OR IGNORE INTO article_simhash_band (article_id, band_key, created_at) VALUES (?, ?, ?)",
+                [(article_id, key, created_at) for key in band_keys(simhash)],
+            )
+            backfilled += 1
+        logger.info(f"✅ 回填指纹 {backfilled} 篇（近 {settings.near_dup_window_days} 天）")
+
+        conn.commit()
+        logger.info("✅ 迁移完成")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        add_article_simhash()
+    except Exception:
+        sys.exit(1)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：为 feed 表添加条件请求缓存字段
+
+添加 etag / last_modified / content_hash 三个字段，
+抓取时据此发送 If-None-Match / If-Modified-Since，源未更新时跳过解析与去重。
+
+用法:
+    python scripts/migration/add_feed_cache_fields.py
+"""
+import sys
+from pathlib import Path
+import sqlite3
+import logging
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+# 待添加的字段：(字段名, 类型)
+FEED_CACHE_FIELDS = [
+    ("etag", "VARCHAR"),
+    ("last_modified", "VARCHAR"),
+    ("content_hash", "VARCHAR"),
+]
+
+
+def get_db_path() -> str:
+    """从settings获取数据库文件路径"""
+    db_url = settings.database_url or "sqlite:///./ai_rss_hub.db"
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "")
+    return db_url
+
+
+def add_feed_cache_fields():
+    """为 feed 表添加条件请求缓存字段"""
+    db_path = get_db_path()
+    logger.info(f"数据库路径: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(feed)")
+        existing = {col[1] for col in cursor.fetchall()}
+
+        for field_name, field_type in FEED_CACHE_FIELDS:
+            if field_name in existing:
+                logger.info(f"ℹ️  {field_name} 字段已存在，跳过")
+                continue
+            cursor.execute(f"ALTER TABLE feed ADD COLUMN {field_name} {field_type}")
+            logger.info(f"✅ {field_name} 字段添加成功")
+
+        conn.commit()
+        logger.info("✅ 迁移完成")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        add_feed_cache_fields()
+    except Exception:
+        sys.exit(1)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：为 feed 表添加 summary_mode 字段
+
+summary_mode 取值 llm（默认，调用大模型生成摘要）或 extractive（入库时本地抽取摘要，不消耗 API）。
+
+用法:
+    python scripts/migration/add_feed_summary_mode.py
+"""
+import sys
+from pathlib import Path
+import sqlite3
+import logging
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def get_db_path() -> str:
+    """从settings获取数据库文件路径"""
+    db_url = settings.database_url or "sqlite:///./ai_rss_hub.db"
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "")
+    return db_url
+
+
+def add_feed_summary_mode():
+    """为 feed 表添加 summary_mode 字段"""
+    db_path = get_db_path()
+    logger.info(f"数据库路径: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(feed)")
+        existing = {col[1] for col in cursor.fetchall()}
+
+        if "summary_mode" in existing:
+            logger.info("ℹ️  summary_mode 字段已存在，跳过")
+        else:
+            cursor.execute("ALTER TABLE feed ADD COLUMN summary_mode VARCHAR NOT NULL DEFAULT 'llm'")
+            logger.info("✅ summary_mode 字段添加成功")
+
+        conn.commit()
+        logger.info("✅ 迁移完成")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        add_feed_summary_mode()
+    except Exception:
+        sys.exit(1)
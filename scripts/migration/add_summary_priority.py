@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：摘要优先级
+
+- feed 表添加 summary_priority 字段（订阅源摘要权重，默认 1.0）
+- summary_task 表添加 priority 字段及 (status, priority) 索引
+- 按文章发布时间与源权重回填存量待处理任务的优先级
+
+用法:
+    python scripts/migration/add_summary_priority.py
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+import sqlite3
+import logging
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+from app.services.summary_queue import compute_priority
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def get_db_path() -> str:
+    """从settings获取数据库文件路径"""
+    db_url = settings.database_url or "sqlite:///./ai_rss_hub.db"
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "")
+    return db_url
+
+
+def _parse_datetime(value):
+    """SQLite 中的时间为 ISO 字符串"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def add_summary_priority():
+    """添加摘要优先级字段并回填存量任务"""
+    db_path = get_db_path()
+    logger.info(f"数据库路径: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(feed)")
+        if "summary_priority" in {col[1] for col in cursor.fetchall()}:
+            logger.info("ℹ️  feed.summary_priority 字段已存在，跳过")
+        else:
+            cursor.execute("ALTER TABLE feed ADD COLUMN summary_priority FLOAT NOT NULL DEFAULT 1.0")
+            logger.info("✅ feed.summary_priority 字段添加成功")
+
+        cursor.execute("PRAGMA table_info(summary_task)")
+        columns = {col[1] for col in cursor.fetchall()}
+        if not columns:
+            logger.info("ℹ️  summary_task 表不存在（应用启动时会按新结构创建），跳过")
+        else:
+            if "priority" in columns:
+                logger.info("ℹ️  summary_task.priority 字段已存在，跳过")
+            else:
+                cursor.execute("ALTER TABLE summary_task ADD COLUMN priority FLOAT NOT NULL DEFAULT 0.0")
+                logger.info("✅ summary_task.priority 字段添加成功")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS ix_summary_task_status_priority ON summary_task (status, priority)"
+            )
+
+            # 回填存量任务优先级
+            cursor.execute("""
+                SELECT t.id, COALESCE(a.published_at, a.created_at), f.summary_priority
+                FROM summary_task t
+                JOIN article a ON a.id = t.article_id
+                JOIN feed f ON f.id = a.feed_id
+                WHERE t.priority = 0
+            """)
+            now = datetime.now()
+            updates = [
+                (compute_priority(_parse_datetime(shown_at), weight or 1.0, now=now), task_id)
+                for task_id, shown_at, weight in cursor.fetchall()
+            ]
+            cursor.executemany("UPDATE summary_task SET priority = ? WHERE id = ?", updates)
+            logger.info(f"✅ 回填任务优先级 {len(updates)} 个")
+
+        conn.commit()
+        logger.info("✅ 迁移完成")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        add_summary_priority()
+    except Exception:
+        sys.exit(1)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：创建文章全文索引（FTS5 trigram）并回填存量文章
+
+- article_fts：标题与中英文摘要的外部内容表（content='article'），不保存副本，由触发器同步
+- article_body_fts：正文的无内容表（content=''），只存倒排索引，正文仍只压缩保存在 article_content
+- 旧版保存正文副本的 article_fts 会被删除重建
+- 索引表第一次创建时回填存量文章（应用启动时也会执行同样的流程）；可重复执行
+
+用法:
+    python scripts/migration/create_article_fts.py
+"""
+import sys
+from pathlib import Path
+import logging
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.services.search import BODY_FTS_TABLE, FTS_TABLE, ensure_search_index
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def get_db_path() -> str:
+    """从settings获取数据库文件路径"""
+    db_url = settings.database_url or "sqlite:///./ai_rss_hub.db"
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "")
+    return db_url
+
+
+def create_article_fts():
+    """创建全文索引并回填存量文章"""
+    db_path = get_db_path()
+    logger.info(f"数据库路径: {db_path}")
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        if not ensure_search_index(engine):
+            raise RuntimeError("当前 SQLite 不支持 FTS5 trigram 分词（需要 3.34+）")
+        logger.info(f"✅ {FTS_TABLE}、{BODY_FTS_TABLE} 表与触发器已就绪")
+
+        # 合并回填产生的大量小段，降低查询时需要读取的段数
+        with engine.begin() as conn:
+            for table in (FTS_TABLE, BODY_FTS_TABLE):
+                conn.exec_driver_sql(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+        logger.info("✅ 迁移完成")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        raise
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    try:
+        create_article_fts()
+    except Exception:
+        sys.exit(1)
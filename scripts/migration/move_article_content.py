@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：把文章正文从 article 表移到压缩存储的 article_content 表
+
+- 创建 article_content 表（article_id 主键，正文按 CONTENT_COMPRESSION 压缩为 BLOB）
+- 按批复制存量文章的 content / content_text（缺少纯文本时现场清洗）
+- 删除 article 表的 content / content_text 列（需要 SQLite 3.35+），之后建议执行 VACUUM 回收空间
+
+用法:
+    python scripts/migration/move_article_content.py [--keep-columns]
+"""
+import argparse
+import sys
+from pathlib import Path
+import sqlite3
+import logging
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+from app.services.content_cleaner import clean_html
+from app.services.content_store import make_content_row
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+# 每批复制的文章数（每批单独提交，避免长事务阻塞应用写入）
+BATCH_SIZE = 500
+
+
+def get_db_path() -> str:
+    """从settings获取数据库文件路径"""
+    db_url = settings.database_url or "sqlite:///./ai_rss_hub.db"
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "")
+    return db_url
+
+
+def move_article_content(keep_columns: bool = False):
+    """创建 article_content 表，复制正文并删除 article 表中的正文列"""
+    db_path = get_db_path()
+    logger.info(f"数据库路径: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS article_content (
+                article_id INTEGER NOT NULL PRIMARY KEY REFERENCES article (id),
+                codec VARCHAR NOT NULL,
+                raw BLOB,
+                text BLOB,
+                raw_size INTEGER NOT NULL,
+                text_size INTEGER NOT NULL
+            )
+        """)
+        conn.commit()
+        logger.info("✅ article_content 表已就绪")
+
+        cursor.execute("PRAGMA table_info(article)")
+        existing = {col[1] for col in cursor.fetchall()}
+        if "content" not in existing:
+            logger.info("ℹ️  article 表已没有 content 字段，跳过")
+            return
+
+        has_text = "content_text" in existing
+        text_column = "content_text" if has_text else "NULL"
+
+        # 按主键分批复制；已复制过的文章（重复执行）跳过
+        last_id = 0
+        moved = 0
+        while True:
+            cursor.execute(
+                f"SELECT a.id, a.content, {text_column} FROM article a "
+                "WHERE a.id > ? AND NOT EXISTS (SELECT 1 FROM article_content c WHERE c.article_id = a.id) "
+                "ORDER BY a.id LIMIT ?",
+                (last_id, BATCH_SIZE),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            content_rows = []
+            for article_id, content, content_text in rows:
+                if content_text is None and content:
+                    content_text = clean_html(content)
+                if content or content_text:
+                    row = make_content_row(article_id, content, content_text)
+                    content_rows.append((
+                        row["article_id"], row["codec"], row["raw"], row["text"], row["raw_size"], row["text_size"],
+                    ))
+            cursor.executemany(
+                "INSERT INTO article_content (article_id, codec, raw, text, raw_size, text_size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                content_rows,
+            )
+            conn.commit()
+            moved += len(content_rows)
+            logger.info(f"  已复制 {moved} 篇")
+
+        logger.info(f"✅ 复制正文 {moved} 篇")
+
+        if keep_columns:
+            logger.info("ℹ️  保留 article 表的正文列（--keep-columns）")
+        else:
+            for column in ("content", "content_text"):
+                if column in existing:
+                    cursor.execute(f"ALTER TABLE article DROP COLUMN {column}")
+                    logger.info(f"✅ 已删除 article.{column} 字段")
+            conn.commit()
+            logger.info("ℹ️  建议执行 VACUUM 回收空间: sqlite3 <数据库文件> 'VACUUM;'")
+
+        logger.info("✅ 迁移完成")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把文章正文移到压缩存储的 article_content 表")
+    parser.add_argument("--keep-columns", action="store_true", help="复制后保留 article 表的正文列（便于回滚）")
+    args = parser.parse_args()
+    try:
+        move_article_content(keep_columns=args.keep_columns)
+    except Exception:
+        sys.exit(1)
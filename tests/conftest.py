@@ -0,0 +1,34 @@
+"""
+pytest 公共配置
+"""
+import pytest
+from unittest.mock import patch
+
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def disable_summary_cache():
+    """默认关闭摘要缓存，避免用例之间通过本地数据库共享缓存结果（缓存用例自行开启）"""
+    with patch.object(settings, "summary_cache_enabled", False):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """每个用例使用独立的数据库，清空进程内的接口响应缓存，避免读到上一个用例的响应"""
+    from app.services.response_cache import response_cache
+
+    response_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolate_rss_snapshots(tmp_path):
+    """RSS 快照落盘到临时目录，并清空进程内的快照"""
+    from app.services.rss_snapshots import rss_snapshots
+
+    rss_snapshots.clear()
+    with patch.object(settings, "rss_snapshot_dir", str(tmp_path / "rss_snapshots")):
+        yield
+    rss_snapshots.clear()
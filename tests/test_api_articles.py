@@ -0,0 +1,255 @@
+"""
+文章接口测试
+
+用内存 SQLite 替换应用的数据库会话依赖
+"""
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.database import get_session
+from app.models import Feed, Article
+from app.crud import bulk_insert_articles, get_articles, update_article_summary
+from app.services.cache_invalidation import mark_articles_changed
+from app.services.response_cache import response_cache
+from app.services.search import ensure_search_index, index_articles
+from unittest.mock import patch
+
+
+@pytest.fixture
+def engine():
+    """内存数据库：含 5 篇文章"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    ensure_search_index(engine)
+    now = datetime.now()
+    with Session(engine) as session:
+        feed = Feed(name="api", url="https://api.example.com/rss", category="ai")
+        session.add(feed)
+        session.commit()
+        rows = [
+            {
+                "title": f"Article {i}",
+                "link": f"https://api.example.com/{i}",
+                "content_text": f"Body of article {i}",
+                "summary": f"摘要 {i}",
+                "published_at": now - timedelta(hours=i),
+                "feed_id": feed.id,
+            }
+            for i in range(5)
+        ]
+        inserted = bulk_insert_articles(session, rows)
+        id_by_link = {link: article_id for article_id, link in inserted}
+        index_articles(session, [dict(row, id=id_by_link[row["link"]]) for row in rows])
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def client(engine):
+    """测试客户端：数据库会话依赖替换为内存数据库"""
+    def override_session():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+
+class TestArticlePagination:
+    """测试文章列表翻页"""
+
+    def test_cursor_walks_all_pages(self, client):
+        """测试：按 X-Next-Cursor / Link 逐页读取全部文章，最后一页不带游标"""
+        titles = []
+        response = client.get("/api/articles", params={"limit": 2, "category": "ai"})
+        while True:
+            assert response.status_code == 200
+            titles.extend(article["title"] for article in response.json())
+            if "X-Next-Cursor" not in response.headers:
+                break
+            assert 'rel="next"' in response.headers["Link"]
+            assert "category=ai" in response.headers["Link"]
+            response = client.get(
+                "/api/articles",
+                params={"limit": 2, "category": "ai", "cursor": response.headers["X-Next-Cursor"]},
+            )
+
+        assert titles == [f"Article {i}" for i in range(5)]
+
+    def test_invalid_cursor_is_rejected(self, client):
+        """测试：无效游标返回 400"""
+        response = client.get("/api/articles", params={"cursor": "garbage!"})
+        assert response.status_code == 400
+
+
+class TestFeedArticles:
+    """测试按订阅源查询文章"""
+
+    def test_feed_filter_and_latest_endpoint(self, client):
+        """测试：feed_id 参数与 /feeds/{id}/articles 只返回该源文章，不存在的源返回 404"""
+        feed_id = client.get("/api/articles", params={"limit": 1}).json()[0]["feed_id"]
+
+        response = client.get("/api/articles", params={"feed_id": [feed_id, 999]})
+        assert [article["title"] for article in response.json()] == [f"Article {i}" for i in range(5)]
+        assert client.get("/api/articles", params={"feed_id": 999}).json() == []
+
+        response = client.get(f"/api/feeds/{feed_id}/articles", params={"limit": 3})
+        assert response.status_code == 200
+        assert [article["title"] for article in response.json()] == ["Article 0", "Article 1", "Article 2"]
+        rest = client.get(
+            f"/api/feeds/{feed_id}/articles",
+            params={"limit": 3, "cursor": response.headers["X-Next-Cursor"]},
+        )
+        assert [article["title"] for article in rest.json()] == ["Article 3", "Article 4"]
+        assert client.get("/api/feeds/999/articles").status_code == 404
+
+
+class TestArticleCount:
+    """测试文章计数"""
+
+    def test_count_matches_filters(self, client):
+        """测试：一次请求返回符合筛选条件的文章总数"""
+        assert client.get("/api/articles/count").json() == {"total": 5}
+        assert client.get("/api/articles/count", params={"category": "ai"}).json() == {"total": 5}
+        assert client.get("/api/articles/count", params={"category": "none"}).json() == {"total": 0}
+        assert client.get("/api/articles/count", params={"feed_id": 999}).json() == {"total": 0}
+
+    def test_invalid_dates_rejected_like_list(self, client):
+        """测试：日期格式错误时，计数与文章列表返回同样的 400"""
+        for params in ({"date": "bad"}, {"start_date": "2026-13-01"}, {"end_date": "yesterday"}):
+            listed = client.get("/api/articles", params=params)
+            counted = client.get("/api/articles/count", params=params)
+            assert listed.status_code == counted.status_code == 400
+            assert listed.json() == counted.json()
+
+
+class TestArticleDetail:
+    """测试单篇文章详情"""
+
+    def test_detail_includes_content(self, client):
+        """测试：详情接口按需返回正文，不存在的文章返回 404"""
+        first = client.get("/api/articles", params={"limit": 1}).json()[0]
+        response = client.get(f"/api/articles/{first['id']}")
+        assert response.status_code == 200
+        assert response.json()["content"] == "Body of article 0"
+        assert client.get("/api/articles/999999").status_code == 404
+
+
+class TestArticleSearch:
+    """测试全文搜索接口"""
+
+    def test_search_returns_ranked_snippets(self, client):
+        """测试：搜索结果带命中片段，过滤参数生效，日期格式错误返回 400"""
+        response = client.get("/api/articles/search", params={"q": "article 3"})
+        assert response.status_code == 200
+        results = response.json()
+        assert [item["title"] for item in results] == ["Article 3"]
+        assert "<mark>" in results[0]["snippet"]
+        assert results[0]["feed_name"] == "api"
+
+        assert client.get("/api/articles/search", params={"q": "article", "category": "tech"}).json() == []
+        assert client.get("/api/articles/search", params={"q": "article", "date": "bad"}).status_code == 400
+
+
+class TestResponseCache:
+    """测试接口响应缓存与条件请求"""
+
+    def test_rss_poll_is_served_from_cache_with_304(self, client):
+        """测试：重复轮询不再查库，带 If-None-Match / If-Modified-Since 时返回 304"""
+        with patch("app.api.routes.get_articles", wraps=get_articles) as mocked:
+            first = client.get("/api/rss", params={"limit": 3})
+            second = client.get("/api/rss", params={"limit": 3})
+            assert mocked.call_count == 1
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert first.headers["content-type"].startswith("application/rss+xml")
+        etag = first.headers["ETag"]
+        assert etag.startswith('"') and "Last-Modified" in first.headers
+
+        not_modified = client.get("/api/rss", params={"limit": 3}, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["ETag"] == etag
+        since = client.get(
+            "/api/rss", params={"limit": 3}, headers={"If-Modified-Since": first.headers["Last-Modified"]}
+        )
+        assert since.status_code == 304
+        assert client.get("/api/rss", params={"limit": 3}, headers={"If-None-Match": '"other"'}).status_code == 200
+
+    def test_data_change_invalidates(self, client, engine):
+        """测试：摘要写入后缓存失效，新响应带新的 ETag"""
+        first = client.get("/api/articles", params={"limit": 2})
+        article_id = first.json()[0]["id"]
+        with Session(engine) as session:
+            update_article_summary(session, article_id, "新的摘要")
+            mark_articles_changed(session, article_ids=[article_id])
+
+        response = client.get("/api/articles", params={"limit": 2}, headers={"If-None-Match": first.headers["ETag"]})
+        assert response.status_code == 200
+        assert response.json()[0]["summary"] == "新的摘要"
+        assert response.headers["ETag"] != first.headers["ETag"]
+        # 翻页响应头随响应一起缓存
+        assert response.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+    def test_rerender_keeps_etag(self, client):
+        """测试：lastBuildDate 取文章最新时间，缓存淘汰后重新生成的 RSS 与 ETag 不变"""
+        first = client.get("/api/rss", params={"limit": 3})
+        response_cache.clear()
+        with patch("app.services.rss_generator.datetime", wraps=datetime) as mocked:
+            mocked.now.return_value = datetime.now() + timedelta(days=1)
+            second = client.get("/api/rss", params={"limit": 3})
+
+        assert second.content == first.content
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+    def test_change_only_invalidates_affected_scopes(self, client, engine):
+        """测试：其他分类写入新文章时，本分类的缓存仍然有效，全部文章的缓存失效"""
+        by_category = client.get("/api/rss", params={"limit": 3, "category": "ai"})
+        everything = client.get("/api/rss", params={"limit": 3})
+        with Session(engine) as session:
+            feed = Feed(name="other", url="https://other.example.com/rss", category="tech")
+            session.add(feed)
+            session.commit()
+            bulk_insert_articles(session, [{
+                "title": "Tech article",
+                "link": "https://other.example.com/1",
+                "published_at": datetime.now(),
+                "feed_id": feed.id,
+            }])
+            session.commit()
+            mark_articles_changed(session, feed_ids=[feed.id])
+
+        with patch("app.api.routes.get_articles", wraps=get_articles) as mocked:
+            assert client.get(
+                "/api/rss", params={"limit": 3, "category": "ai"}, headers={"If-None-Match": by_category.headers["ETag"]}
+            ).status_code == 304
+            assert mocked.call_count == 0
+            response = client.get("/api/rss", params={"limit": 3}, headers={"If-None-Match": everything.headers["ETag"]})
+            assert response.status_code == 200 and b"Tech article" in response.content
+
+    def test_views_recorded_on_cache_hits(self, client, engine):
+        """测试：命中缓存与 304 时同样记录无摘要文章的访问"""
+        with Session(engine) as session:
+            article = session.get(Article, 1)
+            article.summary = None
+            session.add(article)
+            session.commit()
+
+        with patch("app.api.routes.record_article_views") as mocked:
+            first = client.get("/api/articles", params={"limit": 2})
+            client.get("/api/articles", params={"limit": 2})
+            client.get("/api/articles", params={"limit": 2}, headers={"If-None-Match": first.headers["ETag"]})
+            client.get("/api/rss", params={"limit": 2})
+        assert [call.args[0] for call in mocked.call_args_list] == [(1,)] * 4
@@ -0,0 +1,39 @@
+"""
+正文清洗单元测试
+"""
+from app.services.content_cleaner import clean_html, html_to_paragraphs
+
+
+class TestContentCleaner:
+    """测试 HTML 转纯文本"""
+
+    def test_keeps_paragraph_boundaries_and_entities(self):
+        """测试：块级标签处断段，行内标签与实体正常展开"""
+        html = "<h2>Title</h2><p>Hello &amp; <b>world</b><br>second line</p><ul><li>one<li>two</ul>"
+        assert html_to_paragraphs(html) == ["Title", "Hello & world", "second line", "one", "two"]
+
+    def test_drops_non_content_blocks(self):
+        """测试：去掉脚本、样式、导航与分享/评论挂件（含其中未闭合的标签）"""
+        html = (
+            "<style>p { color: red }</style><nav><a>Home</a></nav>"
+            "<p>正文第一段。</p>"
+            "<div class=\"social-share\"><p>分享到微博<div>嵌套</div></div>"
+            "<script>track()</script><section id=\"comments\"><p>评论</p></section>"
+            "<p>正文第二段。</p>"
+        )
+        assert clean_html(html) == "正文第一段。\n正文第二段。"
+
+    def test_drops_boilerplate_paragraphs(self):
+        """测试：去掉较短的订阅引导与版权声明段落"""
+        html = "<p>Real content here.</p><p>Subscribe to our newsletter.</p><p>本文版权归原作者所有。</p>"
+        assert clean_html(html) == "Real content here."
+
+    def test_plain_text_passes_through(self):
+        """测试：纯文本只做空白归一化"""
+        assert clean_html("line  one\n\n  line two ") == "line one\nline two"
+        assert clean_html("") == ""
+        assert clean_html(None) == ""
+
+    def test_boilerplate_sentence_removed_from_content_paragraph(self):
+        """测试：只去掉段落中的样板句子，保留同段正文"""
+        assert clean_html("<p>The model was released today. Continue reading</p>") == "The model was released today."
@@ -0,0 +1,83 @@
+"""
+正文存储单元测试
+"""
+import pytest
+from unittest.mock import patch
+from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.models import Feed, Article
+from app.services.content_store import (
+    compress,
+    decompress,
+    store_contents,
+    load_texts,
+    load_content,
+    CODEC_NONE,
+    CODEC_ZLIB,
+)
+from app.config import settings
+
+
+@pytest.fixture
+def session():
+    """内存数据库会话，含 3 篇文章"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Feed(name="store", url="https://store.example.com/rss"))
+        session.commit()
+        session.add_all([
+            Article(title=f"A{i}", link=f"https://store.example.com/{i}", feed_id=1) for i in range(3)
+        ])
+        session.commit()
+        yield session
+
+
+class TestCompression:
+    """测试压缩与解压"""
+
+    @pytest.mark.parametrize("codec", [CODEC_ZLIB, CODEC_NONE])
+    def test_round_trip(self, codec):
+        """测试：压缩后解压与原文一致，空文本不占空间"""
+        text = "中文正文与 English text. " * 100
+        assert decompress(compress(text, codec), codec) == text
+        assert compress("", codec) is None
+        assert decompress(None, codec) is None
+
+    def test_zstd_falls_back_to_zlib(self, session):
+        """测试：配置 zstd 但未安装 zstandard 时使用 zlib 写入"""
+        with patch.object(settings, "content_compression", "zstd"), \
+                patch("app.services.content_store._zstd", return_value=None):
+            store_contents(session, [{"id": 1, "content_text": "text"}])
+        assert load_content(session, 1) == (None, "text")
+
+
+class TestStoreAndLoad:
+    """测试写入与按需读取"""
+
+    def test_load_texts_only_for_requested_ids(self, session):
+        """测试：批量读取只返回有正文的文章，缺少纯文本时清洗原始内容"""
+        written = store_contents(session, [
+            {"id": 1, "content": "<p>raw 1</p>", "content_text": "text 1"},
+            {"id": 2, "content": "<p>Only <b>raw</b></p>", "content_text": None},
+            {"id": 3, "content": "", "content_text": ""},
+        ])
+        session.commit()
+
+        assert written == 2
+        assert load_texts(session, [1, 2, 3]) == {1: "text 1", 2: "Only raw"}
+        assert load_texts(session, [2]) == {2: "Only raw"}
+
+    def test_raw_content_is_dropped_when_disabled(self, session):
+        """测试：关闭 store_raw_content 时只保存纯文本"""
+        with patch.object(settings, "store_raw_content", False):
+            store_contents(session, [{"id": 1, "content": "<p>raw</p>", "content_text": "raw"}])
+        session.commit()
+
+        assert load_content(session, 1) == (None, "raw")
+        assert load_content(session, 2) == (None, None)
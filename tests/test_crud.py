@@ -0,0 +1,162 @@
+"""
+CRUD 查询单元测试
+
+使用内存 SQLite 作为数据库，通过 SQL 执行事件检查实际发出的查询
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event, func
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.models import Feed, Article, ArticleContent
+from app.crud import get_articles, bulk_insert_articles, encode_article_cursor, decode_article_cursor
+from app.services.content_store import load_content
+
+
+@pytest.fixture
+def engine():
+    """内存数据库引擎，插入带大段正文的文章"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        feed = Feed(name="crud", url="https://crud.example.com/rss", category="ai")
+        session.add(feed)
+        session.commit()
+        bulk_insert_articles(session, [
+            {
+                "title": f"Article {i}",
+                "link": f"https://crud.example.com/{i}",
+                "content": "<p>" + "x" * 50_000 + "</p>",
+                "content_text": "x" * 50_000,
+                "summary": f"摘要 {i}",
+                "feed_id": feed.id,
+            }
+            for i in range(5)
+        ])
+        session.commit()
+    return engine
+
+
+@contextmanager
+def capture_sql(engine):
+    """记录执行的 SQL 语句"""
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+
+class TestGetArticles:
+    """测试文章列表查询"""
+
+    def test_list_query_skips_content_columns(self, engine):
+        """测试：列表查询只发一条 SELECT，不读取正文表，且 feed 信息已随 JOIN 加载"""
+        with Session(engine) as session, capture_sql(engine) as statements:
+            articles = get_articles(session, limit=10)
+            names = {article.feed.name for article in articles}
+            summaries = [article.summary for article in articles]
+
+        assert len(articles) == 5
+        assert names == {"crud"}
+        assert all(summaries)
+        assert len(statements) == 1
+        assert "article_content" not in statements[0]
+
+    def test_content_loads_on_demand(self, engine):
+        """测试：正文压缩存储，确实需要时按文章 ID 解压读取"""
+        with Session(engine) as session:
+            article = get_articles(session, limit=1)[0]
+            raw, text = load_content(session, article.id)
+            stored = session.exec(select(func.sum(func.length(ArticleContent.text)))).one()
+
+        assert raw == "<p>" + "x" * 50_000 + "</p>"
+        assert text == "x" * 50_000
+        assert stored < 5 * 50_000 / 10
+
+
+@pytest.fixture
+def archive_engine():
+    """内存数据库引擎：多篇同一发布时间的文章，另有 3 篇发布时间为空"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    now = datetime.now()
+    with Session(engine) as session:
+        feeds = [Feed(name="ai", url="https://ai.example.com/rss", category="ai"),
+                 Feed(name="tech", url="https://tech.example.com/rss", category="tech")]
+        session.add_all(feeds)
+        session.commit()
+        bulk_insert_articles(session, [
+            {
+                "title": f"Article {i}",
+                "link": f"https://archive.example.com/{i}",
+                "published_at": None if i >= 30 else now - timedelta(hours=i // 4),
+                "feed_id": feeds[i % 2].id,
+            }
+            for i in range(33)
+        ])
+        session.commit()
+    return engine
+
+
+def _walk(session, page_size, **filters):
+    """按游标逐页读取，返回文章 ID 序列"""
+    seen, after = [], None
+    while True:
+        page = get_articles(session, limit=page_size, after=after, **filters)
+        seen.extend(article.id for article in page)
+        if len(page) < page_size:
+            return seen
+        after = decode_article_cursor(encode_article_cursor(page[-1]))
+
+
+class TestArticlePagination:
+    """测试键集翻页"""
+
+    @pytest.mark.parametrize("page_size", [1, 4, 7, 33])
+    def test_walk_matches_single_query(self, archive_engine, page_size):
+        """测试：逐页读取的结果与一次性读取完全一致，不重不漏（含同一时间与发布时间为空的文章）"""
+        with Session(archive_engine) as session:
+            expected = [article.id for article in get_articles(session, limit=100)]
+            assert len(expected) == 33
+            assert _walk(session, page_size) == expected
+            assert _walk(session, page_size, category="ai") == [
+                article.id for article in get_articles(session, limit=100, category="ai")
+            ]
+
+    @pytest.mark.parametrize("feed_ids", [[1], [2, 1], [1, 2, 99]])
+    def test_walk_by_feed(self, archive_engine, feed_ids):
+        """测试：按订阅源筛选（单个或多个）逐页读取，与全量结果按源过滤一致"""
+        with Session(archive_engine) as session:
+            expected = [
+                article.id for article in get_articles(session, limit=100)
+                if article.feed_id in feed_ids
+            ]
+            assert _walk(session, 4, feed_ids=feed_ids) == expected
+            assert [article.id for article in get_articles(session, limit=100, feed_ids=feed_ids)] == expected
+
+    def test_date_filter_excludes_null_tail(self, archive_engine):
+        """测试：有日期过滤时不补入发布时间为空的文章"""
+        with Session(archive_engine) as session:
+            assert len(_walk(session, 4, days=30)) == 30
+
+    def test_invalid_cursor(self):
+        """测试：无效游标抛出 ValueError"""
+        for cursor in ("not-a-cursor", "W10", encode_article_cursor(Article(id=None))):
+            with pytest.raises(ValueError):
+                decode_article_cursor(cursor)
@@ -0,0 +1,70 @@
+"""
+本地抽取式摘要单元测试
+"""
+from unittest.mock import patch
+
+from app.services.extractive_summarizer import (
+    split_sentences,
+    summarize_extractive,
+    summarize_extractive_pair,
+)
+from app.services.summarizer import _generate_fallback_summary
+from app.config import settings
+
+EN_ARTICLE = (
+    "<p>Subscribe to our newsletter for the latest updates.</p> "
+    "OpenAI today announced a new reasoning model that outperforms previous versions on math and coding benchmarks. "
+    "The model will be available to paying subscribers starting next week. "
+    "Developers will get API access later this month, the company said. "
+    "Pricing for the reasoning model has not been disclosed. "
+    "Analysts expect the reasoning model to intensify competition with Google and Anthropic. "
+    "Follow us on Twitter for more news."
+)
+ZH_ARTICLE = (
+    "欢迎关注我们的公众号，获取更多资讯。"
+    "今天，OpenAI 发布了新的推理模型，在数学和编程基准测试上全面超过了此前的推理模型版本。"
+    "该推理模型将于下周向付费用户开放，开发者将在本月晚些时候获得 API 访问权限。"
+    "公司尚未公布新推理模型的定价，但表示成本将与现有旗舰模型相当。"
+    "分析人士认为，新的推理模型将加剧 OpenAI 与谷歌在推理模型领域的竞争。"
+    "本文版权归原作者所有，如有侵权请联系删除。"
+)
+
+
+class TestExtractiveSummarizer:
+    """测试抽取式摘要"""
+
+    def test_split_sentences_handles_both_languages(self):
+        """测试：中英文句末标点都能分句"""
+        assert len(split_sentences("第一句话在这里。第二句话在这里！")) == 2
+        assert len(split_sentences("The first sentence is here. The second one is here.")) == 2
+
+    def test_picks_central_sentences_not_boilerplate(self):
+        """测试：选出与全文相关的句子，跳过订阅引导等样板文字，且不超过长度上限"""
+        summary = summarize_extractive(EN_ARTICLE, 300)
+        assert "reasoning model" in summary
+        assert "Subscribe" not in summary and "Twitter" not in summary
+        assert len(summary) <= 300
+
+        summary = summarize_extractive(ZH_ARTICLE, 100)
+        assert "推理模型" in summary
+        assert "公众号" not in summary and "版权" not in summary
+        assert len(summary) <= 100
+
+    def test_keeps_original_sentence_order(self):
+        """测试：入选句子按原文顺序拼接"""
+        summary = summarize_extractive(EN_ARTICLE, 300)
+        assert summary.index("OpenAI today") < summary.index("Analysts expect")
+
+    def test_pair_fills_slot_by_language(self):
+        """测试：中文内容填中文摘要，英文内容填英文摘要"""
+        zh_summary, en_summary = summarize_extractive_pair("t", ZH_ARTICLE)
+        assert zh_summary and en_summary == ""
+        zh_summary, en_summary = summarize_extractive_pair("t", EN_ARTICLE)
+        assert zh_summary == "" and en_summary
+
+    def test_llm_fallback_uses_extractive_summary(self):
+        """测试：LLM 失败时的降级摘要不再是原文开头"""
+        with patch.object(settings, "summary_max_length", 150):
+            fallback = _generate_fallback_summary(EN_ARTICLE)
+        assert not fallback.startswith("Subscribe")
+        assert len(fallback) <= 150
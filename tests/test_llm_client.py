@@ -0,0 +1,38 @@
+"""
+LLM 客户端基础设施单元测试
+
+不发起真实网络请求
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from app.services.llm_client import get_llm_client, close_llm_client
+from app.config import settings
+
+
+class TestSharedLLMClient:
+    """测试进程内共享的 LLM 客户端"""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused_within_loop(self):
+        """测试：同一事件循环内复用同一个客户端，关闭后重建"""
+        with patch.object(settings, "openai_api_key", "test-key"):
+            first = get_llm_client()
+            assert get_llm_client() is first
+
+            await close_llm_client()
+            assert first.is_closed()
+            second = get_llm_client()
+            assert second is not first
+            await close_llm_client()
+
+    def test_each_loop_gets_own_client(self):
+        """测试：不同事件循环（如命令行脚本的 asyncio.run）各自持有客户端"""
+        async def grab():
+            client = get_llm_client()
+            await close_llm_client()
+            return client
+
+        with patch.object(settings, "openai_api_key", "test-key"):
+            assert asyncio.run(grab()) is not asyncio.run(grab())
@@ -0,0 +1,69 @@
+"""
+LLM 自适应并发限制器单元测试
+"""
+import asyncio
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.services.llm_limiter import AdaptiveLimiter
+
+
+def rate_limit_error():
+    request = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+    return RateLimitError("rate limited", response=httpx.Response(429, request=request), body=None)
+
+
+class TestAdaptiveLimiter:
+    """测试 AIMD 窗口调整"""
+
+    @pytest.mark.asyncio
+    async def test_success_grows_window_additively(self):
+        """测试：每完成约一个窗口的成功请求，窗口增大约 1"""
+        limiter = AdaptiveLimiter(initial=2, max_limit=10)
+        for _ in range(4):
+            async with limiter.slot():
+                pass
+        assert 3.0 <= limiter.limit < 4.0
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_halves_window_once_per_event(self):
+        """测试：同一批并发请求同时被限流，只收缩一次"""
+        limiter = AdaptiveLimiter(initial=8)
+        started = asyncio.Event()
+
+        async def call():
+            async with limiter.slot():
+                await started.wait()
+                raise rate_limit_error()
+
+        tasks = [asyncio.create_task(call()) for _ in range(4)]
+        await asyncio.sleep(0)
+        started.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(r, RateLimitError) for r in results)
+        assert limiter.limit == 4.0
+        assert limiter.congestion_count == 4
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_window_bounds_concurrency(self):
+        """测试：同时执行的请求数不超过窗口，且不低于下限"""
+        limiter = AdaptiveLimiter(initial=2, min_limit=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        assert peak == 2
+
+        with pytest.raises(RateLimitError):
+            async with limiter.slot():
+                raise rate_limit_error()
+        assert limiter.limit >= 2
@@ -0,0 +1,104 @@
+"""
+LLM 服务商池单元测试
+
+使用 mock 模拟各服务商的客户端，不发起真实网络请求
+"""
+import json
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from openai import APITimeoutError
+
+from app.services.llm_providers import (
+    LLMProvider,
+    ProviderPool,
+    load_providers,
+    get_provider_pool,
+    llm_configured,
+    CIRCUIT_FAILURE_THRESHOLD,
+)
+from app.services.summarizer import _create_chat_completion, _served_model
+from app.config import settings
+
+PROVIDERS = json.dumps([
+    {"name": "primary", "api_base": "https://primary.example.com/v1", "api_key": "k1", "model": "m1"},
+    {"name": "backup", "api_base": "https://backup.example.com/v1", "api_key": "k2", "model": "m2", "weight": 2},
+])
+
+
+def make_provider(name, weight=1.0):
+    return LLMProvider(name=name, api_base=f"https://{name}.example.com", api_key="k", model="m", weight=weight)
+
+
+class TestProviderPool:
+    """测试配置加载与选路"""
+
+    def test_load_providers_falls_back_to_single_default(self):
+        """测试：未配置或配置错误时使用 OPENAI_* 组成的默认服务商"""
+        with patch.object(settings, "llm_providers", ""):
+            providers = load_providers()
+            assert [p.name for p in providers] == ["default"]
+            assert providers[0].model == settings.openai_model
+        with patch.object(settings, "llm_providers", "not json"):
+            assert [p.name for p in load_providers()] == ["default"]
+        with patch.object(settings, "llm_providers", PROVIDERS):
+            providers = load_providers()
+            assert [(p.name, p.weight) for p in providers] == [("primary", 1.0), ("backup", 2)]
+
+    def test_llm_configured_with_providers_only(self):
+        """测试：只配置 LLM_PROVIDERS（没有 OPENAI_API_KEY）也视为已配置 LLM"""
+        with patch.object(settings, "openai_api_key", None):
+            with patch.object(settings, "llm_providers", ""):
+                assert llm_configured() is False
+            with patch.object(settings, "llm_providers", PROVIDERS):
+                assert llm_configured() is True
+
+    def test_ranking_prefers_fast_healthy_providers(self):
+        """测试：按 p50 延迟 / 权重排序，错误多的与熔断中的排后"""
+        fast, slow = make_provider("fast"), make_provider("slow")
+        pool = ProviderPool([slow, fast])
+        for _ in range(5):
+            pool.record_success(fast, 0.5)
+            pool.record_success(slow, 2.0)
+        assert [p.name for p in pool.ranked()] == ["fast", "slow"]
+
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            pool.record_failure(fast, TimeoutError("timeout"))
+        assert [p.name for p in pool.ranked()] == ["slow", "fast"]
+        assert pool.stats()[1]["circuit_open"] is True
+
+    def test_weight_scales_score(self):
+        """测试：权重高的服务商在延迟相同时优先"""
+        light, heavy = make_provider("light", weight=1), make_provider("heavy", weight=3)
+        pool = ProviderPool([light, heavy])
+        pool.record_success(light, 1.0)
+        pool.record_success(heavy, 1.0)
+        assert pool.ranked()[0].name == "heavy"
+
+
+class TestFailover:
+    """测试故障切换"""
+
+    @pytest.mark.asyncio
+    async def test_timeout_fails_over_to_next_provider(self):
+        """测试：首选服务商超时后切换到下一个，并记录各自健康状况"""
+        request = httpx.Request("POST", "https://primary.example.com/v1/chat/completions")
+        response = Mock()
+
+        clients = {
+            "primary": AsyncMock(),
+            "backup": AsyncMock(),
+        }
+        clients["primary"].chat.completions.create = AsyncMock(side_effect=APITimeoutError(request=request))
+        clients["backup"].chat.completions.create = AsyncMock(return_value=response)
+
+        with patch.object(settings, "llm_providers", PROVIDERS), \
+                patch("app.services.summarizer.get_llm_client", side_effect=lambda p: clients[p.name]):
+            result = await _create_chat_completion(messages=[{"role": "user", "content": "hi"}], max_tokens=10)
+
+            assert result is response
+            assert clients["backup"].chat.completions.create.call_args.kwargs["model"] == "m2"
+            assert _served_model.get() == "m2"
+            stats = {s["name"]: s for s in get_provider_pool().stats()}
+            assert stats["primary"]["error_rate"] == 1.0
+            assert stats["backup"]["calls"] == 1
@@ -0,0 +1,71 @@
+"""
+LLM 速率限制（RPM/TPM 令牌桶）单元测试
+
+使用内存 SQLite 作为共享状态
+"""
+import pytest
+from unittest.mock import patch
+from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.models import LLMRateBucket
+from app.services.llm_rate_limiter import LLMRateLimiter, TOKENS_BUCKET
+from app.config import settings
+
+
+@pytest.fixture
+def limiter():
+    """内存数据库上的限流器"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return LLMRateLimiter(engine=engine)
+
+
+class TestLLMRateLimiter:
+    """测试双令牌桶"""
+
+    def test_disabled_by_default(self, limiter):
+        """测试：未配置配额时不限流"""
+        with patch.object(settings, "llm_rpm_limit", 0), patch.object(settings, "llm_tpm_limit", 0):
+            assert not limiter.enabled
+            assert all(limiter.try_acquire(10_000) == 0 for _ in range(100))
+
+    def test_request_bucket_paces_after_burst(self, limiter):
+        """测试：突发容量用完后需等待约 60/RPM 秒"""
+        with patch.object(settings, "llm_rpm_limit", 60), \
+                patch.object(settings, "llm_tpm_limit", 0), \
+                patch.object(settings, "llm_rate_burst_seconds", 5.0):
+            assert [limiter.try_acquire(100) for _ in range(5)] == [0.0] * 5
+            wait = limiter.try_acquire(100)
+            assert 0.5 < wait <= 1.0
+
+    def test_token_bucket_allows_oversized_request_as_debt(self, limiter):
+        """测试：超过桶容量的大请求在桶满时放行，欠下的令牌让后续请求多等"""
+        with patch.object(settings, "llm_rpm_limit", 0), \
+                patch.object(settings, "llm_tpm_limit", 600), \
+                patch.object(settings, "llm_rate_burst_seconds", 5.0):
+            assert limiter.try_acquire(200) == 0.0
+            wait = limiter.try_acquire(10)
+            # 容量 50、余额约 -150、每秒补充 10：约需 16 秒才能补到 10 个
+            assert 15 < wait < 17
+
+            # 实际只用了 30 个 Token，退还 170 后余额约 20，可立即放行
+            limiter.settle(200, 30)
+            assert limiter.try_acquire(10) == 0.0
+            with Session(limiter.engine) as session:
+                assert session.get(LLMRateBucket, TOKENS_BUCKET).tokens < 50
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_refill(self, limiter):
+        """测试：异步等待直到配额补充"""
+        with patch.object(settings, "llm_rpm_limit", 600), \
+                patch.object(settings, "llm_tpm_limit", 0), \
+                patch.object(settings, "llm_rate_burst_seconds", 0.1):
+            await limiter.acquire(10)
+            await limiter.acquire(10)
+            assert limiter.wait_count == 1
+            assert limiter.wait_seconds > 0
@@ -0,0 +1,132 @@
+"""
+近似重复检测单元测试
+
+使用内存 SQLite 作为数据库
+"""
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlalchemy import delete
+from sqlalchemy.pool import StaticPool
+
+from app.models import Feed, Article, ArticleContent, ArticleSimhashBand
+from app.services.near_dup import (
+    compute_simhash,
+    hamming_distance,
+    band_keys,
+    index_fingerprints,
+    find_summarized_duplicate,
+    prune_simhash_bands,
+    BAND_COUNT,
+)
+from app.services.content_store import store_contents
+
+PRESS_RELEASE = (
+    "OpenAI today announced a new reasoning model that it says outperforms previous versions "
+    "on math, coding and science benchmarks. The company said the model will be available to "
+    "paying subscribers starting next week, with API access rolling out to developers later this "
+    "month. Pricing has not been disclosed, but executives said costs would be comparable to the "
+    "current flagship model."
+)
+REPOST = f"<p>{PRESS_RELEASE}</p><p>Read more at TechCrunch.</p>"
+UNRELATED = (
+    "Apple unveiled a redesigned MacBook Air with a larger battery and a brighter display at its "
+    "annual hardware event in Cupertino on Tuesday, alongside updated iPads and accessories for "
+    "students and a new lineup of colors."
+)
+
+
+@pytest.fixture
+def session():
+    """内存数据库会话"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        feed = Feed(name="dup", url="https://dup.example.com/rss")
+        session.add(feed)
+        session.commit()
+        yield session
+
+
+def _insert(session, link, content, summary=None, created_at=None):
+    article = Article(
+        title=link, link=link, summary=summary, feed_id=1,
+        created_at=created_at or datetime.now(),
+    )
+    session.add(article)
+    session.commit()
+    store_contents(session, [{"id": article.id, "content": content}])
+    index_fingerprints(session, [{"id": article.id, "content": content, "created_at": article.created_at}])
+    session.commit()
+    return article.id
+
+
+class TestSimHash:
+    """测试指纹计算"""
+
+    def test_repost_is_close_and_unrelated_is_far(self):
+        """测试：转载稿距离很小，无关文章距离很大"""
+        original = compute_simhash(PRESS_RELEASE)
+        assert hamming_distance(original, compute_simhash(REPOST)) <= 3
+        assert hamming_distance(original, compute_simhash(UNRELATED)) > 10
+
+    def test_short_text_has_no_fingerprint(self):
+        """测试：过短文本不计算指纹"""
+        assert compute_simhash("Short teaser text.") is None
+
+    def test_band_keys_are_distinct_per_band(self):
+        """测试：每段的分桶键带段序号，不同段之间不会冲突"""
+        keys = band_keys(compute_simhash(PRESS_RELEASE))
+        assert len(keys) == BAND_COUNT
+        assert [key >> 16 for key in keys] == list(range(BAND_COUNT))
+
+
+class TestFindDuplicate:
+    """测试近似重复查找"""
+
+    def test_reuses_summary_of_recent_duplicate(self, session):
+        """测试：找到近期已有摘要的转载稿"""
+        original_id = _insert(session, "https://a.example.com/1", PRESS_RELEASE, summary="已有摘要")
+        _insert(session, "https://b.example.com/1", UNRELATED, summary="无关摘要")
+        repost_id = _insert(session, "https://c.example.com/1", REPOST)
+
+        simhash = session.get(Article, repost_id).simhash
+        found = find_summarized_duplicate(session, repost_id, simhash)
+        assert found == (original_id, "已有摘要", None)
+        assert len(session.exec(select(ArticleSimhashBand)).all()) == 3 * BAND_COUNT
+
+    def test_ignores_unsummarized_and_expired(self, session):
+        """测试：没有摘要或超出时间窗口的文章不参与复用"""
+        _insert(session, "https://a.example.com/2", PRESS_RELEASE)
+        _insert(
+            session, "https://b.example.com/2", PRESS_RELEASE, summary="旧摘要",
+            created_at=datetime.now() - timedelta(days=30),
+        )
+        repost_id = _insert(session, "https://c.example.com/2", REPOST)
+
+        simhash = session.get(Article, repost_id).simhash
+        assert find_summarized_duplicate(session, repost_id, simhash, window_days=7) is None
+
+
+class TestPruneBands:
+    """测试分桶索引清理"""
+
+    def test_prunes_expired_and_orphaned_bands(self, session):
+        """测试：删除窗口外与文章已删除的分桶行，保留近期文章的分桶"""
+        recent_id = _insert(session, "https://a.example.com/3", PRESS_RELEASE)
+        _insert(
+            session, "https://b.example.com/3", UNRELATED,
+            created_at=datetime.now() - timedelta(days=30),
+        )
+        deleted_id = _insert(session, "https://c.example.com/3", REPOST)
+        session.execute(delete(ArticleContent).where(ArticleContent.article_id == deleted_id))
+        session.execute(delete(Article).where(Article.id == deleted_id))
+        session.commit()
+
+        assert prune_simhash_bands(session, window_days=7) == 2 * BAND_COUNT
+        remaining = session.exec(select(ArticleSimhashBand.article_id).distinct()).all()
+        assert remaining == [recent_id]
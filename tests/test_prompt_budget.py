@@ -0,0 +1,83 @@
+"""
+提示词 Token 预算单元测试
+"""
+from unittest.mock import patch
+
+from app.config import settings
+from app.services.prompt_budget import (
+    clean_content,
+    count_tokens,
+    fit_content,
+    output_tokens,
+    truncate_to_tokens,
+)
+
+
+class TestPromptBudget:
+    """测试 Token 计数与正文压缩"""
+
+    def test_count_tokens_weights_chinese_per_character(self):
+        """测试：近似计数中文按字、英文按约 4 字符计"""
+        assert count_tokens("") == 0
+        assert count_tokens("中文内容测试") == 7
+        assert count_tokens("a" * 400) == 101
+
+    def test_clean_content_drops_html_and_boilerplate(self):
+        """测试：去掉 HTML、脚本与订阅/版权样板段落，保留段落边界"""
+        content = (
+            "<p>First paragraph about the release.</p><script>var x = 1;</script>"
+            "<p>Second paragraph &amp; details.</p>"
+            "<p>Subscribe to our newsletter!</p>"
+            "<div>本文版权归原作者所有，转载请注明出处。</div>"
+        )
+        assert clean_content(content) == "First paragraph about the release.\nSecond paragraph & details."
+
+    def test_fit_content_keeps_short_text(self):
+        """测试：未超出预算时返回全文"""
+        assert fit_content("<p>短文本内容。</p>", budget=100) == "短文本内容。"
+
+    def test_fit_content_respects_budget_for_both_languages(self):
+        """测试：中英文长文都被压缩到同一 Token 预算内，且按原文顺序保留段落"""
+        zh = "".join(f"<p>第{i}段：新模型在推理与编程测试中表现出色，发布会介绍了模型的训练方法。</p>" for i in range(40))
+        en = "".join(
+            f"<p>Paragraph {i}: the new model performs well on reasoning and coding benchmarks.</p>"
+            for i in range(40)
+        )
+        for content in (zh, en):
+            fitted = fit_content(content, budget=200)
+            assert 0 < count_tokens(fitted) <= 200
+            paragraphs = fitted.split("\n")
+            assert paragraphs == sorted(paragraphs, key=clean_content(content).split("\n").index)
+
+    def test_fit_content_truncates_single_oversized_unit(self):
+        """测试：无法分句的超长文本按 Token 截断"""
+        fitted = fit_content("A" * 8000, budget=100)
+        assert fitted == "A" * 400
+        assert truncate_to_tokens("中文" * 100, 10) == "中文" * 5
+
+    def test_output_tokens_scale_with_expected_length(self):
+        """测试：max_tokens 随期望输出长度变化"""
+        zh_only = output_tokens(zh_chars=150)
+        en_only = output_tokens(en_chars=300)
+        bilingual = output_tokens(zh_chars=150, en_chars=300)
+        assert zh_only < bilingual and en_only < bilingual
+        assert output_tokens(zh_chars=1000) > zh_only
+        assert output_tokens(en_chars=3000) > en_only
+
+    def test_output_tokens_not_below_previous_limits(self):
+        """测试：默认摘要长度下 max_tokens 不低于按 Token 估算之前的固定值（中文 200、英文 300、双语 500）"""
+        length = settings.summary_max_length
+        assert output_tokens(zh_chars=length) >= 200
+        assert output_tokens(en_chars=length * 2) >= 300
+        assert output_tokens(zh_chars=length, en_chars=length * 2) >= 500
+
+    def test_tiktoken_falls_back_when_not_installed(self):
+        """测试：配置 tiktoken 但未安装时退回近似计数"""
+        with patch.object(settings, "llm_tokenizer", "tiktoken"), \
+                patch("app.services.prompt_budget.importlib.util.find_spec", return_value=None):
+            from app.services.prompt_budget import _get_encoding
+            _get_encoding.cache_clear()
+            try:
+                assert count_tokens("中文内容测试") == 7
+            finally:
+                _get_encoding.cache_clear()
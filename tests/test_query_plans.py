@@ -0,0 +1,112 @@
+"""
+查询计划回归测试
+
+对 /api/articles 的各筛选组合执行 EXPLAIN QUERY PLAN，
+确认文章表走索引按时间顺序读取，而不是全表扫描后再用临时 B 树排序。
+"""
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.crud import build_articles_query, bulk_insert_articles
+from app.models import Feed
+
+FILTER_COMBINATIONS = [
+    {},
+    {"category": "ai"},
+    {"days": 7},
+    {"category": "ai", "days": 7},
+    {"date": "2026-01-05"},
+    {"date": "2026-01-05", "category": "ai"},
+    {"start_date": "2026-01-01"},
+    {"end_date": "2026-01-05"},
+    {"start_date": "2026-01-01", "end_date": "2026-01-05", "category": "ai"},
+    # 键集翻页的后续页
+    {"after": (datetime(2026, 1, 5, 12), 1000)},
+    {"after": (datetime(2026, 1, 5, 12), 1000), "category": "ai"},
+    {"after": (datetime(2026, 1, 5, 12), 1000), "days": 7},
+    {"after": (None, 1000)},
+    # 单个订阅源
+    {"feed_ids": [1]},
+    {"feed_ids": [1], "category": "ai"},
+    {"feed_ids": [1], "after": (datetime(2026, 1, 5, 12), 1000)},
+]
+
+MULTI_FEED_FILTERS = [
+    {"feed_ids": [1, 2, 3]},
+    {"feed_ids": [1, 2, 3], "category": "ai", "days": 7},
+    {"feed_ids": [1, 2, 3], "after": (datetime(2026, 1, 5, 12), 1000)},
+]
+
+
+@pytest.fixture(scope="module", params=["empty", "analyzed"])
+def engine(request):
+    """
+    与应用相同的表结构（含索引）
+
+    analyzed：写入分类分布不均的数据并执行 ANALYZE，确认有统计信息时规划器也不改走“按分类取全部再排序”
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    if request.param == "analyzed":
+        now = datetime.now()
+        with Session(engine) as session:
+            feeds = [
+                Feed(name=f"feed {i}", url=f"https://plan.example.com/{i}/rss", category="ai" if i == 0 else f"c{i % 4}")
+                for i in range(20)
+            ]
+            session.add_all(feeds)
+            session.commit()
+            bulk_insert_articles(session, [
+                {
+                    "title": f"Article {i}",
+                    "link": f"https://plan.example.com/a/{i}",
+                    "published_at": now - timedelta(minutes=7 * i),
+                    "feed_id": feeds[0 if i % 500 == 0 else 1 + i % 19].id,
+                }
+                for i in range(5000)
+            ])
+            session.commit()
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+    return engine
+
+
+def explain(engine, statement) -> list:
+    """返回查询计划各步骤的描述"""
+    compiled = statement.compile(dialect=engine.dialect)
+    params = tuple(compiled.construct_params()[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+    return [row[3] for row in rows]
+
+
+@pytest.mark.parametrize("filters", FILTER_COMBINATIONS, ids=lambda f: ",".join(f) or "none")
+def test_article_list_uses_index(engine, filters):
+    """测试：每种筛选组合都按索引读取文章，不做全表扫描，也不额外排序"""
+    plan = explain(engine, build_articles_query(limit=50, **filters))
+    article_steps = [step for step in plan if " article " in f"{step} "]
+
+    assert article_steps, plan
+    assert all("USING INDEX ix_article_" in step for step in article_steps), plan
+    if "after" in filters:
+        # 后续页直接按游标定位，不从头扫描
+        assert all(step.startswith("SEARCH") for step in article_steps), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+@pytest.mark.parametrize("filters", MULTI_FEED_FILTERS, ids=lambda f: ",".join(f))
+def test_multi_feed_list_reads_each_feed_by_index(engine, filters):
+    """测试：多个订阅源时每个源按索引各取前 N 条，只对候选 ID 排序，不读出这些源的全部文章"""
+    plan = explain(engine, build_articles_query(limit=50, **filters))
+    feed_steps = [step for step in plan if "ix_article_feed_published" in step]
+
+    assert len(feed_steps) == len(filters["feed_ids"]), plan
+    assert all(step.startswith("SEARCH") for step in feed_steps), plan
+    assert "SEARCH article USING INTEGER PRIMARY KEY (rowid=?)" in plan, plan
+    assert not any(step.startswith("SCAN article") for step in plan), plan
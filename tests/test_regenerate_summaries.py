@@ -0,0 +1,134 @@
+"""
+摘要批量重新生成脚本单元测试
+
+使用内存 SQLite 作为数据库，mock 摘要函数避免消耗真实 Token
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+import pytest
+from unittest.mock import patch
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.models import Feed, Article, SummaryTask
+from app.crud import bulk_insert_articles
+from app.services.summary_queue import compute_priority
+from app.services.rss_snapshots import rss_snapshots
+from utils.regenerate_summaries import regenerate_summaries
+
+
+@pytest.fixture
+def engine():
+    """内存数据库引擎，插入 25 篇待摘要文章（其中 1 篇内容过短）"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    now = datetime.now()
+    with Session(engine) as session:
+        feed = Feed(name="regen", url="https://regen.example.com/rss")
+        session.add(feed)
+        session.commit()
+        bulk_insert_articles(session, [
+            {
+                "title": f"Article {i}",
+                "link": f"https://regen.example.com/{i}",
+                "content_text": "short" if i == 0 else f"Long enough content for article {i}. " * 3,
+                # 同一发布时间的多篇文章，检验键集分页的 (时间, id) 复合游标
+                "published_at": now - timedelta(hours=i // 3),
+                "feed_id": feed.id,
+            }
+            for i in range(25)
+        ])
+        session.commit()
+        session.add(SummaryTask(article_id=2))
+        session.commit()
+    return engine
+
+
+def _fake_summarizer(calls):
+    async def fake(title, content, semaphore=None, use_cache=True):
+        calls.append(title)
+        await asyncio.sleep(0.001 * (len(calls) % 3))  # 完成顺序与读取顺序不同
+        return f"{title} 摘要", f"{title} summary"
+    return fake
+
+
+class TestRegenerateSummaries:
+    """测试并发流水线与断点续跑"""
+
+    @pytest.mark.asyncio
+    async def test_pipeline_summarizes_all_in_batches(self, engine, tmp_path):
+        """测试：并发处理全部文章、分批提交、出队对应任务，完成后删除检查点"""
+        calls = []
+        checkpoint = tmp_path / "checkpoint.json"
+        with patch("utils.regenerate_summaries.summarize_article_bilingual", _fake_summarizer(calls)):
+            stats = await regenerate_summaries(
+                concurrency=4, page_size=7, commit_every=5,
+                checkpoint_path=str(checkpoint), db_engine=engine,
+            )
+
+        assert stats == {"success": 24, "skipped": 1, "failed": 0}
+        assert len(calls) == 24
+        with Session(engine) as session:
+            articles = session.exec(select(Article)).all()
+            assert all(a.summary for a in articles)
+            assert session.exec(select(SummaryTask)).all() == []
+        assert not checkpoint.exists()
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint(self, engine, tmp_path):
+        """测试：中途停止后从检查点继续，每篇文章只处理一次"""
+        calls = []
+        checkpoint = tmp_path / "checkpoint.json"
+        with patch("utils.regenerate_summaries.summarize_article_bilingual", _fake_summarizer(calls)):
+            first = await regenerate_summaries(
+                limit=10, force=True, concurrency=3, page_size=4, commit_every=3,
+                checkpoint_path=str(checkpoint), db_engine=engine,
+            )
+            assert sum(first.values()) == 10
+            saved = json.loads(checkpoint.read_text(encoding="utf-8"))
+            assert saved["signature"] == {"force": True, "extractive": False}
+
+            second = await regenerate_summaries(
+                force=True, concurrency=3, page_size=4, commit_every=3,
+                checkpoint_path=str(checkpoint), db_engine=engine,
+            )
+
+        assert sum(second.values()) == 15
+        assert sorted(calls) == sorted(f"Article {i}" for i in range(1, 25))
+        assert not checkpoint.exists()
+
+    @pytest.mark.asyncio
+    async def test_each_article_summarized_once_with_boosted_task(self, engine, tmp_path):
+        """测试：运行中写回摘要、删除（被访问提升过的）摘要任务不改变分页顺序，每篇文章只处理一次"""
+        with Session(engine) as session:
+            oldest = session.exec(select(Article).order_by(Article.id)).first()
+            session.add(SummaryTask(article_id=oldest.id, priority=compute_priority(datetime.now()) + 100))
+            session.commit()
+
+        calls = []
+        with patch("utils.regenerate_summaries.summarize_article_bilingual", _fake_summarizer(calls)):
+            stats = await regenerate_summaries(
+                force=True, concurrency=1, page_size=1, commit_every=1,
+                checkpoint_path=str(tmp_path / "checkpoint.json"), db_engine=engine,
+            )
+
+        assert stats == {"success": 24, "skipped": 1, "failed": 0}
+        assert len(calls) == len(set(calls)) == 24
+        # 新入库的文章在前
+        assert calls[0] == "Article 24" and calls[-1] == "Article 1"
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_snapshots(self, engine):
+        """测试：写回摘要后作废所属分类的 RSS 快照，不会继续输出旧摘要"""
+        with Session(engine) as session:
+            rss_snapshots.rebuild(session)
+        assert rss_snapshots.get(None, "zh") is not None
+
+        with patch("utils.regenerate_summaries.summarize_article_bilingual", _fake_summarizer([])):
+            await regenerate_summaries(limit=3, concurrency=1, checkpoint_path=None, db_engine=engine)
+        assert rss_snapshots.get(None, "zh") is None
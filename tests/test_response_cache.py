@@ -0,0 +1,118 @@
+"""
+接口响应缓存单元测试
+"""
+from unittest.mock import patch
+from starlette.requests import Request
+
+from app.services.response_cache import (
+    ALL_ARTICLES,
+    ResponseCache,
+    bump_data_version,
+    cached_response,
+    category_scope,
+    feed_scope,
+)
+
+
+def _request(headers=None) -> Request:
+    raw_headers = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/api/rss", "query_string": b"", "headers": raw_headers})
+
+
+class TestResponseCache:
+    """测试缓存条目的失效与淘汰"""
+
+    def test_version_bump_and_ttl_invalidate(self):
+        """测试：数据版本变化或 TTL 到期后条目失效；ETag 只取决于响应体"""
+        cache = ResponseCache(max_entries=8, ttl=60)
+        entry = cache.put("rss", b"<rss/>", "application/rss+xml")
+        assert cache.get("rss") is entry
+
+        bump_data_version()
+        assert cache.get("rss") is None
+        assert cache.put("rss", b"<rss/>", "application/rss+xml").etag == entry.etag
+
+        with patch("app.services.response_cache.time.monotonic", return_value=10 ** 9):
+            assert cache.get("rss") is None
+
+    def test_scoped_versions(self):
+        """测试：只有依赖的分类或订阅源有变化时条目才失效；全局变化使全部条目失效"""
+        cache = ResponseCache(max_entries=8, ttl=60)
+        scopes = {
+            "ai": (category_scope("ai"),),
+            "tech": (category_scope("tech"),),
+            "feed": (feed_scope(1),),
+            "all": (ALL_ARTICLES,),
+        }
+        for key, scope in scopes.items():
+            cache.put(key, key.encode(), "text/plain", scopes=scope)
+
+        bump_data_version([category_scope("ai"), feed_scope(1)])
+        assert [key for key in scopes if cache.get(key)] == ["tech"]
+
+        cache.put("ai", b"ai", "text/plain", scopes=scopes["ai"])
+        bump_data_version()
+        assert cache.get("ai") is None and cache.get("tech") is None
+
+    def test_lru_eviction(self):
+        """测试：超过容量时淘汰最久未使用的条目"""
+        cache = ResponseCache(max_entries=2, ttl=60)
+        cache.put("a", b"a", "text/plain")
+        cache.put("b", b"b", "text/plain")
+        cache.get("a")
+        cache.put("c", b"c", "text/plain")
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.stats()["entries"] == 2
+
+
+class TestCachedResponse:
+    """测试条件请求"""
+
+    def test_if_none_match(self):
+        """测试：If-None-Match 匹配（含弱校验前缀与列表）时返回 304，未命中时只渲染一次"""
+        calls = []
+
+        def render():
+            calls.append(1)
+            return b"<rss/>", "application/rss+xml", {"X-Extra": "1"}, ()
+
+        first = cached_response(_request(), "key", render)
+        etag = first.headers["ETag"]
+        assert first.status_code == 200 and first.headers["X-Extra"] == "1"
+
+        for header in (etag, f'W/{etag}', f'"other", {etag}', "*"):
+            assert cached_response(_request({"If-None-Match": header}), "key", render).status_code == 304
+        assert cached_response(_request({"If-None-Match": '"other"'}), "key", render).status_code == 200
+        assert cached_response(_request({"If-Modified-Since": "not a date"}), "key", render).status_code == 200
+        assert len(calls) == 1
+
+    def test_last_modified_follows_content(self):
+        """测试：其他进程写库（本进程版本号不变）后重新渲染出新内容，只带 If-Modified-Since 的请求不返回 304"""
+        bodies = [b"<rss>old</rss>", b"<rss>old</rss>", b"<rss>new</rss>"]
+
+        def render():
+            return bodies.pop(0), "application/rss+xml", {}, ()
+
+        since = cached_response(_request(), "ims", render).headers["Last-Modified"]
+        # TTL 到期后重新渲染出同样的内容：Last-Modified 不变
+        with patch("app.services.response_cache.time.monotonic", return_value=10 ** 9):
+            assert cached_response(_request({"If-Modified-Since": since}), "ims", render).status_code == 304
+        # 内容变化：即使在同一秒内，Last-Modified 也晚于旧值
+        with patch("app.services.response_cache.time.monotonic", return_value=10 ** 10):
+            response = cached_response(_request({"If-Modified-Since": since}), "ims", render)
+        assert response.status_code == 200 and response.body == b"<rss>new</rss>"
+        assert response.headers["Last-Modified"] != since
+
+    def test_on_served_called_for_hits_and_304(self):
+        """测试：每次返回响应（含命中缓存与 304）都以渲染时给出的文章 id 回调"""
+        served = []
+
+        def render():
+            return b"[]", "application/json", {}, (3, 5)
+
+        etag = cached_response(_request(), "views", render, on_served=served.append).headers["ETag"]
+        cached_response(_request(), "views", render, on_served=served.append)
+        cached_response(_request({"If-None-Match": etag}), "views", render, on_served=served.append)
+        assert served == [(3, 5)] * 3
@@ -0,0 +1,335 @@
+"""
+RSS 抓取服务单元测试
+
+使用 httpx.MockTransport 模拟 RSS 源，使用内存 SQLite 作为数据库
+"""
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.models import Feed, Article
+from app.services.rss_fetcher import FetchLimiter, fetch_all_feeds_async
+from app.services.content_store import load_content
+from app.config import settings
+
+
+def make_rss(host: str, count: int) -> str:
+    """生成包含 count 个条目的 RSS XML"""
+    items = "".join(
+        f"""<item>
+            <title>{host} article {i}</title>
+            <link>https://{host}/article/{i}</link>
+            <description>Content of article {i} from {host}.</description>
+            <pubDate>Mon, 05 Jan 2026 10:00:0{i} GMT</pubDate>
+        </item>"""
+        for i in range(count)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>{host}</title><link>https://{host}/</link>
+<description>test</description>{items}</channel></rss>"""
+
+
+@pytest.fixture
+def session():
+    """内存数据库会话"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def no_side_effects():
+    """关闭二维码落盘与 LLM 摘要"""
+    with patch("app.services.qr_generator.generate_qr_code_url", return_value=""), \
+         patch.object(settings, "openai_api_key", None):
+        yield
+
+
+class TestFetchLimiter:
+    """测试抓取并发控制器"""
+
+    @pytest.mark.asyncio
+    async def test_per_host_and_global_caps(self):
+        """测试：同一主机并发不超过单主机上限，总并发不超过全局上限"""
+        limiter = FetchLimiter(max_concurrency=3, per_host_concurrency=1)
+        active = {"total": 0, "max_total": 0}
+        per_host = {}
+
+        async def job(url: str):
+            host = httpx.URL(url).host
+            async with limiter.slot(url):
+                active["total"] += 1
+                per_host[host] = per_host.get(host, 0) + 1
+                active["max_total"] = max(active["max_total"], active["total"])
+                assert per_host[host] == 1
+                await asyncio.sleep(0.01)
+                per_host[host] -= 1
+                active["total"] -= 1
+
+        urls = [f"https://host{i % 4}.example.com/feed/{i}" for i in range(12)]
+        await asyncio.gather(*(job(url) for url in urls))
+
+        assert active["max_total"] == 3
+
+
+class TestFetchAllFeedsAsync:
+    """测试并发抓取全部 RSS 源"""
+
+    @pytest.mark.asyncio
+    async def test_fetch_all_feeds_concurrently(self, session):
+        """测试：并发下载多个源并全部入库"""
+        hosts = ["a.example.com", "b.example.com", "c.example.com"]
+        for host in hosts:
+            session.add(Feed(name=host, url=f"https://{host}/rss", category="tech"))
+        session.commit()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=make_rss(request.url.host, 3))
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            stats = await fetch_all_feeds_async(session, client=client)
+
+        assert stats["total_feeds"] == 3
+        assert stats["total_articles"] == 9
+        articles = session.exec(select(Article)).all()
+        assert len(articles) == 9
+        assert all(a.published_at is not None for a in articles)
+
+    @pytest.mark.asyncio
+    async def test_failed_feed_does_not_block_others(self, session):
+        """测试：单个源下载失败不影响其他源"""
+        session.add(Feed(name="ok", url="https://ok.example.com/rss"))
+        session.add(Feed(name="broken", url="https://broken.example.com/rss"))
+        session.commit()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "broken.example.com":
+                return httpx.Response(500)
+            return httpx.Response(200, text=make_rss(request.url.host, 2))
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            stats = await fetch_all_feeds_async(session, client=client)
+
+        assert stats["total_articles"] == 2
+
+
+class TestConditionalGet:
+    """测试 HTTP 条件请求缓存"""
+
+    @pytest.mark.asyncio
+    async def test_304_skips_parsing(self, session):
+        """测试：第二轮带上 ETag，服务端返回 304 时不再解析"""
+        session.add(Feed(name="etag", url="https://etag.example.com/rss"))
+        session.commit()
+        seen_headers = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen_headers.append(dict(request.headers))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200,
+                text=make_rss(request.url.host, 2),
+                headers={"ETag": '"v1"', "Last-Modified": "Mon, 05 Jan 2026 10:00:00 GMT"},
+            )
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await fetch_all_feeds_async(session, client=client)
+            with patch("app.services.rss_fetcher.feedparser.parse") as mock_parse:
+                second = await fetch_all_feeds_async(session, client=client)
+                mock_parse.assert_not_called()
+
+        assert first["total_articles"] == 2
+        assert second["total_articles"] == 0
+        assert second["unchanged_feeds"] == 1
+        assert seen_headers[1]["if-modified-since"] == "Mon, 05 Jan 2026 10:00:00 GMT"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_body_hash_skips_parsing(self, session):
+        """测试：服务端不支持 304 时，响应体哈希一致也跳过解析"""
+        session.add(Feed(name="static", url="https://static.example.com/rss"))
+        session.commit()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=make_rss(request.url.host, 2))
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await fetch_all_feeds_async(session, client=client)
+            with patch("app.services.rss_fetcher.feedparser.parse") as mock_parse:
+                stats = await fetch_all_feeds_async(session, client=client)
+                mock_parse.assert_not_called()
+
+        assert stats["unchanged_feeds"] == 1
+        feed = session.exec(select(Feed)).one()
+        assert feed.content_hash is not None
+
+
+class TestBatchedDedup:
+    """测试批量链接去重"""
+
+    @pytest.mark.asyncio
+    async def test_existing_links_skipped_with_one_query(self, session):
+        """测试：已存在的链接被跳过，且去重只发一条 link 查询"""
+        from sqlalchemy import event
+
+        feed = Feed(name="dedup", url="https://dedup.example.com/rss")
+        session.add(feed)
+        session.commit()
+        session.add(Article(
+            title="old", link="https://dedup.example.com/article/0", feed_id=feed.id
+        ))
+        session.commit()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=make_rss(request.url.host, 5))
+
+        link_queries = []
+
+        def count_link_queries(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().startswith("SELECT article.link"):
+                link_queries.append(statement)
+
+        event.listen(session.get_bind(), "before_cursor_execute", count_link_queries)
+        try:
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                stats = await fetch_all_feeds_async(session, client=client)
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", count_link_queries)
+
+        assert stats["total_articles"] == 4
+        assert len(link_queries) == 1
+        assert len(session.exec(select(Article)).all()) == 5
+
+
+class TestBulkInsert:
+    """测试批量写入新文章"""
+
+    def test_conflicting_links_are_ignored(self, session):
+        """测试：与已有文章冲突的链接被静默忽略，只返回实际插入的行"""
+        from datetime import datetime
+        from app.crud import bulk_insert_articles
+
+        feed = Feed(name="bulk", url="https://bulk.example.com/rss")
+        session.add(feed)
+        session.commit()
+        session.add(Article(title="old", link="https://bulk.example.com/1", feed_id=feed.id))
+        session.commit()
+
+        rows = [
+            {
+                "title": f"article {i}",
+                "link": f"https://bulk.example.com/{i}",
+                "content": "content",
+                "published_at": datetime(2026, 1, 5),
+                "feed_id": feed.id,
+                "created_at": datetime.now(),
+            }
+            for i in range(3)
+        ]
+        inserted = bulk_insert_articles(session, rows)
+        session.commit()
+
+        assert sorted(link for _, link in inserted) == [
+            "https://bulk.example.com/0",
+            "https://bulk.example.com/2",
+        ]
+        assert len(session.exec(select(Article)).all()) == 3
+
+    @pytest.mark.asyncio
+    async def test_cycle_scope_writes_once(self, session):
+        """测试：按轮写入时全部源解析完后统一写入"""
+        for host in ["x.example.com", "y.example.com"]:
+            session.add(Feed(name=host, url=f"https://{host}/rss"))
+        session.commit()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=make_rss(request.url.host, 2))
+
+        with patch.object(settings, "article_insert_scope", "cycle"):
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                stats = await fetch_all_feeds_async(session, client=client)
+
+        assert stats["total_articles"] == 4
+        assert len(session.exec(select(Article)).all()) == 4
+
+
+class TestSummaryEnqueue:
+    """测试抓取只入队摘要任务"""
+
+    @pytest.mark.asyncio
+    async def test_new_articles_are_enqueued_not_summarized(self, session):
+        """测试：配置了 API Key 时新文章进入摘要队列，抓取阶段不调用 LLM"""
+        from app.models import SummaryTask
+
+        session.add(Feed(name="queue", url="https://queue.example.com/rss"))
+        session.commit()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=make_rss(request.url.host, 3))
+
+        with patch.object(settings, "openai_api_key", "test-key"):
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                stats = await fetch_all_feeds_async(session, client=client)
+
+        assert stats["queued_summaries"] == 3
+        assert len(session.exec(select(SummaryTask)).all()) == 3
+
+    @pytest.mark.asyncio
+    async def test_extractive_feed_is_summarized_locally(self, session):
+        """测试：抽取式摘要模式的订阅源入库即带摘要，不进入 LLM 队列"""
+        from app.models import SummaryTask, SUMMARY_MODE_EXTRACTIVE
+
+        session.add(Feed(name="cheap", url="https://cheap.example.com/rss", summary_mode=SUMMARY_MODE_EXTRACTIVE))
+        session.add(Feed(name="llm", url="https://llm.example.com/rss"))
+        session.commit()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=make_rss(request.url.host, 2))
+
+        with patch.object(settings, "openai_api_key", "test-key"):
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                stats = await fetch_all_feeds_async(session, client=client)
+
+        assert stats["total_articles"] == 4
+        assert stats["queued_summaries"] == 2
+        articles = session.exec(select(Article)).all()
+        cheap = [a for a in articles if "cheap" in a.link]
+        assert all(a.summary_en and a.summary == a.summary_en for a in cheap)
+        queued = {t.article_id for t in session.exec(select(SummaryTask)).all()}
+        assert queued == {a.id for a in articles if "llm" in a.link}
+
+
+class TestContentCleaning:
+    """测试入库时的正文清洗"""
+
+    @pytest.mark.asyncio
+    async def test_cleaned_text_is_stored(self, session):
+        """测试：入库时保存清洗后的纯文本；关闭 store_raw_content 时不保存原始 HTML"""
+        session.add(Feed(name="html", url="https://html.example.com/rss"))
+        session.commit()
+
+        rss = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>html</title><link>https://html.example.com/</link><description>t</description>
+<item><title>A</title><link>https://html.example.com/a</link>
+<description><![CDATA[<p>Main <b>text</b> &amp; more.</p><div class="share-buttons">Share on X</div>]]></description>
+</item></channel></rss>"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=rss)
+
+        with patch.object(settings, "store_raw_content", False):
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                await fetch_all_feeds_async(session, client=client)
+
+        article = session.exec(select(Article)).one()
+        raw, text = load_content(session, article.id)
+        assert text == "Main text & more."
+        assert raw is None
@@ -0,0 +1,194 @@
+"""
+预渲染 RSS 快照测试
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.database import get_session
+from app.models import Feed
+from app.crud import bulk_insert_articles, get_articles
+from app.config import settings
+from app.services.rss_snapshots import (
+    RssSnapshotStore,
+    rss_snapshots,
+    _file_name,
+    _parse_file_name,
+)
+
+
+@pytest.fixture
+def engine():
+    """内存数据库：ai、科技 两个分类各 3 篇文章"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    now = datetime.now()
+    with Session(engine) as session:
+        feeds = [Feed(name="ai", url="https://ai.example.com/rss", category="ai"),
+                 Feed(name="科技", url="https://tech.example.com/rss", category="科技")]
+        session.add_all(feeds)
+        session.commit()
+        bulk_insert_articles(session, [
+            {
+                "title": f"Article {i}",
+                "link": f"https://snapshot.example.com/{i}",
+                "summary": f"摘要 {i}",
+                "published_at": now - timedelta(hours=i),
+                "feed_id": feeds[i % 2].id,
+            }
+            for i in range(6)
+        ])
+        session.commit()
+    return engine
+
+
+def _snapshot_files() -> set:
+    return {path.name for path in Path(settings.rss_snapshot_dir).glob("*.xml")}
+
+
+class TestSnapshotStore:
+    """测试快照的生成、作废与加载"""
+
+    def test_file_name_round_trip(self):
+        """测试：分类名（含中文与路径字符）与数据水位编码进文件名后可还原"""
+        for key in [(None, "zh"), ("科技", "en"), ("a/b.c", "bilingual")]:
+            name = _file_name(*key, "0123abcd")
+            assert "/" not in name
+            assert _parse_file_name(name) == (key, "0123abcd")
+        assert _parse_file_name(".zh.all.0123abcd.xml.tmp") is None
+        # 旧版本不带水位的文件
+        assert _parse_file_name("zh.all.xml") == ((None, "zh"), "")
+
+    def test_incremental_rebuild(self, engine):
+        """测试：首次生成全部变体，之后只重建被作废的分类与“全部文章”"""
+        with Session(engine) as session:
+            assert rss_snapshots.rebuild(session) == 9
+            assert rss_snapshots.rebuild(session) == 0
+            assert len(_snapshot_files()) == 9
+
+            rss_snapshots.invalidate(["ai"])
+            assert rss_snapshots.get("ai", "zh") is None
+            assert rss_snapshots.get("科技", "zh") is not None
+            assert len(_snapshot_files()) == 3
+
+            with patch("app.crud.get_articles", wraps=get_articles) as mocked:
+                assert rss_snapshots.rebuild(session) == 6
+            assert sorted(call.kwargs["category"] or "" for call in mocked.call_args_list) == ["", "ai"]
+
+    def test_cold_start_loads_from_disk(self, engine):
+        """测试：新进程从磁盘加载快照，内容与 ETag 不变"""
+        with Session(engine) as session:
+            rss_snapshots.rebuild(session)
+        store = RssSnapshotStore()
+
+        with Session(engine) as session:
+            assert store.load(session) == 9
+        for key in [(None, "zh"), ("科技", "bilingual")]:
+            assert store.get(*key).body == rss_snapshots.get(*key).body
+            assert store.get(*key).etag == rss_snapshots.get(*key).etag
+
+    def test_load_rejects_snapshots_behind_database(self, engine):
+        """测试：快照落盘后数据库被其他进程修改（未作废快照），重启时不加载并删除这些文件"""
+        with Session(engine) as session:
+            rss_snapshots.rebuild(session)
+            # 模拟摘要重建脚本、手工改库：直接改库，不经过作废
+            session.execute(text("UPDATE article SET summary = '新摘要' WHERE feed_id = 1"))
+            session.commit()
+
+            store = RssSnapshotStore()
+            assert store.load(session) == 3
+        assert store.get("科技", "zh") is not None
+        assert store.get("ai", "zh") is None and store.get(None, "zh") is None
+        assert len(_snapshot_files()) == 3
+
+    def test_expired_snapshots_are_rechecked(self, engine):
+        """测试：超过最长使用时间的快照不再返回；重建时水位不变只续期，水位变化重新渲染"""
+        with Session(engine) as session:
+            rss_snapshots.rebuild(session)
+            etag = rss_snapshots.get("ai", "zh").etag
+            with patch.object(settings, "rss_snapshot_max_age", -1):
+                assert rss_snapshots.get("ai", "zh") is None
+                with patch("app.services.rss_snapshots.generate_rss_response") as render:
+                    assert rss_snapshots.rebuild(session) == 0
+                    assert render.call_count == 0
+
+                session.execute(text("UPDATE article SET summary = '新摘要' WHERE feed_id = 1"))
+                session.commit()
+                assert rss_snapshots.rebuild(session) == 6
+            assert rss_snapshots.get("ai", "zh").etag != etag
+            assert "新摘要".encode() in rss_snapshots.get("ai", "zh").body
+            assert len(_snapshot_files()) == 9
+
+    def test_invalidated_while_rendering_is_discarded(self, engine):
+        """测试：渲染期间分类被作废时丢弃结果，不把旧数据写成快照"""
+        def invalidate_during_query(session, **kwargs):
+            rss_snapshots.invalidate(["ai"])
+            return get_articles(session, **kwargs)
+
+        with Session(engine) as session, \
+                patch("app.crud.get_articles", side_effect=invalidate_during_query):
+            assert rss_snapshots.rebuild(session) == 3
+        assert rss_snapshots.get("ai", "zh") is None
+        assert rss_snapshots.get("科技", "zh") is not None
+
+
+class TestSnapshotRoutes:
+    """测试 /api/rss 路由使用快照"""
+
+    @pytest.fixture
+    def client(self, engine):
+        def override_session():
+            with Session(engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = override_session
+        try:
+            yield TestClient(app)
+        finally:
+            app.dependency_overrides.pop(get_session, None)
+
+    def test_default_requests_are_served_from_snapshot(self, client, engine):
+        """测试：默认参数的请求直接返回快照并支持 304，非默认参数照常生成"""
+        with Session(engine) as session:
+            rss_snapshots.rebuild(session)
+
+        with patch("app.api.routes.get_articles", wraps=get_articles) as mocked:
+            response = client.get("/api/rss/en", params={"category": "科技"})
+            category_response = client.get("/api/rss/category/科技", params={"summary_type": "en"})
+            assert mocked.call_count == 0
+
+            assert client.get("/api/rss", params={"days": 7}).status_code == 200
+            assert mocked.call_count == 1
+
+        snapshot = rss_snapshots.get("科技", "en")
+        assert response.status_code == 200
+        assert response.content == category_response.content == snapshot.body
+        assert response.headers["ETag"] == snapshot.etag
+        assert response.headers["content-type"].startswith("application/rss+xml")
+        assert client.get(
+            "/api/rss/category/科技",
+            params={"summary_type": "en"},
+            headers={"If-None-Match": snapshot.etag},
+        ).status_code == 304
+
+    def test_snapshot_hits_record_views(self, client, engine):
+        """测试：命中快照时记录其中无摘要文章的访问"""
+        with Session(engine) as session:
+            session.execute(text("UPDATE article SET summary = NULL WHERE id = 2"))
+            session.commit()
+            rss_snapshots.rebuild(session)
+
+        with patch("app.api.routes.record_article_views") as mocked:
+            client.get("/api/rss", params={"category": "ai"})
+            client.get("/api/rss/category/科技")
+        assert [call.args[0] for call in mocked.call_args_list] == [(), (2,)]
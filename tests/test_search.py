@@ -0,0 +1,186 @@
+"""
+全文搜索单元测试
+"""
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+
+from app.models import Feed, Article
+from app.services.rss_fetcher import ArticleWriter
+from app.services.search import (
+    ensure_search_index,
+    BODY_FTS_TABLE,
+    FTS_TABLE,
+    parse_query,
+    search_articles,
+    SearchUnavailableError,
+)
+
+ARTICLES = [
+    # (标题, 摘要, 正文, 分类, 几天前发布)
+    ("大模型推理加速方案", "介绍推理加速的三种方法", "<p>通过量化与投机解码，大模型推理延迟下降一半。</p>", "ai", 1),
+    ("芯片出口管制新规", "新规影响高端芯片", "<p>新规限制高端 GPU 出口，大模型训练成本上升。</p>", "tech", 2),
+    ("Rust 1.80 Released", "LazyCell and LazyLock are stable", "<p>The Rust team announces the release.</p>", "tech", 40),
+    ("Weekly notes", None, "<p>Speculative decoding makes inference FASTER on large models.</p>", "ai", 3),
+]
+
+
+def _create_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _insert_articles(engine):
+    """通过入库流程写入 ARTICLES"""
+    now = datetime.now()
+    with Session(engine) as session:
+        feeds = {category: Feed(name=category, url=f"https://{category}.example.com/rss", category=category)
+                 for category in ("ai", "tech")}
+        session.add_all(feeds.values())
+        session.commit()
+        writer = ArticleWriter(session)
+        for i, (title, summary, content, category, days_ago) in enumerate(ARTICLES):
+            writer.add({
+                "title": title,
+                "link": f"https://search.example.com/{i}",
+                "content": content,
+                "content_text": content.replace("<p>", "").replace("</p>", ""),
+                "summary": summary,
+                "summary_en": None,
+                "published_at": now - timedelta(days=days_ago),
+                "feed_id": feeds[category].id,
+                "created_at": now,
+            })
+        writer.flush()
+
+
+@pytest.fixture
+def engine():
+    """内存数据库：建立全文索引后通过入库流程写入文章"""
+    engine = _create_engine()
+    assert ensure_search_index(engine)
+    _insert_articles(engine)
+    return engine
+
+
+def _titles(results):
+    return [article.title for article, _, _ in results]
+
+
+class TestParseQuery:
+    """测试查询解析"""
+
+    def test_terms_are_quoted_and_split_by_length(self):
+        """测试：长词按短语匹配，FTS5 语法被转义，短词单独返回"""
+        assert parse_query('大模型 推理 "OR NEAR(') == ('"大模型" AND "NEAR("', ["推理", "OR"])
+        assert parse_query("   ") == (None, [])
+
+
+class TestSearchArticles:
+    """测试搜索"""
+
+    def test_cjk_and_case_insensitive_match(self, engine):
+        """测试：中文子串与不区分大小写的英文都能命中正文"""
+        with Session(engine) as session:
+            assert set(_titles(search_articles(session, "大模型"))) == {"大模型推理加速方案", "芯片出口管制新规"}
+            assert _titles(search_articles(session, "speculative DECODING")) == ["Weekly notes"]
+
+    def test_title_match_ranks_first_with_snippet(self, engine):
+        """测试：标题命中排在正文命中之前，结果带高亮片段和得分"""
+        with Session(engine) as session:
+            results = search_articles(session, "大模型")
+        (first, snippet, score), (_, _, second_score) = results
+        assert first.title == "大模型推理加速方案"
+        assert first.feed.category == "ai"
+        assert "<mark>大模型</mark>" in snippet
+        assert score > second_score
+
+    def test_filters(self, engine):
+        """测试：分类与发布时间过滤"""
+        with Session(engine) as session:
+            assert _titles(search_articles(session, "大模型", category="tech")) == ["芯片出口管制新规"]
+            assert _titles(search_articles(session, "release", days=30)) == []
+            assert _titles(search_articles(session, "release")) == ["Rust 1.80 Released"]
+
+    def test_short_terms(self, engine):
+        """测试：不足 3 个字的词也能搜索（单独出现或与长词组合）"""
+        with Session(engine) as session:
+            results = search_articles(session, "芯片")
+            assert _titles(results) == ["芯片出口管制新规"]
+            assert results[0][1].startswith("<mark>芯片</mark>")
+            assert results[0][2] is None
+            assert _titles(search_articles(session, "大模型 量化")) == ["大模型推理加速方案"]
+
+    def test_summary_updates_are_indexed(self, engine):
+        """测试：摘要写入后由触发器同步到索引，删除文章后不再命中"""
+        with Session(engine) as session:
+            article = session.get(Article, 4)
+            article.summary = "推测采样综述"
+            session.add(article)
+            session.commit()
+            assert _titles(search_articles(session, "推测采样")) == ["Weekly notes"]
+
+            session.delete(article)
+            session.commit()
+            assert search_articles(session, "推测采样") == []
+
+    def test_body_only_match_gets_excerpt(self, engine):
+        """测试：只在正文命中的文章从正文截取片段"""
+        with Session(engine) as session:
+            [(article, snippet, _)] = search_articles(session, "投机解码")
+        assert article.title == "大模型推理加速方案"
+        assert "<mark>投机解码</mark>" in snippet
+
+    def test_unavailable_without_index(self):
+        """测试：没有全文索引的数据库抛出 SearchUnavailableError"""
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session, pytest.raises(SearchUnavailableError):
+            search_articles(session, "大模型")
+
+
+class TestSearchIndex:
+    """测试索引的建立与存储"""
+
+    def test_existing_articles_are_indexed_on_creation(self):
+        """测试：在已有文章的库上建立索引时一并回填，不用等新文章入库"""
+        engine = _create_engine()
+        _insert_articles(engine)
+        assert ensure_search_index(engine)
+        with Session(engine) as session:
+            assert _titles(search_articles(session, "speculative")) == ["Weekly notes"]
+            assert _titles(search_articles(session, "芯片出口")) == ["芯片出口管制新规"]
+
+    def test_index_stores_no_text_copy(self, engine):
+        """测试：标题/摘要索引读 article 表，正文索引不保存原文"""
+        with engine.connect() as conn:
+            schema = dict(conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'table'")).all())
+            assert "content='article'" in schema[FTS_TABLE]
+            assert "content=''" in schema[BODY_FTS_TABLE]
+            assert conn.execute(text(f"SELECT content FROM {BODY_FTS_TABLE} LIMIT 1")).scalar() is None
+
+    def test_legacy_index_is_rebuilt(self):
+        """测试：旧版保存正文副本的索引表被删除重建"""
+        engine = _create_engine()
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, summary, summary_en, content, tokenize='trigram')"
+            )
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER article_fts_delete AFTER DELETE ON article "
+                f"BEGIN DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END"
+            )
+        _insert_articles(engine)
+        assert ensure_search_index(engine)
+        with Session(engine) as session:
+            assert _titles(search_articles(session, "speculative")) == ["Weekly notes"]
+            session.delete(session.get(Article, 4))
+            session.commit()
+            assert search_articles(session, "Weekly") == []
@@ -34,7 +34,7 @@ class TestSummarizeTextAsync:
         mock_response.choices[0].message.content = mock_summary
 
         # Mock AsyncOpenAI 客户端
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             # 设置 mock 客户端实例
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
@@ -98,7 +98,7 @@ class TestSummarizeTextAsync:
     @pytest.mark.asyncio
     async def test_summarize_timeout_error(self):
         """测试：API 调用超时"""
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
 
@@ -115,7 +115,7 @@ class TestSummarizeTextAsync:
     @pytest.mark.asyncio
     async def test_summarize_api_error(self):
         """测试：API 调用失败"""
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
 
@@ -140,7 +140,7 @@ class TestSummarizeTextAsync:
     @pytest.mark.asyncio
     async def test_summarize_unknown_exception(self):
         """测试：未知异常"""
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
 
@@ -163,7 +163,7 @@ class TestSummarizeTextAsync:
         mock_response.choices = [Mock()]
         mock_response.choices[0].message.content = mock_summary
 
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
             mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
@@ -194,7 +194,7 @@ class TestSummarizeTextAsync:
         mock_response.choices = [Mock()]
         mock_response.choices[0].message.content = long_summary
 
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
             mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
@@ -216,7 +216,7 @@ class TestSummarizeTextAsync:
         mock_response.choices = [Mock()]
         mock_response.choices[0].message.content = "测试摘要"
 
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
             mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
@@ -362,7 +362,7 @@ class TestSummarizeEdgeCases:
     @pytest.mark.asyncio
     async def test_exactly_10_characters(self):
         """测试：刚好 10 个字符"""
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_response = Mock()
             mock_response.choices = [Mock()]
             mock_response.choices[0].message.content = "摘要"
@@ -394,7 +394,7 @@ class TestSummarizeEdgeCases:
         mock_response.choices = [Mock()]
         mock_response.choices[0].message.content = mock_summary
 
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
             mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
@@ -413,7 +413,7 @@ class TestSummarizeEdgeCases:
         mock_response.choices = [Mock()]
         mock_response.choices[0].message.content = mock_summary
 
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
             mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
@@ -436,7 +436,7 @@ class TestConcurrentSummaries:
         mock_response.choices = [Mock()]
         mock_response.choices[0].message.content = mock_summary
 
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
             mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
@@ -461,7 +461,7 @@ class TestConcurrentSummaries:
         mock_response.choices = [Mock()]
         mock_response.choices[0].message.content = mock_summary
 
-        with patch("app.services.summarizer.AsyncOpenAI") as mock_client_class:
+        with patch("app.services.summarizer.get_llm_client") as mock_client_class:
             mock_client = AsyncMock()
             mock_client_class.return_value = mock_client
             mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
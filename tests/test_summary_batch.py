@@ -0,0 +1,103 @@
+"""
+打包批量摘要单元测试
+
+使用 mock 模拟 OpenAI API 响应，避免消耗真实 Token
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.summarizer import (
+    summarize_articles_batch,
+    pack_articles,
+    parse_packed_response,
+)
+from app.config import settings
+
+
+def make_items(count, length=200):
+    return [
+        {"id": 100 + i, "title": f"Title {i}", "content": f"Short news item number {i}. " * (length // 25)}
+        for i in range(count)
+    ]
+
+
+def mock_completion(content):
+    response = Mock()
+    response.choices = [Mock()]
+    response.choices[0].message.content = content
+    return response
+
+
+class TestPacking:
+    """测试装箱与响应解析"""
+
+    def test_pack_respects_item_limit_and_budget(self):
+        """测试：按篇数上限与 Token 预算分组"""
+        with patch.object(settings, "summary_pack_max_items", 3), \
+                patch.object(settings, "summary_pack_token_budget", 10_000):
+            assert [len(g) for g in pack_articles(make_items(7))] == [3, 3, 1]
+
+        with patch.object(settings, "summary_pack_max_items", 10), \
+                patch.object(settings, "summary_pack_token_budget", 120):
+            groups = pack_articles(make_items(4))
+            assert len(groups) > 1
+            assert sum(len(g) for g in groups) == 4
+
+    def test_parse_tolerates_code_fence_and_drops_bad_items(self):
+        """测试：解析 ```json 包裹的数组，丢弃缺 id、越界或缺中文摘要的条目"""
+        text = "```json\n" + json.dumps([
+            {"id": 1, "zh": "第一篇摘要。", "en": "First."},
+            {"id": 2, "zh": "", "en": "Missing zh."},
+            {"id": 9, "zh": "越界。", "en": "Out of range."},
+            {"zh": "没有 id。"},
+        ], ensure_ascii=False) + "\n```"
+        assert parse_packed_response(text, 3) == {1: ("第一篇摘要。", "First.")}
+        assert parse_packed_response("not json", 3) == {}
+
+
+class TestSummarizeArticlesBatch:
+    """测试批量摘要"""
+
+    @pytest.mark.asyncio
+    async def test_one_request_with_per_item_fallback(self):
+        """测试：多篇短文章只发一次请求，响应缺失的条目逐篇回退"""
+        items = make_items(3)
+        packed_reply = json.dumps([
+            {"id": 1, "zh": "摘要一。", "en": "Summary one."},
+            {"id": 3, "zh": "摘要三。", "en": "Summary three."},
+        ], ensure_ascii=False)
+
+        mock_client = AsyncMock()
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion(packed_reply))
+        single = AsyncMock(return_value=("单篇摘要。", "Single summary."))
+
+        with patch.object(settings, "openai_api_key", "test-key"), \
+                patch("app.services.summarizer.get_llm_client", return_value=mock_client), \
+                patch("app.services.summarizer.summarize_article_bilingual", single):
+            results = await summarize_articles_batch(items)
+
+        assert mock_client.chat.completions.create.await_count == 1
+        prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        assert "Title 0" in prompt and "Title 2" in prompt
+        assert results == {
+            100: ("摘要一。", "Summary one."),
+            101: ("单篇摘要。", "Single summary."),
+            102: ("摘要三。", "Summary three."),
+        }
+        single.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_long_articles_are_not_packed(self):
+        """测试：超过打包长度的文章逐篇生成"""
+        items = make_items(2, length=2000)
+        single = AsyncMock(return_value=("单篇摘要。", "Single summary."))
+
+        with patch.object(settings, "openai_api_key", "test-key"), \
+                patch("app.services.summarizer._summarize_packed", AsyncMock()) as packed, \
+                patch("app.services.summarizer.summarize_article_bilingual", single):
+            results = await summarize_articles_batch(items)
+
+        packed.assert_not_awaited()
+        assert single.await_count == 2
+        assert set(results) == {100, 101}
@@ -0,0 +1,125 @@
+"""
+摘要缓存单元测试
+
+使用内存 SQLite 作为数据库，mock LLM 调用避免消耗真实 Token
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.models import SummaryCache
+from app.services import summary_cache
+from app.services.summary_cache import flush_hit_counts, make_cache_key
+from app.services.summarizer import FallbackSummary, summarize_article_bilingual, summarize_article_auto
+from app.config import settings
+
+CONTENT = "OpenAI released a new model today with better reasoning abilities. " * 5
+
+
+@pytest.fixture
+def engine():
+    """内存数据库引擎，替换缓存模块使用的全局引擎"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with patch.object(summary_cache, "engine", engine), \
+            patch.object(settings, "openai_api_key", "test-key"), \
+            patch.object(settings, "summary_cache_enabled", True):
+        yield engine
+
+
+class TestCacheKey:
+    """测试缓存键"""
+
+    def test_key_ignores_formatting(self):
+        """测试：HTML 标签、空白与大小写差异不影响缓存键"""
+        a = make_cache_key("bilingual", "Hello  World", "<p>Some text</p>", "1")
+        b = make_cache_key("bilingual", "hello world", "Some   text", "1")
+        assert a == b
+
+    def test_key_depends_on_mode_and_prompt_version(self):
+        """测试：摘要模式或提示词版本不同，缓存键不同"""
+        base = make_cache_key("bilingual", "t", "c", "1")
+        assert make_cache_key("zh", "t", "c", "1") != base
+        assert make_cache_key("bilingual", "t", "c", "2") != base
+
+    def test_key_follows_prompt_content(self):
+        """测试：缓存键按提示词实际使用的正文计算，预算内的差异改变键，预算外的不影响"""
+        base = make_cache_key("bilingual", "t", "A" * 6000, "1")
+        assert make_cache_key("bilingual", "t", "A" * 4000 + "B" * 2000, "1") != base
+        assert make_cache_key("bilingual", "t", "A" * 6000 + "B" * 2000, "1") == base
+
+
+class TestSummaryCache:
+    """测试摘要函数的缓存读写"""
+
+    @pytest.mark.asyncio
+    async def test_second_call_hits_cache(self, engine):
+        """测试：相同内容第二次生成直接命中缓存，不再调用 LLM；命中次数由 flush_hit_counts 批量写回"""
+        llm = AsyncMock(return_value=("中文摘要", "English summary"))
+        with patch("app.services.summarizer._do_summarize_bilingual", llm), \
+                patch("app.services.summarizer.summarize_extractive") as extractive:
+            first = await summarize_article_bilingual("Title", CONTENT)
+            second = await summarize_article_bilingual("Title", f"<p>{CONTENT}</p>")
+            third = await summarize_article_bilingual("Title", CONTENT)
+
+        assert first == second == third == ("中文摘要", "English summary")
+        assert llm.await_count == 1
+        # 判断能否缓存不再重新计算降级摘要
+        assert extractive.call_count == 0
+        with Session(engine) as session:
+            assert session.exec(select(SummaryCache)).one().hit_count == 0
+
+        assert flush_hit_counts() == 1
+        assert flush_hit_counts() == 0
+        with Session(engine) as session:
+            assert session.exec(select(SummaryCache)).one().hit_count == 2
+
+    @pytest.mark.asyncio
+    async def test_use_cache_false_bypasses_cache(self, engine):
+        """测试：use_cache=False 时总是调用 LLM"""
+        llm = AsyncMock(return_value=("中文摘要", "English summary"))
+        with patch("app.services.summarizer._do_summarize_bilingual", llm):
+            await summarize_article_bilingual("Title", CONTENT, use_cache=False)
+            await summarize_article_bilingual("Title", CONTENT, use_cache=False)
+
+        assert llm.await_count == 2
+        with Session(engine) as session:
+            assert session.exec(select(SummaryCache)).all() == []
+
+    @pytest.mark.asyncio
+    async def test_fallback_summary_is_not_cached(self, engine):
+        """测试：LLM 失败时的降级摘要不进入缓存"""
+        failing = AsyncMock(side_effect=RuntimeError("boom"))
+        with patch("app.services.summarizer._do_summarize_english", failing):
+            zh_summary, en_summary = await summarize_article_auto("Title", CONTENT)
+
+        assert (zh_summary, en_summary) == ("", "")
+        with Session(engine) as session:
+            assert session.exec(select(SummaryCache)).all() == []
+
+    @pytest.mark.asyncio
+    async def test_bilingual_fallback_is_marked_and_not_cached(self, engine):
+        """测试：双语摘要调用失败时返回带标记的降级摘要，不进入缓存"""
+        failing = AsyncMock(side_effect=RuntimeError("boom"))
+        with patch("app.services.summarizer._create_chat_completion", failing):
+            zh_summary, en_summary = await summarize_article_bilingual("Title", CONTENT)
+
+        assert isinstance(zh_summary, FallbackSummary) and zh_summary
+        assert en_summary == ""
+        with Session(engine) as session:
+            assert session.exec(select(SummaryCache)).all() == []
+
+    @pytest.mark.asyncio
+    async def test_summary_mentioning_failure_is_cached(self, engine):
+        """测试：正文谈到“失败”“异常”的正常摘要照常缓存，只有占位文本被排除"""
+        llm = AsyncMock(return_value=("火箭发射失败，原因是燃料系统异常。", "The launch failed."))
+        with patch("app.services.summarizer._do_summarize_bilingual", llm):
+            await summarize_article_bilingual("Title", CONTENT)
+
+        with Session(engine) as session:
+            assert session.exec(select(SummaryCache)).one().summary.startswith("火箭发射失败")
@@ -0,0 +1,313 @@
+"""
+摘要任务队列与摘要 worker 单元测试
+
+使用内存 SQLite 作为数据库，mock 摘要函数避免消耗真实 Token
+"""
+from datetime import datetime, timedelta
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.models import Feed, Article, SummaryTask
+from app.services import summary_queue
+from app.services.summary_queue import (
+    boost_tasks,
+    compute_priority,
+    enqueue_articles,
+    flush_article_views,
+    record_article_views,
+    lease_tasks,
+    complete_tasks,
+    fail_task,
+    get_queue_stats,
+    STATUS_PENDING,
+    STATUS_LEASED,
+    STATUS_FAILED,
+)
+from app.services.summary_worker import SummaryWorker, _is_valid_summary
+from app.services.content_store import store_contents
+from app.crud import bulk_insert_articles
+from app.config import settings
+
+
+@pytest.fixture
+def engine():
+    """内存数据库引擎（多线程共享同一连接）"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def article_ids(engine):
+    """插入 3 篇文章，返回 ID 列表"""
+    with Session(engine) as session:
+        feed = Feed(name="queue", url="https://queue.example.com/rss")
+        session.add(feed)
+        session.commit()
+        inserted = bulk_insert_articles(session, [
+            {
+                "title": f"Article {i}",
+                "link": f"https://queue.example.com/{i}",
+                "content": "Some long enough article content " * 5,
+                "feed_id": feed.id,
+            }
+            for i in range(3)
+        ])
+        session.commit()
+        return sorted(article_id for article_id, _ in inserted)
+
+
+class TestSummaryQueue:
+    """测试队列的入队、租用、完成与重试"""
+
+    def test_enqueue_is_idempotent(self, engine, article_ids):
+        """测试：重复入队同一文章被忽略"""
+        with Session(engine) as session:
+            assert enqueue_articles(session, article_ids) == 3
+            assert enqueue_articles(session, article_ids) == 0
+            session.commit()
+            assert get_queue_stats(session)[STATUS_PENDING] == 3
+
+    def test_lease_and_complete(self, engine, article_ids):
+        """测试：租用的任务不会被再次领取，完成后出队"""
+        with Session(engine) as session:
+            enqueue_articles(session, article_ids)
+            session.commit()
+
+            first = lease_tasks(session, limit=2)
+            second = lease_tasks(session, limit=2)
+            assert len(first) == 2
+            assert len(second) == 1
+            assert {t["article_id"] for t in first + second} == set(article_ids)
+            assert all(t["attempts"] == 1 for t in first)
+
+            complete_tasks(session, [t["task_id"] for t in first])
+            session.commit()
+            assert get_queue_stats(session) == {
+                STATUS_PENDING: 0, STATUS_LEASED: 1, STATUS_FAILED: 0
+            }
+
+    def test_fail_backs_off_then_gives_up(self, engine, article_ids):
+        """测试：失败后按退避重新排队，超过最大尝试次数标记为 failed"""
+        with Session(engine) as session, \
+                patch.object(settings, "summary_max_attempts", 2):
+            enqueue_articles(session, article_ids[:1])
+            session.commit()
+
+            task = lease_tasks(session, limit=1)[0]
+            fail_task(session, task["task_id"], task["attempts"], "boom")
+            session.commit()
+            # 退避期内不可领取
+            assert lease_tasks(session, limit=1) == []
+
+            row = session.exec(select(SummaryTask)).one()
+            row.available_at = datetime.now() - timedelta(seconds=1)
+            session.add(row)
+            session.commit()
+
+            task = lease_tasks(session, limit=1)[0]
+            assert task["attempts"] == 2
+            fail_task(session, task["task_id"], task["attempts"], "boom again")
+            session.commit()
+
+            row = session.exec(select(SummaryTask)).one()
+            assert row.status == STATUS_FAILED
+            assert row.last_error == "boom again"
+
+    def test_expired_lease_is_recovered(self, engine, article_ids):
+        """测试：租约过期（worker 崩溃）的任务会被重新领取"""
+        with Session(engine) as session:
+            enqueue_articles(session, article_ids[:1])
+            session.commit()
+            assert len(lease_tasks(session, limit=1, lease_seconds=60)) == 1
+
+            row = session.exec(select(SummaryTask)).one()
+            row.lease_expires_at = datetime.now() - timedelta(seconds=1)
+            session.add(row)
+            session.commit()
+
+            again = lease_tasks(session, limit=1)
+            assert len(again) == 1
+            assert again[0]["attempts"] == 2
+
+    def test_expired_lease_gives_up_after_max_attempts(self, engine, article_ids):
+        """测试：每次都让 worker 崩溃/超时的任务用尽尝试次数后标记为 failed，不再被领取"""
+        with Session(engine) as session, patch.object(settings, "summary_max_attempts", 2):
+            enqueue_articles(session, article_ids[:1])
+            session.commit()
+            for _ in range(2):
+                assert len(lease_tasks(session, limit=1)) == 1
+                row = session.exec(select(SummaryTask)).one()
+                row.lease_expires_at = datetime.now() - timedelta(seconds=1)
+                session.add(row)
+                session.commit()
+
+            assert lease_tasks(session, limit=1) == []
+            session.expire_all()
+            assert session.exec(select(SummaryTask)).one().status == STATUS_FAILED
+
+    def test_lease_follows_priority(self, engine, article_ids):
+        """测试：按优先级分领取——新文章先于旧文章，高权重源与被访问过的文章可以插队"""
+        now = datetime.now()
+        old, new, heavy = article_ids
+        with Session(engine) as session:
+            enqueue_articles(session, article_ids, {
+                old: compute_priority(now - timedelta(hours=48), now=now),
+                new: compute_priority(now - timedelta(hours=1), now=now),
+                # 权重 4 相当于提前 2 × 12 小时：36 小时前的文章排在 1 小时前的文章之后
+                heavy: compute_priority(now - timedelta(hours=36), 4.0, now=now),
+            })
+            session.commit()
+            # RETURNING 的行序不保证，逐个领取验证顺序
+            order = [lease_tasks(session, limit=1)[0]["article_id"] for _ in range(3)]
+            assert order == [new, heavy, old]
+
+        with Session(engine) as session:
+            session.execute(SummaryTask.__table__.delete())
+            enqueue_articles(session, article_ids, {
+                old: compute_priority(now - timedelta(hours=48), now=now),
+                new: compute_priority(now - timedelta(hours=1), now=now),
+            })
+            session.commit()
+            # 旧文章被反复访问后优先级超过新文章
+            assert boost_tasks(session, [old], hours=50) == 1
+            session.commit()
+            assert lease_tasks(session, limit=1)[0]["article_id"] == old
+
+    def test_views_are_batched_until_flush(self, engine, article_ids):
+        """测试：访问只在内存中累计，写回时按访问次数提升优先级"""
+        first, second = article_ids[:2]
+        with Session(engine) as session, patch.dict(summary_queue._pending_views, clear=True):
+            enqueue_articles(session, [first, second], {first: 100.0, second: 100.0})
+            session.commit()
+            record_article_views([first, second])
+            record_article_views([first])
+            record_article_views([first])
+            priorities = dict(session.exec(select(SummaryTask.article_id, SummaryTask.priority)).all())
+            assert priorities == {first: 100.0, second: 100.0}
+
+            assert flush_article_views(session) == 2
+            hours = settings.summary_priority_view_hours
+            priorities = dict(session.exec(select(SummaryTask.article_id, SummaryTask.priority)).all())
+            assert priorities == {first: 100.0 + 3 * hours, second: 100.0 + hours}
+            assert flush_article_views(session) == 0
+
+    def test_placeholder_summaries_are_not_saved(self):
+        """测试：“内容过短”“超时”等占位文本不当作摘要落库"""
+        for placeholder in ("内容过短，无需总结", "总结生成超时", "未配置 AI 服务", "总结生成失败"):
+            assert not _is_valid_summary(placeholder)
+        assert _is_valid_summary("一段正常的摘要")
+        # 正文谈到失败、异常的正常摘要
+        assert _is_valid_summary("火箭发射失败的原因是燃料系统异常。")
+
+    def test_future_publish_time_does_not_jump_queue(self):
+        """测试：发布时间在未来的文章按当前时间计分"""
+        now = datetime.now()
+        assert compute_priority(now + timedelta(days=30), now=now) == compute_priority(now, now=now)
+
+
+class TestSummaryWorker:
+    """测试摘要 worker"""
+
+    @pytest.mark.asyncio
+    async def test_run_once_writes_summaries_and_dequeues(self, engine, article_ids):
+        """测试：worker 回写摘要并出队，失败的任务重新排队"""
+        with Session(engine) as session:
+            enqueue_articles(session, article_ids)
+            session.commit()
+
+        async def fake_summarize(title, content, semaphore=None):
+            if title == "Article 1":
+                return "总结生成失败", ""
+            return f"中文摘要 {title}", f"English summary {title}"
+
+        worker = SummaryWorker(engine=engine, batch_size=10)
+        with patch(
+            "app.services.summary_worker.summarize_article_bilingual",
+            AsyncMock(side_effect=fake_summarize),
+        ), patch.object(settings, "summary_pack_enabled", False):
+            assert await worker.run_once() == 3
+
+        with Session(engine) as session:
+            articles = {a.title: a for a in session.exec(select(Article)).all()}
+            assert articles["Article 0"].summary == "中文摘要 Article 0"
+            assert articles["Article 2"].summary_en == "English summary Article 2"
+            assert articles["Article 1"].summary is None
+
+            remaining = session.exec(select(SummaryTask)).all()
+            assert len(remaining) == 1
+            assert remaining[0].status == STATUS_PENDING
+            assert remaining[0].available_at > datetime.now()
+
+        assert worker.processed_count == 2
+        assert worker.failed_count == 1
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_reuses_summary(self, engine):
+        """测试：与已有摘要的文章近似重复时直接复用，不调用 LLM"""
+        from app.services.near_dup import index_fingerprints
+
+        content = (
+            "The European Commission fined a large technology company for abusing its dominant "
+            "position in online advertising markets, ordering changes to its auction practices "
+            "within ninety days and warning of further penalties if it fails to comply."
+        )
+        with Session(engine) as session:
+            feed = Feed(name="dup", url="https://dup.example.com/rss")
+            session.add(feed)
+            session.commit()
+            original = Article(
+                title="Original", link="https://dup.example.com/1",
+                summary="已有摘要", summary_en="Existing summary", feed_id=feed.id,
+            )
+            repost = Article(title="Repost", link="https://dup.example.com/2", feed_id=feed.id)
+            session.add_all([original, repost])
+            session.commit()
+            rows = [
+                {"id": original.id, "content": content, "created_at": original.created_at},
+                {"id": repost.id, "content": f"<p>{content}</p>", "created_at": repost.created_at},
+            ]
+            store_contents(session, rows)
+            index_fingerprints(session, rows)
+            enqueue_articles(session, [repost.id])
+            session.commit()
+            repost_id = repost.id
+
+        worker = SummaryWorker(engine=engine, batch_size=10)
+        llm = AsyncMock()
+        with patch("app.services.summary_worker.summarize_article_bilingual", llm):
+            assert await worker.run_once() == 1
+
+        llm.assert_not_awaited()
+        assert worker.reused_count == 1
+        with Session(engine) as session:
+            article = session.get(Article, repost_id)
+            assert (article.summary, article.summary_en) == ("已有摘要", "Existing summary")
+
+    @pytest.mark.asyncio
+    async def test_short_articles_are_summarized_in_one_pack(self, engine, article_ids):
+        """测试：短文章交给打包摘要，一次调用覆盖整批"""
+        with Session(engine) as session:
+            enqueue_articles(session, article_ids)
+            session.commit()
+
+        async def fake_batch(items, semaphore=None):
+            return {item["id"]: (f"中文摘要 {item['title']}", "English") for item in items}
+
+        batch = AsyncMock(side_effect=fake_batch)
+        worker = SummaryWorker(engine=engine, batch_size=10)
+        with patch("app.services.summary_worker.summarize_articles_batch", batch), \
+                patch.object(settings, "summary_pack_enabled", True):
+            assert await worker.run_once() == 3
+
+        batch.assert_awaited_once()
+        with Session(engine) as session:
+            summaries = {a.title: a.summary for a in session.exec(select(Article)).all()}
+            assert summaries["Article 1"] == "中文摘要 Article 1"
+            assert session.exec(select(SummaryTask)).all() == []
@@ -2,130 +2,376 @@
 """
 重新生成文章摘要
 为所有 summary 为 null 的文章生成 AI 摘要
+
+流水线结构：
+- 读取：按主键 id 倒序键集分页（新入库的文章在前），只取 id/标题/正文，内存占用与文章总数无关；
+  分页键不随运行中的写入变化，每篇文章只处理一次（优先级排序由摘要 worker 的队列负责）
+- 生成：N 个并发 worker 从有界队列取文章（并发窗口与 RPM/TPM 配额仍由 LLM 限流器统一把关）
+- 写入：结果攒批提交，同时出队摘要队列中对应的任务
+- 断点：每次提交后把"之前全部已完成"的位置写入检查点文件，中断后再次运行从该位置继续
 """
 import asyncio
+import json
+import os
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 # 添加项目根目录到 Python 路径
-project_root = Path(__file__).parent
+project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from sqlmodel import Session, select, func
+from sqlmodel import Session, select
+from sqlalchemy import delete, func, update
+from sqlalchemy.engine import Engine
 from app.database import engine
-from app.models import Article
-from app.services.summarizer import summarize_article_bilingual
+from app.models import Article, ArticleContent, SummaryTask
+from app.services.cache_invalidation import mark_articles_changed
+from app.services.summarizer import SUMMARY_PLACEHOLDERS, summarize_article_bilingual
+from app.services.extractive_summarizer import summarize_extractive_pair
+from app.services.content_store import decode_text
+from app.services.summary_cache import flush_hit_counts
+from app.services.llm_client import close_llm_client
+from app.services.llm_providers import llm_configured
 from app.config import settings
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHECKPOINT = ".regenerate_summaries.checkpoint.json"
+# 结果缓冲超过该时长也提交一次，慢速 LLM 下检查点与进度依然及时
+FLUSH_INTERVAL_SECONDS = 10.0
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_SKIPPED = "skipped"
+OUTCOME_FAILED = "failed"
+
+
+def _base_query(force: bool, cursor: Optional[int]):
+    """待处理文章查询；cursor 为上一页最后一篇文章的 id"""
+    query = select(
+        Article.id,
+        Article.title,
+        # 正文在 article_content 表中压缩存储，由消费者解压
+        ArticleContent.codec,
+        ArticleContent.text,
+        ArticleContent.raw,
+    ).outerjoin(ArticleContent, ArticleContent.article_id == Article.id)
+    if not force:
+        # 只查询 summary 为 null 的文章
+        query = query.where(Article.summary.is_(None))
+    if cursor:
+        query = query.where(Article.id < cursor)
+    return query
+
+
+def count_remaining(db_engine: Engine, force: bool, cursor: Optional[int]) -> int:
+    """检查点之后待处理的文章数（用于进度与 ETA）"""
+    subquery = _base_query(force, cursor).subquery()
+    with Session(db_engine) as session:
+        return session.exec(select(func.count()).select_from(subquery)).one()
+
+
+def iter_pages(db_engine: Engine, force: bool, cursor: Optional[int], page_size: int):
+    """
+    按 id 倒序（新入库的文章在前）键集分页读取待处理文章，每页一个短会话，不长时间占用读事务
+
+    分页键是不会变化的主键：本次运行写回摘要、删除摘要任务都不会让文章越过游标，
+    每篇文章只读到一次。摘要任务的优先级（访问提升、源权重）只用于摘要 worker 的出队顺序
+    """
+    while True:
+        query = _base_query(force, cursor).order_by(Article.id.desc()).limit(page_size)
+        with Session(db_engine) as session:
+            rows = session.exec(query).all()
+        if not rows:
+            return
+        yield rows
+        cursor = rows[-1].id
+        if len(rows) < page_size:
+            return
+
+
+def load_checkpoint(path: str, signature: dict) -> Optional[dict]:
+    """读取检查点；参数与上次运行不一致（如换了 --force）时忽略"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"检查点文件无法读取，从头开始: {e}")
+        return None
+    if data.get("signature") != signature:
+        logger.warning("检查点的运行参数与本次不同，从头开始（或使用 --restart 显式重来）")
+        return None
+    return data
+
+
+def save_checkpoint(path: str, data: dict) -> None:
+    """原子写入检查点（先写临时文件再替换，中途被杀也不会留下半个文件）"""
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _is_valid_summary(zh_summary: str) -> bool:
+    """判断生成是否成功（按占位文本整体比对，正文谈到“失败”的正常摘要不受影响）"""
+    return bool(zh_summary) and zh_summary.strip() not in SUMMARY_PLACEHOLDERS
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+class ResultWriter:
+    """
+    结果缓冲：攒批提交并推进检查点
+
+    worker 完成顺序与读取顺序不一致，检查点只推进到"之前全部已提交"的位置（低水位），
+    中断后最多重复处理并发窗口内的少量文章，不会漏掉任何一篇。
+    """
+
+    def __init__(
+        self,
+        db_engine: Engine,
+        total: int,
+        commit_every: int,
+        checkpoint_path: Optional[str],
+        signature: dict,
+    ):
+        self.engine = db_engine
+        self.total = total
+        self.commit_every = commit_every
+        self.checkpoint_path = checkpoint_path
+        self.signature = signature
+        self.stats = {OUTCOME_SUCCESS: 0, OUTCOME_SKIPPED: 0, OUTCOME_FAILED: 0}
+        self.processed = 0
+        self.cursor: Optional[int] = None
+        self.started_at = time.monotonic()
+        self._buffer: List[Tuple[int, object, str, Optional[str], Optional[str]]] = []
+        self._positions: Dict[int, int] = {}
+        self._done: set = set()
+        self._next_seq = 0
+        self._last_flush = time.monotonic()
+
+    def track(self, seq: int, row) -> None:
+        """记录读取顺序中的位置"""
+        self._positions[seq] = row.id
+
+    def add(self, seq: int, row, outcome: str, zh_summary: Optional[str] = None, en_summary: Optional[str] = None):
+        self._buffer.append((seq, row, outcome, zh_summary, en_summary))
+        if len(self._buffer) >= self.commit_every or time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS:
+            self.flush()
+
+    def flush(self) -> None:
+        """提交缓冲中的结果，推进检查点并打印进度"""
+        buffer, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        if not buffer:
+            return
+
+        summarized = [
+            {"id": row.id, "summary": zh_summary, "summary_en": en_summary}
+            for _, row, outcome, zh_summary, en_summary in buffer
+            if outcome == OUTCOME_SUCCESS
+        ]
+        # 内容过短的文章只标记中文摘要，不动已有的英文摘要
+        skipped = [
+            {"id": row.id, "summary": zh_summary}
+            for _, row, outcome, zh_summary, _ in buffer
+            if outcome == OUTCOME_SKIPPED
+        ]
+        with Session(self.engine) as session:
+            for updates in (summarized, skipped):
+                if updates:
+                    session.execute(update(Article), updates)
+            article_ids = [u["id"] for u in summarized + skipped]
+            if article_ids:
+                # 已有摘要的文章不必再由摘要 worker 处理
+                session.execute(delete(SummaryTask).where(SummaryTask.article_id.in_(article_ids)))
+            session.commit()
+            # 作废所属分类的 RSS 快照（含磁盘文件，应用重启后不会加载旧快照）与本进程的响应缓存；
+            # 正在运行的应用进程由快照最长使用时间与响应缓存 TTL 兜底
+            mark_articles_changed(session, article_ids=article_ids)
 
-async def regenerate_summaries(limit: int = None, force: bool = False, concurrency: int = 2, delay: float = 1.0):
+        for seq, _, outcome, _, _ in buffer:
+            self.stats[outcome] += 1
+            self._done.add(seq)
+        self.processed += len(buffer)
+
+        # 推进低水位
+        while self._next_seq in self._done:
+            self._done.discard(self._next_seq)
+            self.cursor = self._positions.pop(self._next_seq)
+            self._next_seq += 1
+        if self.cursor:
+            save_checkpoint(self.checkpoint_path, {
+                "signature": self.signature,
+                "cursor": self.cursor,
+                "stats": self.stats,
+                "updated_at": datetime.now().isoformat(),
+            })
+        self.report()
+
+    def report(self) -> None:
+        """打印进度、吞吐与预计剩余时间"""
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        rate = self.processed / elapsed
+        remaining = max(self.total - self.processed, 0)
+        eta = _format_seconds(remaining / rate) if rate > 0 else "--:--"
+        percent = self.processed / self.total * 100 if self.total else 100.0
+        logger.info(
+            f"进度 {self.processed}/{self.total} ({percent:.1f}%) | "
+            f"成功 {self.stats[OUTCOME_SUCCESS]} 跳过 {self.stats[OUTCOME_SKIPPED]} 失败 {self.stats[OUTCOME_FAILED]} | "
+            f"{rate:.2f} 篇/秒 | 已用 {_format_seconds(elapsed)} 预计剩余 {eta}"
+        )
+
+
+async def _summarize_row(row, extractive: bool, use_cache: bool) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    为单篇文章生成摘要
+
+    Returns:
+        (结果类型, 中文摘要, 英文摘要)
+    """
+    content = decode_text(row.text, row.raw, row.codec)
+    if not content or len(content.strip()) < 10:
+        return OUTCOME_SKIPPED, "内容过短，无需总结", None
+
+    if extractive:
+        # 本地抽取式摘要：每篇毫秒级，无 API 开销，也不需要限速
+        zh_summary, en_summary = summarize_extractive_pair(row.title, content)
+        # 英文内容没有中文摘要：summary 也填入英文抽取结果，避免下次仍被视为待处理
+        return OUTCOME_SUCCESS, (zh_summary or en_summary) or None, en_summary or None
+
+    zh_summary, en_summary = await summarize_article_bilingual(row.title, content, use_cache=use_cache)
+    if not _is_valid_summary(zh_summary):
+        logger.warning(f"  ⚠️  文章 {row.id} 生成失败: {zh_summary[:50] if zh_summary else 'NULL'}")
+        return OUTCOME_FAILED, None, None
+    return OUTCOME_SUCCESS, zh_summary, en_summary
+
+
+async def regenerate_summaries(
+    limit: int = None,
+    force: bool = False,
+    concurrency: int = 4,
+    delay: float = 0.0,
+    use_cache: bool = True,
+    extractive: bool = False,
+    page_size: int = 200,
+    commit_every: int = 50,
+    checkpoint_path: Optional[str] = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+    db_engine: Optional[Engine] = None,
+) -> dict:
     """
     重新生成文章摘要（中英文双语）
 
     Args:
-        limit: 最多处理的文章数量（None 表示处理全部）
+        limit: 本次最多处理的文章数量（None 表示处理全部）
         force: 是否强制重新生成（包括已有摘要的文章）
-        concurrency: 并发数量（默认 2，避免触发速率限制）
-        delay: 每批之间的延迟秒数（默认 1 秒）
+        concurrency: 并发 worker 数量
+        delay: 每个 worker 每篇之后的额外暂停秒数（默认 0，速率由 LLM_RPM_LIMIT / LLM_TPM_LIMIT 控制）
+        use_cache: 是否复用摘要缓存（改了提示词想强制重算时传 False）
+        extractive: 使用本地抽取式摘要（不调用 LLM，适合快速补全大量积压）
+        page_size: 每页读取的文章数
+        commit_every: 每攒够多少篇提交一次
+        checkpoint_path: 检查点文件路径（None 表示不记录断点）
+        restart: 忽略已有检查点，从头开始
+        db_engine: 数据库引擎（默认应用引擎）
+
+    Returns:
+        {"success": n, "skipped": n, "failed": n}
     """
     logger.info("=== 开始重新生成摘要（中英文双语） ===")
+    db_engine = db_engine or engine
+    signature = {"force": force, "extractive": extractive}
 
-    with Session(engine) as session:
-        # 查询需要处理的文章
-        query = select(Article)
-        if not force:
-            # 只查询 summary 为 null 的文章
-            query = query.where(Article.summary.is_(None))
-
-        # 按展示时间倒序，优先处理新文章
-        # （与 ai-rss-web 快照的 COALESCE(published_at, created_at) 排序对齐，
-        #  保证补全优先落在快照内的文章上）
-        query = query.order_by(
-            func.coalesce(Article.published_at, Article.created_at).desc()
-        )
-
-        if limit:
-            query = query.limit(limit)
-
-        result = session.exec(query)
-        articles = result.all()
+    checkpoint = None if restart else load_checkpoint(checkpoint_path, signature)
+    cursor = None
+    if checkpoint:
+        if isinstance(checkpoint.get("cursor"), int):
+            cursor = checkpoint["cursor"]
+            logger.info(f"从检查点继续: 文章 {cursor} 之后")
+        else:
+            # 旧版本按展示时间或优先级分排序的检查点
+            logger.warning("检查点使用旧的排序方式，从头开始")
 
-        if not articles:
-            logger.info("没有需要处理的文章")
-            return
+    total = count_remaining(db_engine, force, cursor)
+    if limit:
+        total = min(total, limit)
+    if not total:
+        logger.info("没有需要处理的文章")
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return {OUTCOME_SUCCESS: 0, OUTCOME_SKIPPED: 0, OUTCOME_FAILED: 0}
 
-        logger.info(f"找到 {len(articles)} 篇文章需要生成摘要")
-        logger.info(f"并发数: {concurrency}, 批次延迟: {delay}秒")
+    logger.info(f"找到 {total} 篇文章需要生成摘要")
+    logger.info(f"并发数: {concurrency}, 每页: {page_size}, 每 {commit_every} 篇提交一次")
 
-        # 创建信号量控制并发数量（使用更保守的默认值）
-        semaphore = asyncio.Semaphore(concurrency)
+    writer = ResultWriter(db_engine, total, commit_every, checkpoint_path, signature)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    exhausted = False
 
-        success_count = 0
-        failed_count = 0
-        skip_count = 0
+    async def produce() -> None:
+        nonlocal exhausted
+        seq = 0
+        try:
+            for rows in iter_pages(db_engine, force, cursor, page_size):
+                for row in rows:
+                    if limit and seq >= limit:
+                        return
+                    writer.track(seq, row)
+                    await queue.put((seq, row))
+                    seq += 1
+            exhausted = True
+        finally:
+            for _ in range(concurrency):
+                await queue.put(None)
 
-        for i, article in enumerate(articles, 1):
+    async def consume() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            seq, row = item
             try:
-                logger.info(f"[{i}/{len(articles)}] 处理: {article.title[:50]}...")
-
-                # 检查是否有内容
-                if not article.content or len(article.content.strip()) < 10:
-                    logger.warning(f"  ⏭️  内容过短，跳过")
-                    article.summary = "内容过短，无需总结"
-                    session.add(article)
-                    session.commit()
-                    skip_count += 1
-                    continue
-
-                # 生成双语摘要
-                zh_summary, en_summary = await summarize_article_bilingual(
-                    article.title, article.content, semaphore
-                )
-
-                # 判断生成是否成功（检查是否包含错误标记）
-                is_success = (
-                    zh_summary and
-                    not zh_summary.startswith("未配置") and
-                    not zh_summary.startswith("内容过短") and
-                    not zh_summary.startswith("总结生成") and  # "总结生成超时/失败/异常"
-                    not "生成超时" in zh_summary and
-                    not "生成失败" in zh_summary and
-                    not "生成异常" in zh_summary
-                )
-
-                if is_success:
-                    article.summary = zh_summary
-                    article.summary_en = en_summary
-                    session.add(article)
-                    session.commit()
-                    success_count += 1
-                    logger.info(f"  ✅ 成功 | 中文: {len(zh_summary)}字 | 英文: {len(en_summary)}词")
-                    logger.debug(f"     中文: {zh_summary[:40]}...")
-                    logger.debug(f"     英文: {en_summary[:40]}...")
-                else:
-                    logger.warning(f"  ⚠️  失败: {zh_summary[:50] if zh_summary else 'NULL'}")
-                    failed_count += 1
-
-                # 添加延迟避免速率限制（每 N 篇暂停一次）
-                if i % concurrency == 0 and i < len(articles):
-                    logger.info(f"  ⏸️  暂停 {delay} 秒以避免速率限制...")
-                    await asyncio.sleep(delay)
-
+                outcome, zh_summary, en_summary = await _summarize_row(row, extractive, use_cache)
             except Exception as e:
-                logger.error(f"  ❌ 处理失败: {e}")
-                failed_count += 1
-                # 遇到错误时额外等待
-                await asyncio.sleep(delay * 2)
-                continue
+                logger.error(f"  ❌ 文章 {row.id} 处理失败: {e}")
+                outcome, zh_summary, en_summary = OUTCOME_FAILED, None, None
+            writer.add(seq, row, outcome, zh_summary, en_summary)
+            if delay and not extractive:
+                await asyncio.sleep(delay)
+
+    try:
+        await asyncio.gather(produce(), *(consume() for _ in range(concurrency)))
+    finally:
+        # 被中断（Ctrl+C）时也把已完成的结果写入并记录检查点
+        writer.flush()
+        flush_hit_counts()
+        await close_llm_client()
+
+    if exhausted and checkpoint_path and os.path.exists(checkpoint_path):
+        # 全部处理完毕：删除检查点，下次运行重新扫描
+        os.remove(checkpoint_path)
 
-        logger.info("=== 摘要生成完成 ===")
-        logger.info(f"成功: {success_count} 篇")
-        logger.info(f"跳过: {skip_count} 篇")
-        logger.info(f"失败: {failed_count} 篇")
+    logger.info("=== 摘要生成完成 ===")
+    logger.info(f"成功: {writer.stats[OUTCOME_SUCCESS]} 篇")
+    logger.info(f"跳过: {writer.stats[OUTCOME_SKIPPED]} 篇")
+    logger.info(f"失败: {writer.stats[OUTCOME_FAILED]} 篇")
+    if not exhausted:
+        logger.info(f"已达到本次处理上限，再次运行将从检查点 {checkpoint_path} 继续")
+    return dict(writer.stats)
 
 
 if __name__ == "__main__":
@@ -133,29 +379,57 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="重新生成文章摘要")
     parser.add_argument(
-        "--limit", "-l", type=int, help="最多处理的文章数量（默认处理全部）"
+        "--limit", "-l", type=int, help="本次最多处理的文章数量（默认处理全部）"
     )
     parser.add_argument(
         "--force", "-f", action="store_true", help="强制重新生成（包括已有摘要的文章）"
     )
     parser.add_argument(
-        "--concurrency", "-c", type=int, default=2, help="并发请求数（默认 2，避免速率限制）"
+        "--concurrency", "-c", type=int, default=4, help="并发 worker 数（默认 4，实际并发仍受 LLM 并发窗口限制）"
+    )
+    parser.add_argument(
+        "--delay", "-d", type=float, default=0.0, help="每个 worker 每篇之后的额外暂停秒数（默认 0）"
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=200, help="每页读取的文章数（默认 200）"
+    )
+    parser.add_argument(
+        "--commit-every", type=int, default=50, help="每攒够多少篇提交一次（默认 50）"
+    )
+    parser.add_argument(
+        "--checkpoint", default=DEFAULT_CHECKPOINT, help=f"检查点文件路径（默认 {DEFAULT_CHECKPOINT}）"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="忽略已有检查点，从头开始"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="不使用摘要缓存，全部重新调用 LLM"
     )
     parser.add_argument(
-        "--delay", "-d", type=float, default=1.0, help="批次间延迟秒数（默认 1.0 秒）"
+        "--extractive", action="store_true", help="使用本地抽取式摘要（不调用 LLM，无需 API Key）"
     )
 
     args = parser.parse_args()
 
-    # 检查 API Key
-    if not settings.openai_api_key:
-        logger.error("❌ 未配置 OPENAI_API_KEY，请在 .env 文件中配置")
+    # 检查 API Key（抽取式摘要不需要）
+    if not args.extractive and not llm_configured():
+        logger.error("❌ 未配置 LLM 服务，请在 .env 文件中配置 OPENAI_API_KEY 或 LLM_PROVIDERS")
         sys.exit(1)
 
     # 运行
-    asyncio.run(regenerate_summaries(
-        limit=args.limit,
-        force=args.force,
-        concurrency=args.concurrency,
-        delay=args.delay
-    ))
+    try:
+        asyncio.run(regenerate_summaries(
+            limit=args.limit,
+            force=args.force,
+            concurrency=args.concurrency,
+            delay=args.delay,
+            use_cache=not args.no_cache,
+            extractive=args.extractive,
+            page_size=args.page_size,
+            commit_every=args.commit_every,
+            checkpoint_path=args.checkpoint,
+            restart=args.restart,
+        ))
+    except KeyboardInterrupt:
+        logger.info(f"已中断，再次运行将从检查点 {args.checkpoint} 继续")
+        sys.exit(130)
@@ -6,7 +6,7 @@ Simple, clean interface to the AI-RSS-Hub API.
 """
 
 import requests
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
 
@@ -160,7 +160,8 @@ class RSSHubClient:
         self,
         limit: int = 20,
         category: Optional[str] = None,
-        days: Optional[int] = None
+        days: Optional[int] = None,
+        feed_ids: Optional[List[int]] = None
     ) -> List[Dict]:
         """
         Get articles with optional filters.
@@ -169,6 +170,7 @@ class RSSHubClient:
             limit: Maximum number of articles to return (default: 20)
             category: Filter by category (optional)
             days: Only include articles from last N days (optional)
+            feed_ids: Only include articles from these feeds (optional, up to 50)
 
         Returns:
             List of article dictionaries
@@ -178,6 +180,8 @@ class RSSHubClient:
             params["category"] = category
         if days:
             params["days"] = days
+        if feed_ids:
+            params["feed_id"] = list(feed_ids)
 
         response = self.session.get(
             f"{self.base_url}/api/articles",
@@ -187,6 +191,86 @@ class RSSHubClient:
         )
         return self._handle_response(response)
 
+    def count_articles(
+        self,
+        category: Optional[str] = None,
+        days: Optional[int] = None,
+        feed_ids: Optional[List[int]] = None
+    ) -> int:
+        """
+        Count matching articles with a single request.
+
+        Args:
+            category: Filter by category (optional)
+            days: Only include articles from last N days (optional)
+            feed_ids: Only include articles from these feeds (optional, up to 50)
+
+        Returns:
+            Number of matching articles
+        """
+        params = {}
+        if category:
+            params["category"] = category
+        if days:
+            params["days"] = days
+        if feed_ids:
+            params["feed_id"] = list(feed_ids)
+
+        response = self.session.get(
+            f"{self.base_url}/api/articles/count",
+            headers=self._get_headers(),
+            params=params,
+            timeout=self.timeout
+        )
+        return self._handle_response(response)["total"]
+
+    def _get_articles_page(self, params: Dict) -> Tuple[List[Dict], Optional[str]]:
+        """Fetch one page of articles and the cursor for the next page (None on the last page)"""
+        response = self.session.get(
+            f"{self.base_url}/api/articles",
+            headers=self._get_headers(),
+            params=params,
+            timeout=self.timeout
+        )
+        return self._handle_response(response), response.headers.get("X-Next-Cursor")
+
+    def iter_articles(
+        self,
+        page_size: int = 200,
+        category: Optional[str] = None,
+        days: Optional[int] = None,
+        feed_ids: Optional[List[int]] = None
+    ) -> Iterator[Dict]:
+        """
+        Iterate over all matching articles, newest first, following the API's pagination cursor.
+
+        Each page is a single indexed lookup on the server, so walking the full
+        archive costs the same per page no matter how deep it goes.
+
+        Args:
+            page_size: Articles per request (1-200, default: 200)
+            category: Filter by category (optional)
+            days: Only include articles from last N days (optional)
+            feed_ids: Only include articles from these feeds (optional, up to 50)
+
+        Yields:
+            Article dictionaries
+        """
+        params = {"limit": page_size}
+        if category:
+            params["category"] = category
+        if days:
+            params["days"] = days
+        if feed_ids:
+            params["feed_id"] = list(feed_ids)
+
+        while True:
+            articles, next_cursor = self._get_articles_page(params)
+            yield from articles
+            if not next_cursor:
+                return
+            params["cursor"] = next_cursor
+
     def get_article(self, article_id: int) -> Dict:
         """
         Get a specific article by ID.
@@ -224,28 +308,38 @@ class RSSHubClient:
         )
         return self._handle_response(response)
 
-    def search_articles(self, query: str, limit: int = 20) -> List[Dict]:
+    def search_articles(
+        self,
+        query: str,
+        limit: int = 20,
+        category: Optional[str] = None,
+        days: Optional[int] = None
+    ) -> List[Dict]:
         """
-        Search articles by title or content (client-side filtering).
+        Full-text search over titles, summaries and article bodies (server-side, BM25-ranked).
 
         Args:
-            query: Search query
-            limit: Maximum results (default: 20)
+            query: Search query (whitespace-separated terms must all match)
+            limit: Maximum results (1-100, default: 20)
+            category: Filter by category (optional)
+            days: Only include articles from last N days (optional)
 
         Returns:
-            List of matching articles
+            List of matching articles, each with a highlighted "snippet" and a relevance "score"
         """
-        articles = self.get_articles(limit=100)  # Get more for filtering
-        query_lower = query.lower()
-
-        matches = [
-            a for a in articles
-            if query_lower in a.get("title", "").lower() or
-               query_lower in a.get("summary", "").lower() or
-               query_lower in a.get("content", "").lower()
-        ]
+        params = {"q": query, "limit": limit}
+        if category:
+            params["category"] = category
+        if days:
+            params["days"] = days
 
-        return matches[:limit]
+        response = self.session.get(
+            f"{self.base_url}/api/articles/search",
+            headers=self._get_headers(),
+            params=params,
+            timeout=self.timeout
+        )
+        return self._handle_response(response)
 
     def get_latest_articles(self, limit: int = 10) -> List[Dict]:
         """
@@ -261,18 +355,25 @@ class RSSHubClient:
 
     def get_articles_by_feed(self, feed_id: int, limit: int = 20) -> List[Dict]:
         """
-        Get articles from a specific feed (client-side filtering).
+        Get the latest articles from a specific feed.
+
+        Filtering happens on the server, so older items of quiet feeds are
+        found without downloading other feeds' articles.
 
         Args:
             feed_id: Feed ID
-            limit: Maximum articles (default: 20)
+            limit: Maximum articles (1-200, default: 20)
 
         Returns:
-            List of articles from the specified feed
+            List of articles from the specified feed, newest first
         """
-        articles = self.get_articles(limit=100)
-        feed_articles = [a for a in articles if a.get("feed_id") == feed_id]
-        return feed_articles[:limit]
+        response = self.session.get(
+            f"{self.base_url}/api/feeds/{feed_id}/articles",
+            headers=self._get_headers(),
+            params={"limit": limit},
+            timeout=self.timeout
+        )
+        return self._handle_response(response)
 
 
 class RSSHubAdminClient(RSSHubClient):
@@ -319,12 +420,12 @@ class RSSHubAdminClient(RSSHubClient):
         """
         status = self.get_status()
         feeds = self.get_feeds()
-        articles = self.get_articles(limit=10000)  # Get all
+        total_articles = self.count_articles()
 
         return {
             "total_feeds": len(feeds),
             "active_feeds": len([f for f in feeds if f.get("is_active")]),
-            "total_articles": len(articles),
+            "total_articles": total_articles,
             "categories": list(set(f.get("category") for f in feeds)),
             "scheduler_running": status.get("scheduler", {}).get("running", False),
             "llm_configured": status.get("llm_configured", False)